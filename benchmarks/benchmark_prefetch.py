@@ -0,0 +1,96 @@
+"""Time the NGI/NDA parse and merge of the processing algorithm
+
+Run from the project root:
+
+    python -m benchmarks.benchmark_prefetch [record_count]
+
+Writes a sheet of record_count square polygons with attributes and
+consumes the merged features the way processAlgorithm does: parsed in the
+calling thread, with prefetch threads, and with prefetch processes (also
+spawned the way they are inside QGIS). Overlap needs more than one core.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from parsers.converters.geojson_converter import GeoJSONConverter
+from parsers.nda_parser import NDAParser
+from parsers.ngi_parser import NGIParser
+from parsers.prefetch import prefetch
+
+
+def write_sheet(directory, count, layers=4):
+    ngi_lines = ["<HEADER>", "$VERSION", "2.00", "$END"]
+    nda_lines = ["<HEADER>", "$VERSION", "2.00", "$END"]
+    per_layer = count // layers
+    for layer in range(layers):
+        name = f'"L{layer}"'
+        ngi_lines += ["<LAYER_START>", "$LAYER_NAME", name, "$END", "<DATA>"]
+        nda_lines += ["<LAYER_START>", "$LAYER_NAME", name, "$END"]
+        nda_lines += [
+            "$ASPATIAL_FIELD_DEF",
+            'ATTRIB("UFID", STRING, 34, 0)',
+            'ATTRIB("NAME", STRING, 100, 0)',
+            'ATTRIB("HEIGHT", NUMERIC, 6, 2)',
+            'ATTRIB("FLOORS", NUMERIC, 3, 0)',
+            "$END",
+            "<DATA>",
+        ]
+        for record in range(1, per_layer + 1):
+            x, y = 150000.0 + record, 200000.0 + layer
+            ring = [(x, y), (x + 1, y), (x + 1, y + 1), (x, y + 1), (x, y)]
+            ngi_lines += [f"$RECORD {record}", "POLYGON", "5"]
+            ngi_lines += [f"{px:.2f} {py:.2f}" for px, py in ring]
+            nda_lines += [
+                f"$RECORD {record}",
+                f'"1000L{layer}{record:012d}", "building {record}", '
+                f"{record % 300 / 7:.2f}, {record % 40}",
+            ]
+        ngi_lines += ["<END>", "<LAYER_END>"]
+        nda_lines += ["<END>", "<LAYER_END>"]
+    ngi_path = Path(directory) / "benchmark.ngi"
+    nda_path = Path(directory) / "benchmark.nda"
+    ngi_path.write_bytes("\r\n".join(ngi_lines).encode("cp949"))
+    nda_path.write_bytes("\r\n".join(nda_lines).encode("cp949"))
+    return ngi_path, nda_path
+
+
+def merge(ngi_path, nda_path, mode):
+    ngi_parser = NGIParser(compact=True)
+    nda_parser = NDAParser()
+    ngi_args = (ngi_parser.iter_records, str(ngi_path), None, None)
+    nda_args = (nda_parser.iter_records, str(nda_path), 10000, None)
+    if mode == "sequential":
+        ngi_records = ngi_args[0](*ngi_args[1:])
+        nda_records = nda_args[0](*nda_args[1:])
+    else:
+        use_process = mode != "threads"
+        ngi_records = prefetch(*ngi_args, use_process=use_process)
+        nda_records = prefetch(*nda_args, use_process=use_process)
+    count = 0
+    for _ in GeoJSONConverter().iter_features(ngi_records, nda_records):
+        count += 1
+    return count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ngi_path, nda_path = write_sheet(temp_dir, count)
+        print(f"{count} records, {os.cpu_count()} CPUs")
+        qgis = str(Path(sys.exec_prefix) / "qgis")
+        for mode in ("sequential", "threads", "processes", "spawned (QGIS)"):
+            executable = qgis if mode.startswith("spawned") else sys.executable
+            with patch.object(sys, "executable", executable):
+                start = time.perf_counter()
+                features = merge(ngi_path, nda_path, mode)
+                elapsed = time.perf_counter() - start
+            print(f"{mode:<16} {elapsed:7.2f} s  {features} features")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Time GeoPackage writes with each spatial index mode
+
+Run from the project root:
+
+    python -m benchmarks.benchmark_spatial_index [feature_count]
+
+Writes feature_count square building polygons to one layer with the
+native writer, and with the OGR writer when GDAL is installed.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from parsers.converters.native_geopackage_writer import NativeGeoPackageWriter
+
+
+def make_features(count):
+    side = int(count**0.5) + 1
+    for i in range(count):
+        x, y = 150000.0 + (i % side) * 20.0, 200000.0 + (i // side) * 20.0
+        ring = [[x, y], [x + 15.0, y], [x + 15.0, y + 12.0], [x, y + 12.0], [x, y]]
+        yield "B0014110", {
+            "type": "Feature",
+            "geometry": {"type": "Polygon", "coordinates": [ring]},
+            "properties": {"record_id": str(i + 1)},
+        }
+
+
+def writers():
+    for mode in ("immediate", "deferred", "none"):
+        yield f"native {mode}", NativeGeoPackageWriter(spatial_index=mode)
+    try:
+        from parsers.converters.geopackage_converter import GeoPackageConverter
+
+        for mode in ("immediate", "deferred", "none"):
+            yield f"ogr {mode}", GeoPackageConverter(spatial_index=mode)
+    except (ImportError, RuntimeError):
+        print("GDAL is not available, skipping the OGR writer")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = os.path.join(temp_dir, "benchmark.gpkg")
+        print(f"{count} polygons")
+        for name, writer in writers():
+            start = time.perf_counter()
+            writer.write_features(make_features(count), output_path)
+            elapsed = time.perf_counter() - start
+            size = os.path.getsize(output_path) / 1e6
+            print(f"{name:<20} {elapsed:7.2f} s  {size:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
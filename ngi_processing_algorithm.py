@@ -1,11 +1,17 @@
+from parsers.archive import archive_members, path_exists, sheet_stem
 from parsers.converters.geojson_converter import GeoJSONConverter
 from parsers.converters.geopackage_converter import GeoPackageConverter
 from parsers.nda_parser import NDAParser
 from parsers.ngi_parser import NGIParser
+from parsers.parse_cache import ParseCache
+from parsers.pipeline import find_nda
+from parsers.prefetch import prefetch
 from qgis.core import (  # type: ignore
     QgsProcessingAlgorithm,
     QgsProcessingParameterFile,
+    QgsProcessingParameterExtent,
     QgsProcessingParameterFileDestination,
+    QgsProcessingParameterString,
     QgsVectorLayer,
     QgsProject,
     QgsCoordinateReferenceSystem,
@@ -16,6 +22,8 @@ from pathlib import Path
 
 class NGIProcessingAlgorithm(QgsProcessingAlgorithm):
     INPUT_NGI = "INPUT_NGI"
+    LAYERS = "LAYERS"
+    AOI = "AOI"
     OUTPUT_GPKG = "OUTPUT_GPKG"
 
     def __init__(self):
@@ -42,7 +50,25 @@ class NGIProcessingAlgorithm(QgsProcessingAlgorithm):
     def initAlgorithm(self, config=None):
         self.addParameter(
             QgsProcessingParameterFile(
-                self.INPUT_NGI, self.tr("NGI File"), extension="ngi"
+                self.INPUT_NGI,
+                self.tr("NGI File"),
+                fileFilter="NGI files (*.ngi *.NGI *.ngi.gz *.zip);;All files (*.*)",
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.LAYERS,
+                self.tr("Layers to convert (comma separated names, empty for all)"),
+                optional=True,
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterExtent(
+                self.AOI,
+                self.tr("Area of interest (empty for the whole sheet)"),
+                optional=True,
             )
         )
 
@@ -54,6 +80,31 @@ class NGIProcessingAlgorithm(QgsProcessingAlgorithm):
             )
         )
 
+    def _report_layers(self, features, feedback):
+        """Passes features through, reporting the feature count of each layer"""
+        current_layer = None
+        count = 0
+        for layer_name, feature in features:
+            if feedback.isCanceled():
+                break
+            if layer_name != current_layer:
+                if current_layer is not None:
+                    feedback.pushInfo(f"Layer: {current_layer}, Feature count: {count}")
+                current_layer, count = layer_name, 0
+            count += 1
+            yield layer_name, feature
+
+        if current_layer is not None:
+            feedback.pushInfo(f"Layer: {current_layer}, Feature count: {count}")
+
+    def _report_parsed(self, records, label, feedback):
+        """Passes records through, reporting when the parser is done"""
+        count = 0
+        for record in records:
+            count += 1
+            yield record
+        feedback.pushInfo(f"{label} parsing finished: {count} records")
+
     def processAlgorithm(self, parameters, context, feedback):
         """Converts NGI/NDA files to GeoPackage and adds layers to map"""
         try:
@@ -62,56 +113,108 @@ class NGIProcessingAlgorithm(QgsProcessingAlgorithm):
             output_path = Path(
                 self.parameterAsFileOutput(parameters, self.OUTPUT_GPKG, context)
             )
-            nda_path = ngi_path.with_suffix(".nda")
+
+            # A zip file is read in place, as archive.zip!/sheet.ngi
+            if ngi_path.suffix.lower() == ".zip" and ngi_path.is_file():
+                members = archive_members(ngi_path, ".ngi")
+                if len(members) != 1:
+                    feedback.reportError(
+                        f"Expected one NGI file in {ngi_path}, found {len(members)}"
+                    )
+                    return {self.OUTPUT_GPKG: None}
+                ngi_path = Path(members[0])
+                feedback.pushInfo(f"Reading from archive: {ngi_path}")
 
             # Check input files existence
-            if not ngi_path.exists():
+            if not path_exists(ngi_path):
                 feedback.reportError(f"NGI file not found: {ngi_path}")
                 return {self.OUTPUT_GPKG: None}
-            if not nda_path.exists():
-                feedback.reportError(f"NDA file not found: {nda_path}")
+            nda_path = find_nda(ngi_path)
+            if nda_path is None:
+                feedback.reportError(f"NDA file not found for: {ngi_path}")
                 return {self.OUTPUT_GPKG: None}
 
+            # Selected layer names, None converts every layer
+            layer_names = self.parameterAsString(parameters, self.LAYERS, context)
+            layers = {
+                name.strip().strip('"')
+                for name in layer_names.replace(";", ",").split(",")
+                if name.strip()
+            } or None
+            if layers:
+                feedback.pushInfo(f"Selected layers: {', '.join(sorted(layers))}")
+
+            # Area of interest in the CRS of the map sheets
+            aoi = None
+            if parameters.get(self.AOI):
+                extent = self.parameterAsExtent(
+                    parameters,
+                    self.AOI,
+                    context,
+                    QgsCoordinateReferenceSystem("EPSG:5186"),
+                )
+                if not extent.isNull():
+                    aoi = (
+                        extent.xMinimum(),
+                        extent.yMinimum(),
+                        extent.xMaximum(),
+                        extent.yMaximum(),
+                    )
+                    # layers whose BOUND header misses the area are skipped
+                    layers = NGIParser().select_layers(str(ngi_path), layers, aoi)
+                    if not layers:
+                        feedback.reportError("No layer in the area of interest")
+                        return {self.OUTPUT_GPKG: None}
+                    feedback.pushInfo(f"Layers in the area of interest: {len(layers)}")
+
             # Create output directory
             output_path.parent.mkdir(parents=True, exist_ok=True)
 
             # Convert files and verify data structure
             feedback.pushInfo("Starting file conversion...")
 
-            ngi_parser = NGIParser()
-            nda_parser = NDAParser()
+            # Parsed records are cached per layer, so reopening a sheet does
+            # not parse it again
+            cache = ParseCache()
+            ngi_parser = NGIParser(compact=True, cache=cache)
+            nda_parser = NDAParser(cache=cache)
             geojson_converter = GeoJSONConverter()
             gpkg_converter = GeoPackageConverter()
 
-            feedback.pushInfo("Parsing NGI file...")
-            ngi_parsed = ngi_parser.parse_file(str(ngi_path))
-            feedback.pushInfo(f"NGI parsing result: {len(ngi_parsed)} layers")
-
-            feedback.pushInfo("Parsing NDA file...")
-            nda_parsed = nda_parser.parse_file(str(nda_path))
-            feedback.pushInfo(f"NDA parsing result: {len(nda_parsed)} layers")
+            # Both files are parsed concurrently in background threads and
+            # joined record by record as they arrive, so memory use does not
+            # grow with the size of the sheet. Both producers start before
+            # the first record is requested.
+            feedback.pushInfo("Parsing and merging NGI/NDA records...")
+            ngi_prefetch = prefetch(ngi_parser.iter_records, str(ngi_path), layers, aoi)
+            nda_prefetch = prefetch(
+                nda_parser.iter_records, str(nda_path), 10000, layers
+            )
+            try:
+                ngi_records = self._report_parsed(ngi_prefetch, "NGI", feedback)
+                nda_records = self._report_parsed(nda_prefetch, "NDA", feedback)
+                features = geojson_converter.iter_features(ngi_records, nda_records)
 
-            feedback.pushInfo("Merging data...")
-            geojson_data = geojson_converter.merge_data(ngi_parsed, nda_parsed)
+                # Column types come from the NDA field definitions, read with
+                # a parser of its own as nda_parser is used by the producer
+                layer_definitions = NDAParser().read_layer_definitions(str(nda_path))
 
-            # Verify GeoJSON data structure
-            for layer_name, features in geojson_data.items():
-                feedback.pushInfo(
-                    f"Layer: {layer_name}, Feature count: {len(features)}"
+                feedback.pushInfo("Creating GeoPackage...")
+                gpkg_converter.write_features(
+                    self._report_layers(features, feedback),
+                    str(output_path),
+                    layer_definitions,
                 )
-                if features:
-                    first_feature = next(iter(features.values()))
-                    feedback.pushInfo(f"Sample feature: {first_feature}")
-
-            feedback.pushInfo("Creating GeoPackage...")
-            gpkg_converter.convert_to_gpkg(geojson_data, str(output_path))
+            finally:
+                # stops the producers when writing fails or is canceled
+                ngi_prefetch.close()
+                nda_prefetch.close()
 
             # Check GeoPackage layers
             feedback.pushInfo("Adding layers to map...")
 
             # Create layer group name from input filename
-            input_file = self.parameterAsFile(parameters, self.INPUT_NGI, context)
-            group_name = Path(input_file).stem
+            group_name = sheet_stem(ngi_path)
 
             # Create layer group
             root = QgsProject.instance().layerTreeRoot()
@@ -1,13 +1,15 @@
 from .ngi_parser import NGIParser
 from .nda_parser import NDAParser
 from .field_parser import FieldParser
-from .converters.geojson_converter import GeoJSONConverter
-from .converters.geopackage_converter import GeoPackageConverter
+from .parse_cache import ParseCache
+from .converters import GeoJSONConverter, GeoPackageConverter, NativeGeoPackageWriter
 
 __all__ = [
     "NGIParser",
     "NDAParser",
     "FieldParser",
+    "ParseCache",
     "GeoJSONConverter",
     "GeoPackageConverter",
+    "NativeGeoPackageWriter",
 ]
@@ -0,0 +1,141 @@
+import gzip
+import io
+import re
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, List, Optional, TextIO, Tuple, Union
+
+__all__ = [
+    "split_archive_path",
+    "is_streamed",
+    "source_file",
+    "path_exists",
+    "open_binary",
+    "open_text",
+    "archive_members",
+    "sheet_stem",
+    "find_companion",
+]
+
+# "sheets.zip!/37612058.ngi": member 37612058.ngi of sheets.zip
+_MEMBER_PATH = re.compile(r"^(.*?\.zip)![/\\](.+)$", re.IGNORECASE)
+
+_BUFFER_SIZE = 1 << 20
+
+
+def split_archive_path(path: Union[str, Path]) -> Tuple[Path, Optional[str]]:
+    """(zip file, member name) of an archive member path, (path, None) otherwise"""
+    match = _MEMBER_PATH.match(str(path))
+    if match is None:
+        return Path(path), None
+    return Path(match.group(1)), match.group(2).replace("\\", "/")
+
+
+def _is_gzip(path: Union[str, Path]) -> bool:
+    return str(path).lower().endswith(".gz")
+
+
+def is_streamed(path: Union[str, Path]) -> bool:
+    """Whether a path is read by decompressing, a zip member or a .gz file
+
+    Such files cannot be memory mapped; they are read front to back and
+    seeking means decompressing up to the new position.
+    """
+    return split_archive_path(path)[1] is not None or _is_gzip(path)
+
+
+def source_file(path: Union[str, Path]) -> Path:
+    """The file on disk holding path, the zip file of a member"""
+    return split_archive_path(path)[0]
+
+
+def path_exists(path: Union[str, Path]) -> bool:
+    """Path.exists() that also looks up zip members"""
+    archive, member = split_archive_path(path)
+    if member is None:
+        return archive.exists()
+    try:
+        with zipfile.ZipFile(archive) as zf:
+            zf.getinfo(member)
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return False
+    return True
+
+
+def open_binary(path: Union[str, Path]) -> BinaryIO:
+    """Open a plain file, zip member or .gz file for buffered binary reading
+
+    Compressed data is decompressed while it is read, nothing is extracted.
+    """
+    archive, member = split_archive_path(path)
+    if member is not None:
+        with zipfile.ZipFile(archive) as zf:
+            # the member keeps the archive file open after zf is closed
+            stream = zf.open(member)
+        # ZipExtFile reads lines in Python, BufferedReader does it in C
+        return io.BufferedReader(stream, _BUFFER_SIZE)
+    if _is_gzip(archive):
+        return gzip.open(archive, "rb")
+    return open(archive, "rb")
+
+
+def open_text(path: Union[str, Path], encoding: str) -> TextIO:
+    """open_binary() decoding text with encoding"""
+    return io.TextIOWrapper(open_binary(path), encoding=encoding)
+
+
+def archive_members(archive: Union[str, Path], suffix: str) -> List[str]:
+    """Paths of the members of a zip file with suffix (any case)"""
+    with zipfile.ZipFile(archive) as zf:
+        names = zf.namelist()
+    return [
+        f"{archive}!/{name}"
+        for name in sorted(names)
+        if name.lower().endswith(suffix.lower())
+    ]
+
+
+def _strip_gz(name: str) -> str:
+    return name[:-3] if _is_gzip(name) else name
+
+
+def sheet_stem(path: Union[str, Path]) -> str:
+    """Name of a sheet file without its suffix, or its .ngi.gz style suffixes"""
+    _, member = split_archive_path(path)
+    name = member.rsplit("/", 1)[-1] if member else Path(path).name
+    return Path(_strip_gz(name)).stem
+
+
+def find_companion(path: Union[str, Path], suffix: str) -> Optional[str]:
+    """The file of the same sheet with another suffix (any case)
+
+    A zip member is paired with a member of the same archive, other files
+    with a plain or .gz file next to them.
+    """
+    archive, member = split_archive_path(path)
+    suffix = suffix.lower()
+    if member is not None:
+        stem = member.rpartition(".")[0].lower()
+        with zipfile.ZipFile(archive) as zf:
+            names = zf.namelist()
+        for candidate in sorted(names):
+            base, dot, candidate_suffix = candidate.rpartition(".")
+            if (
+                dot
+                and base.lower() == stem
+                and f".{candidate_suffix.lower()}" == suffix
+            ):
+                return f"{archive}!/{candidate}"
+        return None
+
+    stem = sheet_stem(archive)
+    candidates = archive.parent.glob(f"{stem}.*")
+    for candidate in sorted(candidates, key=lambda p: (_is_gzip(p), p.name)):
+        name = _strip_gz(candidate.name)
+        if (
+            Path(name).stem == stem
+            and name.lower().endswith(suffix)
+            and candidate.is_file()
+        ):
+            return str(candidate)
+    return None
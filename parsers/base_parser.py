@@ -1,13 +1,19 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, List, Optional, Sequence
 import logging
 from pathlib import Path
+from .archive import open_text, path_exists
+from .parse_cache import ParseCache
 from .types import LayerDefinition, GeoFeature
 
 
 class BaseParser(ABC):
-    def __init__(self, encoding: str = "cp949") -> None:
+    def __init__(
+        self, encoding: str = "cp949", cache: Optional[ParseCache] = None
+    ) -> None:
+        """cache, when given, stores and reuses parse_file results"""
         self.encoding = encoding
+        self.cache = cache
         self.logger = logging.getLogger(self.__class__.__name__)
 
     @abstractmethod
@@ -20,10 +26,31 @@ class BaseParser(ABC):
         """Get layer metadata including field definitions"""
         pass
 
+    def _cached_parse(
+        self, file_path: Path, options: Sequence[Any], parse: Callable[[], Any]
+    ) -> Any:
+        """Return parse(), from the cache when the file was parsed before
+
+        options are the settings the result depends on besides the file
+        content, the parser class and the encoding.
+        """
+        if self.cache is None:
+            return parse()
+        if not path_exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        key = self.cache.key(
+            file_path, self.__class__.__name__, self.encoding, *options
+        )
+        result = self.cache.get(key)
+        if result is None:
+            result = parse()
+            self.cache.put(key, result)
+        return result
+
     def _read_file_lines(self, file_path: Path) -> List[str]:
         """safely read file"""
         try:
-            with open(file_path, "r", encoding=self.encoding) as f:
+            with open_text(file_path, self.encoding) as f:
                 return [line.strip() for line in f]
         except UnicodeDecodeError:
             self.logger.error(f"file encoding error: {file_path}")
@@ -32,6 +59,14 @@ class BaseParser(ABC):
             self.logger.error(f"file read error: {file_path}, {str(e)}")
             raise
 
+    def _decode(self, value: bytes) -> str:
+        """decode a raw byte value read by a ByteScanner"""
+        try:
+            return value.decode(self.encoding)
+        except UnicodeDecodeError:
+            self.logger.error(f"value encoding error: {value!r}")
+            raise
+
     def _validate_feature(self, feature: GeoFeature) -> bool:
         """feature data validation"""
         if not isinstance(feature, dict):
@@ -0,0 +1,106 @@
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, TypedDict, Union
+
+from .archive import path_exists
+from .nda_parser import NDAParser
+from .ngi_parser import NGIParser
+from .pipeline import find_nda
+from .scanner import ByteScanner
+from .types import FieldDefinition
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["LayerInfo", "SheetInfo", "inspect", "inspect_file"]
+
+
+class LayerInfo(TypedDict):
+    name: str
+    geometry_type: Optional[str]  # from MASK(...), NGI only
+    bounds: Optional[List[float]]  # BOUND(min_x, min_y, max_x, max_y), NGI only
+    fields: List[FieldDefinition]  # $ASPATIAL_FIELD_DEF, NDA only
+    record_count: int  # $RECORD entries of the file
+
+
+class SheetInfo(TypedDict):
+    ngi_path: str
+    nda_path: Optional[str]
+    layers: List[LayerInfo]
+
+
+def inspect_file(
+    file_path: Union[str, Path], encoding: str = "cp949"
+) -> List[LayerInfo]:
+    """Layer headers and record counts of an NGI or NDA file
+
+    Only the header of each layer is read and parsed; data sections are
+    neither copied nor parsed, their $RECORD markers are counted with a
+    byte search of the memory map.
+    """
+    file_path = Path(file_path)
+    if not path_exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    ngi_parser = NGIParser(encoding)
+    nda_parser = NDAParser(encoding)
+
+    layers = []
+    with ByteScanner(file_path) as scanner:
+        for start, end, name in scanner.layers(encoding):
+            header = scanner.header(start, end)
+            lines = [line.strip() for line in header.decode(encoding).splitlines()]
+
+            layer = LayerInfo(
+                name=name, geometry_type=None, bounds=None, fields=[], record_count=0
+            )
+            for i, line in enumerate(lines):
+                if line == "$GEOMETRIC_METADATA":
+                    try:
+                        geometry_type, _ = ngi_parser.parse_geometry_type(lines, i)
+                        layer["geometry_type"] = geometry_type.value
+                    except ValueError as e:
+                        logger.warning(f"Layer {name}: {e}")
+                elif line.startswith("BOUND("):
+                    bounds, _ = ngi_parser.parse_bounds(lines, i)
+                    layer["bounds"] = bounds or None
+                elif line.startswith("ATTRIB("):
+                    try:
+                        _, field = nda_parser.parse_field_definition(line)
+                        layer["fields"].append(field)
+                    except (IndexError, ValueError):
+                        logger.warning(f"Layer {name}: invalid field {line}")
+
+            data = start + len(header)
+            if data < end:
+                layer["record_count"] = scanner.count_lines(b"$RECORD", data, end)
+            layers.append(layer)
+    return layers
+
+
+def inspect(
+    ngi_path: Union[str, Path],
+    nda_path: Optional[Union[str, Path]] = None,
+    encoding: str = "cp949",
+) -> SheetInfo:
+    """Catalog entry of a map sheet, read from its file headers
+
+    Geometry types, bounds and record counts come from the NGI file and
+    field schemas from the NDA file, by default the one next to it.
+    """
+    ngi_path = Path(ngi_path)
+    nda_file = Path(nda_path) if nda_path else find_nda(ngi_path)
+
+    layers = inspect_file(ngi_path, encoding)
+    if nda_file is not None:
+        nda_layers: Dict[str, LayerInfo] = {
+            layer["name"]: layer for layer in inspect_file(nda_file, encoding)
+        }
+        for layer in layers:
+            nda_layer = nda_layers.get(layer["name"])
+            if nda_layer is not None:
+                layer["fields"] = nda_layer["fields"]
+
+    return SheetInfo(
+        ngi_path=str(ngi_path),
+        nda_path=str(nda_file) if nda_file is not None else None,
+        layers=layers,
+    )
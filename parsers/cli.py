@@ -0,0 +1,454 @@
+"""Command line conversion of NGI/NDA map sheets, usable without QGIS
+
+python -m parsers.cli convert sheets/ -o out/ --jobs 8 --timeout 600
+python -m parsers.cli inspect sheets/ --json catalog.json
+"""
+
+import argparse
+import glob
+import json
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .archive import archive_members, path_exists, sheet_stem, split_archive_path
+from .catalog import inspect
+from .converters.base_converter import SPATIAL_INDEX_MODES
+from .pipeline import OUTPUT_FORMATS, convert_sheet, find_nda
+
+logger = logging.getLogger(__name__)
+
+# without it (Windows) sheet time limits are enforced by the parent process
+_HAS_ALARM = hasattr(signal, "SIGALRM")
+
+
+class SheetTimeout(Exception):
+    """Raised inside a worker when a sheet exceeds its time limit"""
+
+
+def _sheet_files(path: Path) -> List[Path]:
+    """NGI files of a file: itself, or the NGI members of a zip file"""
+    name = path.name.lower()
+    if name.endswith(".ngi") or name.endswith(".ngi.gz"):
+        return [path.resolve()]
+    if name.endswith(".zip"):
+        return [Path(member) for member in archive_members(path.resolve(), ".ngi")]
+    return []
+
+
+def collect_ngi_files(inputs: Iterable[str], recursive: bool = False) -> List[Path]:
+    """Expand files, directories and glob patterns into NGI files
+
+    Directories contribute their *.ngi and *.ngi.gz files (any suffix case)
+    and the NGI members of their zip files, which are also accepted one by
+    one as archive.zip!/sheet.ngi. Results are sorted and without
+    duplicates.
+    """
+    found = set()
+    for item in inputs:
+        if split_archive_path(item)[1] is not None:
+            if path_exists(item):
+                archive, member = split_archive_path(item)
+                found.add(Path(f"{archive.resolve()}!/{member}"))
+            continue
+        paths = [Path(p) for p in glob.glob(item, recursive=recursive)]
+        if not paths and Path(item).exists():
+            paths = [Path(item)]
+        for path in paths:
+            if path.is_dir():
+                candidates = path.rglob("*") if recursive else path.iterdir()
+                for candidate in candidates:
+                    if candidate.is_file():
+                        found.update(_sheet_files(candidate))
+            elif path.is_file():
+                found.update(_sheet_files(path))
+    return sorted(found)
+
+
+def _on_timeout(signum, frame):
+    raise SheetTimeout()
+
+
+def _convert_task(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert one sheet in a worker, never raising
+
+    Output is written to a temporary directory (work_dir, created here
+    unless given) and moved next to output_path only on success, so failed
+    or timed out sheets leave no partial files. Incremental updates of an
+    existing GeoPackage happen in place, layer by layer, and an interrupted
+    one is completed by the next run. The time limit relies on SIGALRM;
+    where it is missing run_conversions() enforces it instead.
+    """
+    start = time.perf_counter()
+    timeout = task.pop("timeout", None)
+    output_path = Path(task["output_path"])
+    in_place = task.get("incremental") and output_path.exists()
+    work_dir = task.pop("work_dir", None) or tempfile.mkdtemp(
+        prefix=".partial-", dir=output_path.parent
+    )
+    work_dir = Path(work_dir)
+    use_alarm = bool(timeout) and _HAS_ALARM
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        if in_place:
+            result = convert_sheet(**task)
+        else:
+            result = convert_sheet(
+                **{**task, "output_path": work_dir / output_path.name}
+            )
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        for path in work_dir.iterdir():
+            os.replace(path, output_path.parent / path.name)
+        return {**result, "output_path": str(output_path), "error": None}
+    except SheetTimeout:
+        error = f"timed out after {timeout} s"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return _failed_result(task, time.perf_counter() - start, error)
+
+
+def _failed_result(task: Dict[str, Any], seconds: float, error: str) -> Dict[str, Any]:
+    return {
+        "ngi_path": task["ngi_path"],
+        "nda_path": task.get("nda_path"),
+        "output_path": task["output_path"],
+        "layers": {},
+        "unchanged": [],
+        "seconds": seconds,
+        "error": error,
+    }
+
+
+def _convert_in_process(task: Dict[str, Any], connection: Any) -> None:
+    connection.send(_convert_task(task))
+    connection.close()
+
+
+def _run_with_deadlines(
+    tasks: Sequence[Dict[str, Any]], jobs: int = 1
+) -> Iterable[Dict[str, Any]]:
+    """Convert every task in a process of its own, killed after its timeout
+
+    The parent keeps the time limits, so they hold without SIGALRM. The
+    temporary directory of a killed sheet is removed here.
+    """
+    pending = list(enumerate(tasks))
+    # task index -> (process, connection, work_dir, start)
+    running: Dict[int, Tuple[Any, Any, str, float]] = {}
+    results: Dict[int, Dict[str, Any]] = {}
+    next_index = 0
+    while next_index < len(tasks):
+        while pending and len(running) < jobs:
+            index, task = pending.pop(0)
+            work_dir = tempfile.mkdtemp(
+                prefix=".partial-", dir=Path(task["output_path"]).parent
+            )
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(
+                target=_convert_in_process,
+                args=({**task, "timeout": None, "work_dir": work_dir}, sender),
+                daemon=True,
+            )
+            process.start()
+            sender.close()
+            running[index] = (process, receiver, work_dir, time.perf_counter())
+
+        deadlines = {
+            index: start + (tasks[index].get("timeout") or float("inf"))
+            for index, (_, _, _, start) in running.items()
+        }
+        wait = min(deadlines.values()) - time.perf_counter()
+        ready = multiprocessing.connection.wait(
+            [receiver for _, receiver, _, _ in running.values()],
+            timeout=max(wait, 0.0) if wait != float("inf") else None,
+        )
+        for index, (process, receiver, work_dir, start) in list(running.items()):
+            if receiver in ready:
+                try:
+                    results[index] = receiver.recv()
+                except EOFError:
+                    results[index] = _failed_result(
+                        tasks[index],
+                        time.perf_counter() - start,
+                        f"worker exited with code {process.exitcode}",
+                    )
+            elif time.perf_counter() >= deadlines[index]:
+                process.terminate()
+                results[index] = _failed_result(
+                    tasks[index],
+                    time.perf_counter() - start,
+                    f"timed out after {tasks[index]['timeout']} s",
+                )
+            else:
+                continue
+            process.join()
+            receiver.close()
+            shutil.rmtree(work_dir, ignore_errors=True)
+            del running[index]
+
+        while next_index in results:
+            yield results.pop(next_index)
+            next_index += 1
+
+
+def run_conversions(
+    tasks: Sequence[Dict[str, Any]], jobs: int = 1
+) -> Iterable[Dict[str, Any]]:
+    """Yield the result of every task, in task order"""
+    if not _HAS_ALARM and any(task.get("timeout") for task in tasks):
+        yield from _run_with_deadlines(tasks, jobs)
+        return
+    if jobs <= 1:
+        for task in tasks:
+            yield _convert_task(dict(task))
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(_convert_task, [dict(task) for task in tasks])
+
+
+def _convert_command(args: argparse.Namespace) -> int:
+    ngi_files = collect_ngi_files(args.inputs, args.recursive)
+    if not ngi_files:
+        print("No NGI files found", file=sys.stderr)
+        return 2
+
+    if args.incremental and args.format != "gpkg":
+        print("--incremental needs GeoPackage output", file=sys.stderr)
+        return 2
+
+    output_dir = Path(args.output)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    suffix = OUTPUT_FORMATS[args.format]
+    # sheets of the same name in different directories or archives would
+    # overwrite each other's output, and race on it with --jobs
+    sources: Dict[Path, List[Path]] = {}
+    for ngi_path in ngi_files:
+        output_path = output_dir / f"{sheet_stem(ngi_path)}{suffix}"
+        sources.setdefault(output_path, []).append(ngi_path)
+    duplicates = {path: paths for path, paths in sources.items() if len(paths) > 1}
+    if duplicates:
+        for output_path, paths in duplicates.items():
+            print(
+                f"{output_path} would be written by several sheets: "
+                + ", ".join(str(path) for path in paths),
+                file=sys.stderr,
+            )
+        return 2
+
+    tasks = []
+    for output_path, (ngi_path,) in sources.items():
+        nda_path = find_nda(ngi_path)
+        tasks.append(
+            {
+                "ngi_path": str(ngi_path),
+                "nda_path": str(nda_path) if nda_path else None,
+                "output_path": str(output_path),
+                "output_format": args.format,
+                "writer": args.writer,
+                "spatial_index": args.spatial_index,
+                "layers": args.layers,
+                "incremental": args.incremental,
+                "aoi": args.aoi,
+                "cache_dir": args.cache_dir,
+                "timeout": args.timeout,
+            }
+        )
+
+    start = time.perf_counter()
+    results = []
+    for result in run_conversions(tasks, args.jobs):
+        results.append(result)
+        features = sum(result["layers"].values())
+        if result["error"] is None:
+            unchanged = (
+                f", {len(result['unchanged'])} unchanged" if result["unchanged"] else ""
+            )
+            print(
+                f"[{len(results)}/{len(tasks)}] {result['ngi_path']}: "
+                f"{len(result['layers'])} layers, {features} features{unchanged} "
+                f"in {result['seconds']:.1f} s"
+            )
+        else:
+            print(
+                f"[{len(results)}/{len(tasks)}] {result['ngi_path']}: "
+                f"FAILED ({result['error']})"
+            )
+    elapsed = time.perf_counter() - start
+
+    failed = [result for result in results if result["error"] is not None]
+    total_features = sum(sum(result["layers"].values()) for result in results)
+    print(
+        f"\nConverted {len(results) - len(failed)}/{len(results)} sheets, "
+        f"{total_features} features in {elapsed:.1f} s"
+    )
+    for result in failed:
+        print(f"  failed: {result['ngi_path']}: {result['error']}")
+
+    if args.report:
+        report = {
+            "elapsed": elapsed,
+            "converted": len(results) - len(failed),
+            "failed": len(failed),
+            "sheets": results,
+        }
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    return 1 if failed else 0
+
+
+def _inspect_command(args: argparse.Namespace) -> int:
+    ngi_files = collect_ngi_files(args.inputs, args.recursive)
+    if not ngi_files:
+        print("No NGI files found", file=sys.stderr)
+        return 2
+
+    sheets = []
+    failed = 0
+    for ngi_path in ngi_files:
+        try:
+            sheet = inspect(ngi_path)
+        except (OSError, ValueError) as e:
+            failed += 1
+            print(f"{ngi_path}: FAILED ({e})")
+            continue
+        sheets.append(sheet)
+        if args.json:
+            continue
+        print(f"{sheet['ngi_path']}")
+        for layer in sheet["layers"]:
+            bounds = layer["bounds"]
+            extent = ", ".join(f"{v:.2f}" for v in bounds) if bounds else "-"
+            print(
+                f"  {layer['name']}: {layer['geometry_type'] or '-'}, "
+                f"{layer['record_count']} records, {len(layer['fields'])} fields, "
+                f"bounds {extent}"
+            )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(sheets, f, ensure_ascii=False, indent=2)
+        print(f"Catalogued {len(sheets)}/{len(ngi_files)} sheets to {args.json}")
+    return 1 if failed else 0
+
+
+def _parse_aoi(value: str) -> Tuple[float, float, float, float]:
+    try:
+        min_x, min_y, max_x, max_y = (float(v) for v in value.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"expected MINX,MINY,MAXX,MAXY, got {value!r}"
+        ) from None
+    if min_x > max_x or min_y > max_y:
+        raise argparse.ArgumentTypeError(f"empty area: {value!r}")
+    return min_x, min_y, max_x, max_y
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ngi-convert", description="Convert NGI/NDA map sheets"
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="count", default=0, help="More log output"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert = subparsers.add_parser(
+        "convert", help="Convert NGI files (and their NDA files)"
+    )
+    convert.add_argument(
+        "inputs", nargs="+", help="NGI files, directories or glob patterns"
+    )
+    convert.add_argument("-o", "--output", required=True, help="Output directory")
+    convert.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes (default: number of CPUs)",
+    )
+    convert.add_argument(
+        "--timeout", type=float, default=None, help="Time limit per sheet in seconds"
+    )
+    convert.add_argument("-f", "--format", choices=list(OUTPUT_FORMATS), default="gpkg")
+    convert.add_argument(
+        "--writer",
+        choices=["native", "ogr"],
+        default="native",
+        help="GeoPackage writer (default: native, does not need GDAL)",
+    )
+    convert.add_argument(
+        "--spatial-index", choices=list(SPATIAL_INDEX_MODES), default="deferred"
+    )
+    convert.add_argument(
+        "--layers",
+        type=lambda value: [name.strip() for name in value.split(",") if name.strip()],
+        default=None,
+        help="Comma separated names of the layers to convert (default: all)",
+    )
+    convert.add_argument(
+        "-r", "--recursive", action="store_true", help="Search directories recursively"
+    )
+    convert.add_argument(
+        "--aoi",
+        type=_parse_aoi,
+        default=None,
+        metavar="MINX,MINY,MAXX,MAXY",
+        help="Convert only features intersecting this area (EPSG:5186)",
+    )
+    convert.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Update existing GeoPackages, converting only changed layers",
+    )
+    convert.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Cache parsed records here and reuse them for unchanged sheets",
+    )
+    convert.add_argument("--report", help="Write a JSON report to this file")
+    convert.set_defaults(func=_convert_command)
+
+    inspect_parser = subparsers.add_parser(
+        "inspect", help="List the layers of NGI files, reading only their headers"
+    )
+    inspect_parser.add_argument(
+        "inputs", nargs="+", help="NGI files, directories or glob patterns"
+    )
+    inspect_parser.add_argument(
+        "-r", "--recursive", action="store_true", help="Search directories recursively"
+    )
+    inspect_parser.add_argument(
+        "--json", metavar="FILE", help="Write the catalog as JSON to this file"
+    )
+    inspect_parser.set_defaults(func=_inspect_command)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    level = {0: logging.WARNING, 1: logging.INFO}.get(args.verbose, logging.DEBUG)
+    logging.basicConfig(level=level, format="%(levelname)s %(name)s: %(message)s")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
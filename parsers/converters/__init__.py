@@ -1,4 +1,15 @@
 from .geojson_converter import GeoJSONConverter
-from .geopackage_converter import GeoPackageConverter
+from .geojson_writer import GeoJSONWriter
+from .native_geopackage_writer import NativeGeoPackageWriter
 
-__all__ = ["GeoJSONConverter", "GeoPackageConverter"]
+try:
+    from .geopackage_converter import GeoPackageConverter
+except ImportError:  # GDAL is optional, NativeGeoPackageWriter works without it
+    GeoPackageConverter = None
+
+__all__ = [
+    "GeoJSONConverter",
+    "GeoJSONWriter",
+    "GeoPackageConverter",
+    "NativeGeoPackageWriter",
+]
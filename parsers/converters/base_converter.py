@@ -1,7 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, List, Mapping, Optional
 from pathlib import Path
 import logging
+from ..types import FieldDefinition, LayerDefinition
+
+# "deferred" builds the spatial index after the last feature, "immediate"
+# maintains it while inserting and "none" leaves it out
+SPATIAL_INDEX_MODES = ("deferred", "immediate", "none")
+
 
 class BaseConverter(ABC):
     def __init__(self) -> None:
@@ -14,4 +20,61 @@ class BaseConverter(ABC):
 
     def _ensure_output_dir(self, output_path: Path) -> None:
         """Ensure output directory exists"""
-        output_path.parent.mkdir(parents=True, exist_ok=True)
\ No newline at end of file
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _layer_fields(
+        self,
+        first_feature: Dict[str, Any],
+        layer_definition: Optional[LayerDefinition] = None,
+    ) -> List[FieldDefinition]:
+        """Fields of an output layer
+
+        Declared fields come first with their types, followed by string
+        fields for any other property of the first feature (e.g. record_id).
+        """
+        fields = list(layer_definition["fields"]) if layer_definition else []
+        declared = {field["name"] for field in fields}
+        for field_name in first_feature.get("properties", {}):
+            if field_name not in declared:
+                fields.append(
+                    FieldDefinition(
+                        name=field_name,
+                        type="STRING",
+                        width=254,
+                        precision=0,
+                        nullable=True,
+                    )
+                )
+        return fields
+
+    def _table_name(self, layer_name: str) -> str:
+        """Output table name of a layer, without special characters"""
+        return "".join(c for c in layer_name if c.isalnum() or c in ("_",))
+
+    def _unique_table_name(self, layer_name: str, tables: Mapping[str, str]) -> str:
+        """Table name of a layer, unique among the tables of a GeoPackage
+
+        tables maps the gpkg_contents identifiers of the file, which are
+        layer names, to their tables. A layer keeps the table it was
+        written to before. Otherwise layer names that become the same table
+        name without special characters, or differ only in case, get a
+        numeric suffix instead of replacing each other's table.
+        """
+        table_name = tables.get(layer_name)
+        if table_name is not None:
+            return table_name
+        base_name = self._table_name(layer_name)
+        if not base_name:
+            return base_name
+        taken = {name.lower() for name in tables.values()}
+        table_name = base_name
+        suffix = 1
+        while table_name.lower() in taken:
+            suffix += 1
+            table_name = f"{base_name}_{suffix}"
+        if table_name != base_name:
+            self.logger.warning(
+                f"Layer {layer_name} is written to table {table_name}, "
+                f"{base_name} is used by another layer"
+            )
+        return table_name
@@ -1,12 +1,60 @@
 from .base_converter import BaseConverter
-from typing import Dict, Any
-import json
+from .geojson_writer import GeoJSONWriter
+from ..merge_join import merge_records
+from ..nda_parser import NDAParser
+from ..ngi_parser import NGIParser
+from ..scanner import ByteScanner
+from ..types import GeoFeature
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple
 import logging
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
 
+class LayerWriteError(RuntimeError):
+    """Raised after a parallel save when one or more layers failed
+
+    errors maps each failed layer name to its exception.
+    """
+
+    def __init__(self, errors: Dict[str, BaseException]) -> None:
+        self.errors = errors
+        details = "; ".join(f"{name}: {error!r}" for name, error in errors.items())
+        super().__init__(f"Failed to write {len(errors)} layer(s): {details}")
+
+
+def _write_sheet_layer(
+    ngi_path: str,
+    nda_path: Optional[str],
+    layer_name: str,
+    output_path: Path,
+    seq: bool,
+    precision: Optional[int],
+    backend: str,
+) -> int:
+    """Parse one layer of a sheet and write its file, run in a worker process
+
+    Only the paths and the layer name are sent to the worker, which reads
+    the layer's sections of the NGI and NDA files itself.
+    """
+    ngi_records = NGIParser(compact=True).iter_records(ngi_path, [layer_name])
+    nda_records = (
+        NDAParser().iter_records(nda_path, layers=[layer_name]) if nda_path else ()
+    )
+    writer = None
+    try:
+        for _, feature in GeoJSONConverter().iter_features(ngi_records, nda_records):
+            if writer is None:
+                writer = GeoJSONWriter(output_path, seq, precision, backend)
+            writer.write(feature)
+    finally:
+        if writer is not None:
+            writer.close()
+    return writer.count if writer is not None else 0
+
+
 class GeoJSONConverter(BaseConverter):
     def __init__(self) -> None:
         super().__init__()
@@ -57,28 +105,148 @@ class GeoJSONConverter(BaseConverter):
 
         return merged_layers
 
-    def save_geojson(
-        self, geojson_layers: Dict[str, Dict[str, Any]], output_base_path: str
-    ) -> None:
-        """Save GeoJSON data to separate files by layer"""
+    def iter_features(
+        self,
+        ngi_records: Iterable[Tuple[str, str, Any]],
+        nda_records: Iterable[Tuple[str, str, Dict[str, Any]]],
+    ) -> Iterator[Tuple[str, GeoFeature]]:
+        """Merge NGI and NDA record streams into (layer_name, feature) pairs
+
+        Streaming counterpart of merge_data, fed by NGIParser.iter_records and
+        NDAParser.iter_records, holding a bounded number of records in memory.
+        """
+        for layer_name, record_id, geometry, properties in merge_records(
+            ngi_records, nda_records
+        ):
+            feature = {
+                "type": "Feature",
+                "geometry": geometry,
+                "properties": {**properties, "record_id": record_id},
+            }
+            yield layer_name, feature
+
+    def _layer_output_path(
+        self, output_base_path: str, layer_name: str, seq: bool = False
+    ) -> Path:
+        """Output file of a layer: <base>_<layer>.geojson (.geojsons for seq)"""
         output_dir = Path(output_base_path).parent
         output_base = Path(output_base_path).stem
 
+        # Create safe filename from layer name
+        safe_layer_name = "".join(
+            c for c in layer_name if c.isalnum() or c in (" ", "-", "_")
+        ).strip()
+        suffix = ".geojsons" if seq else ".geojson"
+        return output_dir / f"{output_base}_{safe_layer_name}{suffix}"
+
+    def write_features(
+        self,
+        features: Iterable[Tuple[str, GeoFeature]],
+        output_base_path: str,
+        seq: bool = False,
+        precision: Optional[int] = None,
+        backend: str = "auto",
+    ) -> None:
+        """Stream (layer_name, feature) pairs to one GeoJSON file per layer
+
+        Features are written as they arrive, see GeoJSONWriter for seq,
+        precision and backend.
+        """
         # Ensure output directory exists
-        self._ensure_output_dir(output_dir)
-
-        for layer_name, layer_data in geojson_layers.items():
-            # Skip empty layers
-            if not layer_data["features"]:
-                self.logger.warning(f"Skipping empty layer: {layer_name}")
-                continue
-
-            # Create safe filename from layer name
-            safe_layer_name = "".join(
-                c for c in layer_name if c.isalnum() or c in (" ", "-", "_")
-            ).strip()
-            output_path = output_dir / f"{output_base}_{safe_layer_name}.geojson"
-
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(layer_data, f, ensure_ascii=False, indent=2)
-                self.logger.info(f"Layer '{layer_name}' saved to {output_path}")
+        self._ensure_output_dir(Path(output_base_path))
+
+        writers: Dict[str, GeoJSONWriter] = {}
+        try:
+            for layer_name, feature in features:
+                writer = writers.get(layer_name)
+                if writer is None:
+                    output_path = self._layer_output_path(
+                        output_base_path, layer_name, seq
+                    )
+                    writer = GeoJSONWriter(output_path, seq, precision, backend)
+                    writers[layer_name] = writer
+                writer.write(feature)
+        finally:
+            for layer_name, writer in writers.items():
+                writer.close()
+                self.logger.info(
+                    f"Layer '{layer_name}' saved to {writer.output_path} "
+                    f"({writer.count} features)"
+                )
+
+    def save_geojson(
+        self,
+        geojson_layers: Dict[str, Dict[str, Any]],
+        output_base_path: str,
+        seq: bool = False,
+        precision: Optional[int] = None,
+        backend: str = "auto",
+    ) -> None:
+        """Save GeoJSON data to separate files by layer"""
+
+        def iter_features():
+            for layer_name, layer_data in geojson_layers.items():
+                # Skip empty layers
+                if not layer_data["features"]:
+                    self.logger.warning(f"Skipping empty layer: {layer_name}")
+                    continue
+                for feature in layer_data["features"]:
+                    yield layer_name, feature
+
+        self.write_features(iter_features(), output_base_path, seq, precision, backend)
+
+    def write_sheet(
+        self,
+        ngi_path: str,
+        nda_path: Optional[str],
+        output_base_path: str,
+        seq: bool = False,
+        precision: Optional[int] = None,
+        backend: str = "auto",
+        workers: int = 2,
+    ) -> None:
+        """Convert the layers of an NGI/NDA sheet to GeoJSON files in parallel
+
+        Every layer is parsed, merged and written by a worker process of its
+        own, which is sent only the file paths and the layer name. Each file
+        holds the same bytes as with write_features(); a failing layer does
+        not stop the others and all failures are raised together as a
+        LayerWriteError once every layer is done. Zip members and .gz files
+        cannot be read by layer and should go through write_features().
+        """
+        self._ensure_output_dir(Path(output_base_path))
+        with ByteScanner(ngi_path) as scanner:
+            layer_names = list(
+                dict.fromkeys(name for _, _, name in scanner.layers())
+            )
+
+        errors: Dict[str, BaseException] = {}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = []
+            for layer_name in layer_names:
+                output_path = self._layer_output_path(output_base_path, layer_name, seq)
+                future = executor.submit(
+                    _write_sheet_layer,
+                    str(ngi_path),
+                    str(nda_path) if nda_path else None,
+                    layer_name,
+                    output_path,
+                    seq,
+                    precision,
+                    backend,
+                )
+                futures.append((layer_name, output_path, future))
+
+            for layer_name, output_path, future in futures:
+                try:
+                    count = future.result()
+                except Exception as e:
+                    self.logger.error(f"Failed to write layer '{layer_name}': {e}")
+                    errors[layer_name] = e
+                    continue
+                self.logger.info(
+                    f"Layer '{layer_name}' saved to {output_path} ({count} features)"
+                )
+
+        if errors:
+            raise LayerWriteError(errors)
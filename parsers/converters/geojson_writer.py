@@ -0,0 +1,117 @@
+import json
+import logging
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from ..types import CompactGeometry
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the json module is used instead
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["GeoJSONWriter"]
+
+JSON_BACKENDS = ("auto", "json", "orjson")
+
+_RECORD_SEPARATOR = b"\x1e"  # RFC 8142 text sequence record prefix
+
+
+def _geo_interface(obj: Any) -> Dict[str, Any]:
+    """json default hook for geometries exposing __geo_interface__"""
+    if hasattr(obj, "__geo_interface__"):
+        return obj.__geo_interface__
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _round_coordinates(coordinates: Any, precision: int) -> Any:
+    if len(coordinates) and isinstance(coordinates[0], (int, float)):
+        return [round(value, precision) for value in coordinates]
+    return [_round_coordinates(part, precision) for part in coordinates]
+
+
+def _round_geometry(geometry: Any, precision: int) -> Any:
+    """Copy of a geometry with coordinates rounded to precision decimals"""
+    if isinstance(geometry, CompactGeometry):
+        coords = array("d", [round(value, precision) for value in geometry.coords])
+        return CompactGeometry(
+            geometry.type, coords, geometry.offsets, geometry.properties
+        )
+    if not isinstance(geometry, dict):
+        geometry = _geo_interface(geometry)
+    return {
+        **geometry,
+        "coordinates": _round_coordinates(geometry["coordinates"], precision),
+    }
+
+
+class GeoJSONWriter:
+    """Writes GeoJSON features to a file one at a time
+
+    Features go either into a single FeatureCollection, or with seq=True
+    into a GeoJSON text sequence (RFC 8142: one record separator prefixed,
+    newline terminated feature per line). Output is compact, optionally
+    with coordinates rounded to precision decimals, and serialized with
+    orjson when it is installed unless backend="json" is given.
+    """
+
+    def __init__(
+        self,
+        output_path: Union[str, Path],
+        seq: bool = False,
+        precision: Optional[int] = None,
+        backend: str = "auto",
+    ) -> None:
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f"Invalid JSON backend: {backend}")
+        if backend == "orjson" and orjson is None:
+            raise ImportError("orjson is not installed")
+
+        self.output_path = Path(output_path)
+        self.seq = seq
+        self.precision = precision
+        self.use_orjson = orjson is not None and backend != "json"
+        self.count = 0
+        self._file = open(self.output_path, "wb")
+        if not seq:
+            self._file.write(b'{"type":"FeatureCollection","features":[')
+
+    def _dumps(self, obj: Any) -> bytes:
+        if self.use_orjson:
+            return orjson.dumps(obj, default=_geo_interface)
+        return json.dumps(
+            obj, ensure_ascii=False, separators=(",", ":"), default=_geo_interface
+        ).encode("utf-8")
+
+    def write(self, feature: Dict[str, Any]) -> None:
+        """Write one feature"""
+        if self.precision is not None and feature.get("geometry"):
+            feature = {
+                **feature,
+                "geometry": _round_geometry(feature["geometry"], self.precision),
+            }
+        data = self._dumps(feature)
+
+        if self.seq:
+            self._file.write(_RECORD_SEPARATOR + data + b"\n")
+        else:
+            if self.count:
+                self._file.write(b",")
+            self._file.write(data)
+        self.count += 1
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        if not self.seq:
+            self._file.write(b"]}")
+        self._file.close()
+
+    def __enter__(self) -> "GeoJSONWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
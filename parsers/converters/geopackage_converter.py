@@ -1,15 +1,97 @@
 from osgeo import ogr, osr
 import logging
-from typing import Dict, Any
-from .base_converter import BaseConverter
+from typing import Dict, Any, Iterable, Mapping, Optional, Tuple
+from .base_converter import SPATIAL_INDEX_MODES, BaseConverter
+from ..types import FieldDefinition, LayerDefinition
+from ..wkb import encode_wkb
 import os
+import struct
 
 logger = logging.getLogger(__name__)
 
 
+class _LayerWriter:
+    """Writes the features of one OGR layer in batched transactions
+
+    The field index map and the OGR feature object are set up once per
+    layer and reused for every feature.
+    """
+
+    def __init__(self, layer: ogr.Layer, batch_size: int) -> None:
+        self.layer = layer
+        self.batch_size = batch_size
+        feature_def = layer.GetLayerDefn()
+        # string fields get str() values, typed fields take them as parsed
+        self.field_indexes = []
+        for i in range(feature_def.GetFieldCount()):
+            field_defn = feature_def.GetFieldDefn(i)
+            is_string = field_defn.GetType() == ogr.OFTString
+            self.field_indexes.append((field_defn.GetName(), i, is_string))
+        self.feature = ogr.Feature(feature_def)
+        self.pending = 0
+        self.count = 0
+
+    def write(self, feature_data: Dict[str, Any]) -> None:
+        """Adds GeoJSON feature to OGR layer"""
+        # Set geometry
+        geom_json = feature_data.get("geometry", {})
+        if not geom_json:
+            logger.warning("Skipping feature without geometry")
+            return
+        try:
+            geometry = ogr.CreateGeometryFromWkb(encode_wkb(geom_json))
+        except (KeyError, TypeError, ValueError, struct.error):
+            geometry = None
+        if geometry is None:
+            logger.error(f"Failed to convert geometry: {geom_json}")
+            return
+
+        feature = self.feature
+        feature.SetFID(ogr.NullFID)
+        feature.SetGeometryDirectly(geometry)
+
+        # Set properties, clearing what the previous feature left behind
+        properties = feature_data.get("properties", {})
+        for field_name, i, is_string in self.field_indexes:
+            value = properties.get(field_name)
+            if value is None:
+                feature.UnsetField(i)
+            elif is_string:
+                feature.SetField(i, str(value))
+            else:
+                feature.SetField(i, value)
+
+        if self.pending == 0:
+            self.layer.StartTransaction()
+        if self.layer.CreateFeature(feature) != 0:
+            logger.error("Failed to create feature")
+        else:
+            self.count += 1
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.commit()
+
+    def commit(self) -> None:
+        if self.pending:
+            self.layer.CommitTransaction()
+            self.pending = 0
+
+
 class GeoPackageConverter(BaseConverter):
-    def __init__(self) -> None:
+    def __init__(
+        self, batch_size: int = 10000, spatial_index: str = "deferred"
+    ) -> None:
+        """batch_size is the number of features written per transaction
+
+        spatial_index is "deferred" to create layers without a spatial index
+        and build it in one pass once all features are written, "immediate"
+        to let the driver update it on every insert, or "none" to skip it.
+        """
         super().__init__()
+        if spatial_index not in SPATIAL_INDEX_MODES:
+            raise ValueError(f"Invalid spatial_index mode: {spatial_index}")
+        self.batch_size = batch_size
+        self.spatial_index = spatial_index
         self.gpkg_driver = ogr.GetDriverByName("GPKG")
         if self.gpkg_driver is None:
             raise RuntimeError("Failed to load GPKG driver")
@@ -30,83 +112,187 @@ class GeoPackageConverter(BaseConverter):
         }
         return type_map.get(geom_type, ogr.wkbUnknown)
 
-    def _add_feature(self, layer: ogr.Layer, feature_data: Dict[str, Any]) -> None:
-        """Adds GeoJSON feature to OGR layer"""
-        feature_def = layer.GetLayerDefn()
-        feature = ogr.Feature(feature_def)
+    def _create_field(self, field: FieldDefinition) -> ogr.FieldDefn:
+        """Creates the OGR field matching a field definition"""
+        field_type = field["type"]
+        if field_type == "INTEGER":
+            # widths of 10 digits and more do not fit a 32 bit integer
+            ogr_type = ogr.OFTInteger64 if field["width"] > 9 else ogr.OFTInteger
+        elif field_type in ("FLOAT", "DOUBLE"):
+            ogr_type = ogr.OFTReal
+        elif field_type == "DATE":
+            ogr_type = ogr.OFTDate
+        else:
+            ogr_type = ogr.OFTString
 
-        # Set properties
-        properties = feature_data.get("properties", {})
-        for i in range(feature_def.GetFieldCount()):
-            field_defn = feature_def.GetFieldDefn(i)
-            field_name = field_defn.GetName()
-            if field_name in properties:
-                feature.SetField(i, str(properties[field_name]))
+        field_def = ogr.FieldDefn(field["name"], ogr_type)
+        if field["width"]:
+            field_def.SetWidth(field["width"])
+        if ogr_type == ogr.OFTReal and field["precision"]:
+            field_def.SetPrecision(field["precision"])
+        return field_def
 
-        # Set geometry
-        geom_json = feature_data.get("geometry", {})
-        if not geom_json:
-            logger.warning("Skipping feature without geometry")
-            return
+    def _create_layer(
+        self,
+        ds: ogr.DataSource,
+        layer_name: str,
+        table_name: str,
+        first_feature: Dict[str, Any],
+        layer_definition: Optional[LayerDefinition] = None,
+    ) -> Optional[ogr.Layer]:
+        """Creates an OGR layer with the declared fields of the layer
 
-        wkt = ogr.CreateGeometryFromJson(str(geom_json))
-        if wkt is None:
-            logger.error(f"Failed to convert geometry: {geom_json}")
-            return
+        The layer name is kept as the gpkg_contents identifier of the
+        table. Without a layer definition every property of the first
+        feature becomes a string field.
+        """
+        # Check geometry type from first feature
+        geom_type = first_feature.get("geometry", {}).get("type")
+        ogr_geom_type = self._get_ogr_geometry_type(geom_type)
 
-        feature.SetGeometry(wkt)
-        if layer.CreateFeature(feature) != 0:
-            logger.error("Failed to create feature")
+        # Create layer
+        srs = osr.SpatialReference()
+        srs.ImportFromEPSG(5186)
 
-    def convert_to_gpkg(
-        self, geojson_data: Dict[str, Dict[str, Any]], output_path: str
-    ) -> None:
-        """Converts GeoJSON data to GeoPackage"""
-        # Remove existing file if exists
-        if os.path.exists(output_path):
-            os.remove(output_path)
+        options = [] if self.spatial_index == "immediate" else ["SPATIAL_INDEX=NO"]
+        options.append(f"IDENTIFIER={layer_name}")
+        layer = (
+            ds.CreateLayer(table_name, srs, ogr_geom_type, options=options)
+            if table_name
+            else None
+        )
 
-        ds = self.gpkg_driver.CreateDataSource(output_path)
-        if ds is None:
-            raise RuntimeError(f"Cannot create GeoPackage file: {output_path}")
+        if layer is None:
+            logger.error(f"Failed to create layer: {layer_name}")
+            return None
 
+        # Create fields
+        for field in self._layer_fields(first_feature, layer_definition):
+            layer.CreateField(self._create_field(field))
+
+        logger.info(f"Layer created successfully: {table_name}")
+        return layer
+
+    def _create_spatial_index(self, ds: ogr.DataSource, layer: ogr.Layer) -> None:
+        """Builds the R-tree index of a layer created with SPATIAL_INDEX=NO"""
+        result = ds.ExecuteSQL(
+            f"SELECT CreateSpatialIndex('{layer.GetName()}', "
+            f"'{layer.GetGeometryColumn()}')"
+        )
+        if result is not None:
+            ds.ReleaseResultSet(result)
+
+    def _layer_tables(self, ds: ogr.DataSource) -> Dict[str, str]:
+        """gpkg_contents identifiers (layer names) and tables of a file"""
+        result = ds.ExecuteSQL("SELECT identifier, table_name FROM gpkg_contents")
+        if result is None:
+            return {}
         try:
-            for layer_name, feature_collection in geojson_data.items():
-                if not feature_collection.get("features"):
-                    logger.warning(f"Skipping empty layer: {layer_name}")
-                    continue
+            return {
+                feature.GetField(0): feature.GetField(1) for feature in result
+            }
+        finally:
+            ds.ReleaseResultSet(result)
 
-                # Check geometry type from first feature
-                first_feature = feature_collection["features"][0]
-                geom_type = first_feature.get("geometry", {}).get("type")
-                ogr_geom_type = self._get_ogr_geometry_type(geom_type)
+    def _delete_layer(self, ds: ogr.DataSource, table_name: str) -> None:
+        """Deletes the layer of a table, if the datasource has one"""
+        for index in range(ds.GetLayerCount()):
+            if ds.GetLayerByIndex(index).GetName() == table_name:
+                ds.DeleteLayer(index)
+                return
 
-                # Create layer
-                srs = osr.SpatialReference()
-                srs.ImportFromEPSG(5186)
+    def write_features(
+        self,
+        features: Iterable[Tuple[str, Dict[str, Any]]],
+        output_path: str,
+        layer_definitions: Optional[Mapping[str, LayerDefinition]] = None,
+        update: bool = False,
+        drop_layers: Iterable[str] = (),
+    ) -> None:
+        """Writes a stream of (layer_name, feature) pairs to GeoPackage
 
-                # Remove special characters from layer name
-                safe_layer_name = "".join(
-                    c for c in layer_name if c.isalnum() or c in ("_",)
-                )
-                layer = ds.CreateLayer(safe_layer_name, srs, ogr_geom_type)
+        Each layer is created when its first feature arrives, so features
+        only need to be held one at a time. layer_definitions (e.g. from
+        NDAParser.read_layer_definitions) gives the typed fields of a layer.
+        With update=True an existing file is kept: the layers in drop_layers
+        are removed, written layers replace their old tables and all other
+        layers are left untouched.
+        """
+        layer_definitions = layer_definitions or {}
+        update = update and os.path.exists(output_path)
+        if update:
+            ds = ogr.Open(output_path, 1)
+            if ds is None:
+                raise RuntimeError(f"Cannot open GeoPackage file: {output_path}")
+            tables = self._layer_tables(ds)
+            for layer_name in drop_layers:
+                if layer_name in tables:
+                    self._delete_layer(ds, tables.pop(layer_name))
+        else:
+            tables = {}
+            # Remove existing file if exists
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            ds = self.gpkg_driver.CreateDataSource(output_path)
+            if ds is None:
+                raise RuntimeError(f"Cannot create GeoPackage file: {output_path}")
 
-                if layer is None:
-                    logger.error(f"Failed to create layer: {layer_name}")
+        writers: Dict[str, Optional[_LayerWriter]] = {}
+        active: Optional[_LayerWriter] = None
+        try:
+            for layer_name, feature in features:
+                if layer_name not in writers:
+                    # tables created in this run count as taken too
+                    table_name = self._unique_table_name(layer_name, tables)
+                    tables[layer_name] = table_name
+                    if update:
+                        self._delete_layer(ds, table_name)
+                    layer = self._create_layer(
+                        ds,
+                        layer_name,
+                        table_name,
+                        feature,
+                        layer_definitions.get(layer_name),
+                    )
+                    writers[layer_name] = (
+                        _LayerWriter(layer, self.batch_size)
+                        if layer is not None
+                        else None
+                    )
+                writer = writers[layer_name]
+                if writer is None:
                     continue
+                # GDAL allows a single open transaction per datasource
+                if active is not writer:
+                    if active is not None:
+                        active.commit()
+                    active = writer
+                writer.write(feature)
 
-                # Create fields
-                properties = first_feature.get("properties", {})
-                for field_name, value in properties.items():
-                    field_def = ogr.FieldDefn(field_name, ogr.OFTString)
-                    field_def.SetWidth(254)
-                    layer.CreateField(field_def)
-
-                # Add features
-                for feature in feature_collection["features"]:
-                    self._add_feature(layer, feature)
+            if active is not None:
+                active.commit()
 
-                logger.info(f"Layer created successfully: {safe_layer_name}")
+            if self.spatial_index == "deferred":
+                for writer in writers.values():
+                    if writer is not None:
+                        self._create_spatial_index(ds, writer.layer)
 
         finally:
+            writers.clear()
+            active = None
             ds = None
+
+    def convert_to_gpkg(
+        self, geojson_data: Dict[str, Dict[str, Any]], output_path: str
+    ) -> None:
+        """Converts GeoJSON data to GeoPackage"""
+
+        def iter_features():
+            for layer_name, feature_collection in geojson_data.items():
+                if not feature_collection.get("features"):
+                    logger.warning(f"Skipping empty layer: {layer_name}")
+                    continue
+                for feature in feature_collection["features"]:
+                    yield layer_name, feature
+
+        self.write_features(iter_features(), output_path)
@@ -0,0 +1,512 @@
+import logging
+import os
+import sqlite3
+import struct
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from .base_converter import SPATIAL_INDEX_MODES, BaseConverter
+from ..types import FieldDefinition, LayerDefinition
+from ..wkb import encode_wkb, geometry_bounds
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["NativeGeoPackageWriter", "encode_gpkg_geometry"]
+
+GPKG_APPLICATION_ID = 0x47504B47  # "GPKG"
+GPKG_USER_VERSION = 10200  # GeoPackage 1.2
+
+# Korea 2000 / Central Belt 2010, the reference system of NGI map sheets
+DEFAULT_SRS_ID = 5186
+
+_SPATIAL_REF_SYS = [
+    ("Undefined cartesian SRS", -1, "NONE", -1, "undefined", None),
+    ("Undefined geographic SRS", 0, "NONE", 0, "undefined", None),
+    (
+        "WGS 84 geodetic",
+        4326,
+        "EPSG",
+        4326,
+        'GEOGCS["WGS 84",DATUM["WGS_1984",SPHEROID["WGS 84",6378137,'
+        '298.257223563,AUTHORITY["EPSG","7030"]],AUTHORITY["EPSG","6326"]],'
+        'PRIMEM["Greenwich",0,AUTHORITY["EPSG","8901"]],'
+        'UNIT["degree",0.0174532925199433,AUTHORITY["EPSG","9122"]],'
+        'AUTHORITY["EPSG","4326"]]',
+        None,
+    ),
+    (
+        "Korea 2000 / Central Belt 2010",
+        5186,
+        "EPSG",
+        5186,
+        'PROJCS["Korea 2000 / Central Belt 2010",GEOGCS["Korea 2000",'
+        'DATUM["Geocentric_datum_of_Korea",SPHEROID["GRS 1980",6378137,'
+        '298.257222101,AUTHORITY["EPSG","7019"]],TOWGS84[0,0,0,0,0,0,0],'
+        'AUTHORITY["EPSG","6737"]],PRIMEM["Greenwich",0,AUTHORITY["EPSG","8901"]],'
+        'UNIT["degree",0.0174532925199433,AUTHORITY["EPSG","9122"]],'
+        'AUTHORITY["EPSG","4737"]],PROJECTION["Transverse_Mercator"],'
+        'PARAMETER["latitude_of_origin",38],PARAMETER["central_meridian",127],'
+        'PARAMETER["scale_factor",1],PARAMETER["false_easting",200000],'
+        'PARAMETER["false_northing",600000],UNIT["metre",1,AUTHORITY["EPSG","9001"]],'
+        'AUTHORITY["EPSG","5186"]]',
+        None,
+    ),
+]
+
+_CORE_TABLES = [
+    """CREATE TABLE gpkg_spatial_ref_sys (
+        srs_name TEXT NOT NULL,
+        srs_id INTEGER NOT NULL PRIMARY KEY,
+        organization TEXT NOT NULL,
+        organization_coordsys_id INTEGER NOT NULL,
+        definition TEXT NOT NULL,
+        description TEXT)""",
+    """CREATE TABLE gpkg_contents (
+        table_name TEXT NOT NULL PRIMARY KEY,
+        data_type TEXT NOT NULL,
+        identifier TEXT UNIQUE,
+        description TEXT DEFAULT '',
+        last_change DATETIME NOT NULL
+            DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+        min_x DOUBLE,
+        min_y DOUBLE,
+        max_x DOUBLE,
+        max_y DOUBLE,
+        srs_id INTEGER,
+        CONSTRAINT fk_gc_r_srs_id FOREIGN KEY (srs_id)
+            REFERENCES gpkg_spatial_ref_sys(srs_id))""",
+    """CREATE TABLE gpkg_geometry_columns (
+        table_name TEXT NOT NULL,
+        column_name TEXT NOT NULL,
+        geometry_type_name TEXT NOT NULL,
+        srs_id INTEGER NOT NULL,
+        z TINYINT NOT NULL,
+        m TINYINT NOT NULL,
+        CONSTRAINT pk_geom_cols PRIMARY KEY (table_name, column_name),
+        CONSTRAINT uk_gc_table_name UNIQUE (table_name),
+        CONSTRAINT fk_gc_tn FOREIGN KEY (table_name)
+            REFERENCES gpkg_contents(table_name),
+        CONSTRAINT fk_gc_srs FOREIGN KEY (srs_id)
+            REFERENCES gpkg_spatial_ref_sys (srs_id))""",
+]
+
+# magic, version 0, flags: little endian, envelope [min_x, max_x, min_y, max_y]
+_GPKG_HEADER = struct.Struct("<2sBBi4d")
+_GPKG_FLAGS = 0b00000011
+_GPKG_EMPTY_HEADER = struct.Struct("<2sBBi")
+_GPKG_EMPTY_FLAGS = 0b00010001
+_ENVELOPE = struct.Struct("<4d")
+
+_EXTENSIONS_TABLE = """CREATE TABLE IF NOT EXISTS gpkg_extensions (
+    table_name TEXT,
+    column_name TEXT,
+    extension_name TEXT NOT NULL,
+    definition TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    CONSTRAINT ge_tce UNIQUE (table_name, column_name, extension_name))"""
+
+# Triggers of the GeoPackage R-tree extension, keeping the index in sync
+# with later edits of the table ({t}: table, {r}: rtree table)
+_RTREE_TRIGGERS = [
+    """CREATE TRIGGER "{r}_insert" AFTER INSERT ON "{t}"
+    WHEN (new.geom NOT NULL AND NOT ST_IsEmpty(NEW.geom))
+    BEGIN
+        INSERT OR REPLACE INTO "{r}" VALUES (NEW.fid,
+            ST_MinX(NEW.geom), ST_MaxX(NEW.geom),
+            ST_MinY(NEW.geom), ST_MaxY(NEW.geom));
+    END""",
+    """CREATE TRIGGER "{r}_update1" AFTER UPDATE OF geom ON "{t}"
+    WHEN OLD.fid = NEW.fid AND (NEW.geom NOTNULL AND NOT ST_IsEmpty(NEW.geom))
+    BEGIN
+        INSERT OR REPLACE INTO "{r}" VALUES (NEW.fid,
+            ST_MinX(NEW.geom), ST_MaxX(NEW.geom),
+            ST_MinY(NEW.geom), ST_MaxY(NEW.geom));
+    END""",
+    """CREATE TRIGGER "{r}_update2" AFTER UPDATE OF geom ON "{t}"
+    WHEN OLD.fid = NEW.fid AND (NEW.geom ISNULL OR ST_IsEmpty(NEW.geom))
+    BEGIN
+        DELETE FROM "{r}" WHERE id = OLD.fid;
+    END""",
+    """CREATE TRIGGER "{r}_update3" AFTER UPDATE ON "{t}"
+    WHEN OLD.fid != NEW.fid AND (NEW.geom NOTNULL AND NOT ST_IsEmpty(NEW.geom))
+    BEGIN
+        DELETE FROM "{r}" WHERE id = OLD.fid;
+        INSERT OR REPLACE INTO "{r}" VALUES (NEW.fid,
+            ST_MinX(NEW.geom), ST_MaxX(NEW.geom),
+            ST_MinY(NEW.geom), ST_MaxY(NEW.geom));
+    END""",
+    """CREATE TRIGGER "{r}_update4" AFTER UPDATE ON "{t}"
+    WHEN OLD.fid != NEW.fid AND (NEW.geom ISNULL OR ST_IsEmpty(NEW.geom))
+    BEGIN
+        DELETE FROM "{r}" WHERE id IN (OLD.fid, NEW.fid);
+    END""",
+    """CREATE TRIGGER "{r}_delete" AFTER DELETE ON "{t}"
+    WHEN old.geom NOT NULL
+    BEGIN
+        DELETE FROM "{r}" WHERE id = OLD.fid;
+    END""",
+]
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _column_type(field: FieldDefinition) -> str:
+    """GeoPackage column type of a field definition"""
+    field_type = field["type"]
+    if field_type == "INTEGER":
+        # MEDIUMINT is the 32 bit integer type of GeoPackage
+        return "INTEGER" if field["width"] > 9 else "MEDIUMINT"
+    if field_type in ("FLOAT", "DOUBLE"):
+        return "REAL"
+    if field_type == "DATE":
+        return "DATE"
+    return f"TEXT({field['width']})" if field["width"] else "TEXT"
+
+
+def _gpkg_blob(wkb: bytes, bounds: Optional[tuple], srs_id: int) -> bytes:
+    if bounds is None:
+        return _GPKG_EMPTY_HEADER.pack(b"GP", 0, _GPKG_EMPTY_FLAGS, srs_id) + wkb
+    min_x, min_y, max_x, max_y = bounds
+    header = _GPKG_HEADER.pack(
+        b"GP", 0, _GPKG_FLAGS, srs_id, min_x, max_x, min_y, max_y
+    )
+    return header + wkb
+
+
+def _envelope(blob: Optional[bytes]) -> Optional[Tuple[float, ...]]:
+    """(min_x, max_x, min_y, max_y) from a geometry blob header, if present"""
+    if blob is None or blob[3] & 0b00010000 or (blob[3] >> 1) & 0b111 == 0:
+        return None
+    order = "<" if blob[3] & 1 else ">"
+    return struct.unpack_from(order + "4d", blob, 8)
+
+
+def _register_functions(conn: sqlite3.Connection) -> None:
+    """Register the ST_ functions used by the R-tree triggers"""
+    conn.create_function(
+        "ST_IsEmpty", 1, lambda blob: None if blob is None else _envelope(blob) is None
+    )
+    for i, name in enumerate(("ST_MinX", "ST_MaxX", "ST_MinY", "ST_MaxY")):
+        conn.create_function(
+            name, 1, lambda blob, i=i: (_envelope(blob) or (None,) * 4)[i]
+        )
+
+
+def encode_gpkg_geometry(geometry: Any, srs_id: int = DEFAULT_SRS_ID) -> bytes:
+    """Encode a geometry as a GeoPackage geometry blob (binary header + WKB)"""
+    return _gpkg_blob(encode_wkb(geometry), geometry_bounds(geometry), srs_id)
+
+
+class _TableWriter:
+    """Buffers the rows of one feature table and tracks its extent"""
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        table_name: str,
+        fields: List[FieldDefinition],
+        srs_id: int,
+        batch_size: int,
+    ) -> None:
+        self.conn = conn
+        self.table_name = table_name
+        # string columns get str() values, typed columns take them as parsed
+        self.fields = [(field["name"], field["type"] == "STRING") for field in fields]
+        field_names = [field["name"] for field in fields]
+        self.srs_id = srs_id
+        self.batch_size = batch_size
+        columns = ", ".join(_quote(name) for name in ["geom"] + field_names)
+        placeholders = ", ".join("?" * (len(field_names) + 1))
+        self.sql = (
+            f"INSERT INTO {_quote(table_name)} ({columns}) VALUES ({placeholders})"
+        )
+        self.rows: List[Tuple[Any, ...]] = []
+        self.extent: Optional[List[float]] = None
+        self.count = 0
+
+    def write(self, feature_data: Dict[str, Any]) -> None:
+        geometry = feature_data.get("geometry")
+        if not geometry:
+            logger.warning("Skipping feature without geometry")
+            return
+        try:
+            bounds = geometry_bounds(geometry)
+            blob = _gpkg_blob(encode_wkb(geometry), bounds, self.srs_id)
+        except (KeyError, TypeError, ValueError, struct.error):
+            logger.error(f"Failed to convert geometry: {geometry}")
+            return
+
+        if bounds is not None:
+            if self.extent is None:
+                self.extent = list(bounds)
+            else:
+                extent = self.extent
+                extent[0] = min(extent[0], bounds[0])
+                extent[1] = min(extent[1], bounds[1])
+                extent[2] = max(extent[2], bounds[2])
+                extent[3] = max(extent[3], bounds[3])
+
+        properties = feature_data.get("properties", {})
+        row = [blob]
+        for name, is_string in self.fields:
+            value = properties.get(name)
+            row.append(str(value) if is_string and value is not None else value)
+        self.rows.append(tuple(row))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.rows:
+            self.conn.executemany(self.sql, self.rows)
+            self.count += len(self.rows)
+            self.rows = []
+
+
+class NativeGeoPackageWriter(BaseConverter):
+    """GeoPackage writer built on the standard sqlite3 module
+
+    Produces the same layers as GeoPackageConverter without GDAL: feature
+    tables are registered in gpkg_contents and gpkg_geometry_columns and
+    geometries are stored as GeoPackage binary headers followed by WKB.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 10000,
+        srs_id: int = DEFAULT_SRS_ID,
+        page_size: int = 4096,
+        spatial_index: str = "deferred",
+    ) -> None:
+        """batch_size is the number of rows passed to each executemany call
+
+        spatial_index is "deferred" to build the R-tree index in one pass
+        once all features are written, "immediate" to keep it up to date
+        while inserting, or "none" to skip it.
+        """
+        super().__init__()
+        if spatial_index not in SPATIAL_INDEX_MODES:
+            raise ValueError(f"Invalid spatial_index mode: {spatial_index}")
+        self.batch_size = batch_size
+        self.srs_id = srs_id
+        self.page_size = page_size
+        self.spatial_index = spatial_index
+
+    def convert(self, data: Dict[str, Dict[str, Any]], output_path: str) -> None:
+        """Implements abstract method from BaseConverter"""
+        self.convert_to_gpkg(data, output_path)
+
+    def _init_database(self, conn: sqlite3.Connection) -> None:
+        conn.execute(f"PRAGMA page_size = {int(self.page_size)}")
+        conn.execute(f"PRAGMA application_id = {GPKG_APPLICATION_ID}")
+        conn.execute(f"PRAGMA user_version = {GPKG_USER_VERSION}")
+        # the file is built from scratch, a crash leaves nothing worth keeping
+        conn.execute("PRAGMA journal_mode = MEMORY")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("BEGIN")
+        for statement in _CORE_TABLES:
+            conn.execute(statement)
+        conn.executemany(
+            "INSERT INTO gpkg_spatial_ref_sys VALUES (?, ?, ?, ?, ?, ?)",
+            _SPATIAL_REF_SYS,
+        )
+        conn.execute("COMMIT")
+
+    def _create_table(
+        self,
+        conn: sqlite3.Connection,
+        layer_name: str,
+        first_feature: Dict[str, Any],
+        layer_definition: Optional[LayerDefinition] = None,
+    ) -> Optional[_TableWriter]:
+        """Creates a feature table with the declared fields of the layer
+
+        Without a layer definition every property of the first feature
+        becomes a TEXT column.
+        """
+        geom_type = (first_feature.get("geometry") or {}).get("type")
+        geometry_type_name = (geom_type or "GEOMETRY").upper()
+
+        table_name = self._layer_table(conn, layer_name)
+        if not table_name:
+            logger.error(f"Failed to create layer: {layer_name}")
+            return None
+        self._drop_table(conn, table_name)
+
+        fields = [
+            field
+            for field in self._layer_fields(first_feature, layer_definition)
+            if field["name"].lower() not in ("fid", "geom")
+        ]
+        columns = ", ".join(
+            f"{_quote(field['name'])} {_column_type(field)}" for field in fields
+        )
+        conn.execute(
+            f"CREATE TABLE {_quote(table_name)} ("
+            "fid INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL, "
+            f"geom {geometry_type_name}" + (f", {columns})" if columns else ")")
+        )
+        conn.execute(
+            "INSERT INTO gpkg_contents (table_name, data_type, identifier, srs_id) "
+            "VALUES (?, 'features', ?, ?)",
+            (table_name, layer_name, self.srs_id),
+        )
+        conn.execute(
+            "INSERT INTO gpkg_geometry_columns VALUES (?, 'geom', ?, ?, 0, 0)",
+            (table_name, geometry_type_name, self.srs_id),
+        )
+
+        if self.spatial_index == "immediate":
+            self._create_spatial_index(conn, table_name)
+
+        logger.info(f"Layer created successfully: {table_name}")
+        return _TableWriter(conn, table_name, fields, self.srs_id, self.batch_size)
+
+    def _layer_table(self, conn: sqlite3.Connection, layer_name: str) -> str:
+        """Table name of a layer, unique among the tables of the file"""
+        tables = dict(conn.execute("SELECT identifier, table_name FROM gpkg_contents"))
+        return self._unique_table_name(layer_name, tables)
+
+    def _drop_table(self, conn: sqlite3.Connection, table_name: str) -> None:
+        """Removes a feature table, its R-tree index and its registrations"""
+        conn.execute(f"DROP TABLE IF EXISTS {_quote(f'rtree_{table_name}_geom')}")
+        conn.execute(f"DROP TABLE IF EXISTS {_quote(table_name)}")
+        conn.execute(
+            "DELETE FROM gpkg_geometry_columns WHERE table_name = ?", (table_name,)
+        )
+        conn.execute("DELETE FROM gpkg_contents WHERE table_name = ?", (table_name,))
+        conn.execute(_EXTENSIONS_TABLE)
+        conn.execute("DELETE FROM gpkg_extensions WHERE table_name = ?", (table_name,))
+
+    def _create_spatial_index(
+        self, conn: sqlite3.Connection, table_name: str, bulk_load: bool = False
+    ) -> None:
+        """Creates the R-tree index of a table, filled from its envelopes"""
+        rtree_name = f"rtree_{table_name}_geom"
+        conn.execute(
+            f"CREATE VIRTUAL TABLE {_quote(rtree_name)} "
+            "USING rtree(id, minx, maxx, miny, maxy)"
+        )
+        if bulk_load:
+            # the envelope is stored in the blob header, read only that part
+            rows = conn.execute(
+                f"SELECT fid, substr(geom, 1, 40) FROM {_quote(table_name)} "
+                "WHERE geom IS NOT NULL"
+            ).fetchall()
+            conn.executemany(
+                f"INSERT INTO {_quote(rtree_name)} VALUES (?, ?, ?, ?, ?)",
+                (
+                    (fid, *envelope)
+                    for fid, envelope in ((fid, _envelope(blob)) for fid, blob in rows)
+                    if envelope is not None
+                ),
+            )
+        for trigger in _RTREE_TRIGGERS:
+            conn.execute(trigger.format(t=table_name, r=rtree_name))
+        conn.execute(_EXTENSIONS_TABLE)
+        conn.execute(
+            "INSERT INTO gpkg_extensions VALUES (?, 'geom', 'gpkg_rtree_index', "
+            "'http://www.geopackage.org/spec120/#extension_rtree', 'write-only')",
+            (table_name,),
+        )
+
+    def _finish_table(self, conn: sqlite3.Connection, writer: _TableWriter) -> None:
+        writer.flush()
+        if writer.extent is not None:
+            conn.execute(
+                "UPDATE gpkg_contents SET min_x = ?, min_y = ?, max_x = ?, max_y = ? "
+                "WHERE table_name = ?",
+                (*writer.extent, writer.table_name),
+            )
+        conn.execute("COMMIT")
+
+    def write_features(
+        self,
+        features: Iterable[Tuple[str, Dict[str, Any]]],
+        output_path: str,
+        layer_definitions: Optional[Mapping[str, LayerDefinition]] = None,
+        update: bool = False,
+        drop_layers: Iterable[str] = (),
+    ) -> None:
+        """Writes a stream of (layer_name, feature) pairs to GeoPackage
+
+        Each layer is written in its own transaction, committed when the
+        stream moves on to another layer. layer_definitions (e.g. from
+        NDAParser.read_layer_definitions) gives the typed fields of a layer.
+        With update=True an existing file is kept: the layers in drop_layers
+        are removed, written layers replace their old tables and all other
+        layers are left untouched.
+        """
+        layer_definitions = layer_definitions or {}
+        update = update and os.path.exists(output_path)
+        # Remove existing file if exists
+        if not update and os.path.exists(output_path):
+            os.remove(output_path)
+
+        conn = sqlite3.connect(output_path, isolation_level=None)
+        _register_functions(conn)
+        try:
+            if update:
+                conn.execute("BEGIN")
+                for layer_name in drop_layers:
+                    table_name = self._layer_table(conn, layer_name)
+                    if table_name:
+                        self._drop_table(conn, table_name)
+                conn.execute("COMMIT")
+            else:
+                self._init_database(conn)
+
+            writers: Dict[str, Optional[_TableWriter]] = {}
+            active: Optional[_TableWriter] = None
+            for layer_name, feature in features:
+                writer = writers.get(layer_name)
+                if writer is None and layer_name in writers:
+                    continue  # the layer could not be created
+                if writer is None or writer is not active:
+                    if active is not None:
+                        self._finish_table(conn, active)
+                        active = None
+                    conn.execute("BEGIN")
+                    if writer is None:
+                        writer = self._create_table(
+                            conn,
+                            layer_name,
+                            feature,
+                            layer_definitions.get(layer_name),
+                        )
+                        writers[layer_name] = writer
+                        if writer is None:
+                            conn.execute("ROLLBACK")
+                            continue
+                    active = writer
+                writer.write(feature)
+
+            if active is not None:
+                self._finish_table(conn, active)
+
+            if self.spatial_index == "deferred":
+                for writer in writers.values():
+                    if writer is not None:
+                        conn.execute("BEGIN")
+                        self._create_spatial_index(
+                            conn, writer.table_name, bulk_load=True
+                        )
+                        conn.execute("COMMIT")
+
+            conn.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            conn.close()
+
+    def convert_to_gpkg(
+        self, geojson_data: Dict[str, Dict[str, Any]], output_path: str
+    ) -> None:
+        """Converts GeoJSON data to GeoPackage"""
+
+        def iter_features():
+            for layer_name, feature_collection in geojson_data.items():
+                if not feature_collection.get("features"):
+                    logger.warning(f"Skipping empty layer: {layer_name}")
+                    continue
+                for feature in feature_collection["features"]:
+                    yield layer_name, feature
+
+        self.write_features(iter_features(), output_path)
@@ -0,0 +1,48 @@
+import csv
+from typing import List, Sequence
+
+__all__ = ["split_record", "split_records"]
+
+
+def _split_quoted(line: str) -> List[str]:
+    """Split one line the way NDA files quote values
+
+    Double quotes toggle quoting and are dropped, commas outside quotes
+    separate values and every value is stripped.
+    """
+    values = [""]
+    for i, part in enumerate(line.split('"')):
+        if i % 2:  # inside quotes
+            values[-1] += part
+            continue
+        pieces = part.split(",")
+        values[-1] += pieces[0]
+        values.extend(pieces[1:])
+    return [value.strip() for value in values]
+
+
+def split_record(line: str) -> List[str]:
+    """Split a single NDA record line into values"""
+    return split_records([line])[0]
+
+
+def split_records(lines: Sequence[str]) -> List[List[str]]:
+    """Split a batch of NDA record lines into values, one list per line"""
+    try:
+        rows = list(csv.reader(lines, skipinitialspace=True))
+    except csv.Error:
+        rows = []
+
+    if len(rows) != len(lines):
+        # an unbalanced quote made csv join lines, redo them one by one
+        return [_split_quoted(line) for line in lines]
+
+    result = []
+    for line, row in zip(lines, rows):
+        values = [value.strip() for value in row] if row else [""]
+        # csv only keeps a quote when it is escaped or not at a value boundary,
+        # those lines need the toggling rule of the NDA format
+        if '"' in "".join(values):
+            values = _split_quoted(line)
+        result.append(values)
+    return result
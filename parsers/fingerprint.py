@@ -0,0 +1,173 @@
+import hashlib
+import json
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+from .scanner import ByteScanner
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "FINGERPRINT_STANDARD_URI",
+    "layer_fingerprints",
+    "read_fingerprints",
+    "write_fingerprints",
+]
+
+# md_standard_uri of the gpkg_metadata rows holding the source fingerprint of
+# a layer; gpkg_ tables are never listed as layers by GIS clients
+FINGERPRINT_STANDARD_URI = "urn:ngi-file-loader:layer-source"
+# part of every fingerprint, bump when the conversion output changes
+FINGERPRINT_VERSION = 1
+
+_HASH_CHUNK = 1 << 20
+
+
+def _layer_digests(file_path: Path, encoding: str) -> Dict[str, Any]:
+    """Running digest of every layer, hashed in chunks of _HASH_CHUNK bytes"""
+    digests = {}
+    with ByteScanner(file_path) as scanner:
+        for start, end, name in scanner.layers(encoding):
+            digest = digests.setdefault(name, hashlib.blake2b(digest_size=16))
+            for pos in range(start, end, _HASH_CHUNK):
+                digest.update(scanner.read(pos, min(pos + _HASH_CHUNK, end)))
+    return digests
+
+
+def layer_fingerprints(
+    ngi_path: Union[str, Path],
+    nda_path: Optional[Union[str, Path]] = None,
+    encoding: str = "cp949",
+    settings: Iterable[Any] = (),
+) -> Dict[str, str]:
+    """Fingerprint of every layer of a sheet
+
+    A layer's fingerprint hashes its byte ranges in the NGI and NDA files
+    together with settings (conversion options that change the output), so
+    it changes whenever anything that ends up in the output layer does.
+    """
+    ngi_digests = _layer_digests(Path(ngi_path), encoding)
+    nda_digests = _layer_digests(Path(nda_path), encoding) if nda_path else {}
+    salt = repr((FINGERPRINT_VERSION, tuple(settings))).encode("utf-8")
+
+    fingerprints = {}
+    for name, ngi_digest in ngi_digests.items():
+        digest = hashlib.blake2b(salt, digest_size=16)
+        digest.update(ngi_digest.digest())
+        nda_digest = nda_digests.get(name)
+        if nda_digest is not None:
+            digest.update(nda_digest.digest())
+        fingerprints[name] = digest.hexdigest()
+    return fingerprints
+
+
+_METADATA_TABLES = [
+    """CREATE TABLE IF NOT EXISTS gpkg_metadata (
+        id INTEGER CONSTRAINT m_pk PRIMARY KEY ASC NOT NULL,
+        md_scope TEXT NOT NULL DEFAULT 'dataset',
+        md_standard_uri TEXT NOT NULL,
+        mime_type TEXT NOT NULL DEFAULT 'text/xml',
+        metadata TEXT NOT NULL DEFAULT '')""",
+    """CREATE TABLE IF NOT EXISTS gpkg_metadata_reference (
+        reference_scope TEXT NOT NULL,
+        table_name TEXT,
+        column_name TEXT,
+        row_id_value INTEGER,
+        timestamp DATETIME NOT NULL
+            DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+        md_file_id INTEGER NOT NULL,
+        md_parent_id INTEGER,
+        CONSTRAINT crmr_mfi_fk FOREIGN KEY (md_file_id)
+            REFERENCES gpkg_metadata(id),
+        CONSTRAINT crmr_mpi_fk FOREIGN KEY (md_parent_id)
+            REFERENCES gpkg_metadata(id))""",
+    """CREATE TABLE IF NOT EXISTS gpkg_extensions (
+        table_name TEXT,
+        column_name TEXT,
+        extension_name TEXT NOT NULL,
+        definition TEXT NOT NULL,
+        scope TEXT NOT NULL,
+        CONSTRAINT ge_tce UNIQUE (table_name, column_name, extension_name))""",
+]
+
+
+def _fingerprint_rows(conn: sqlite3.Connection) -> Dict[str, Tuple[int, str]]:
+    """layer name -> (gpkg_metadata id, fingerprint)"""
+    rows = conn.execute(
+        "SELECT id, metadata FROM gpkg_metadata WHERE md_standard_uri = ?",
+        (FINGERPRINT_STANDARD_URI,),
+    ).fetchall()
+    stored = {}
+    for md_id, metadata in rows:
+        value = json.loads(metadata)
+        stored[value["layer"]] = (md_id, value["fingerprint"])
+    return stored
+
+
+def read_fingerprints(gpkg_path: Union[str, Path]) -> Dict[str, str]:
+    """Stored layer fingerprints of a GeoPackage, empty when it has none"""
+    gpkg_path = Path(gpkg_path)
+    if not gpkg_path.is_file():
+        return {}
+    try:
+        conn = sqlite3.connect(gpkg_path.resolve().as_uri() + "?mode=ro", uri=True)
+        try:
+            stored = _fingerprint_rows(conn)
+        finally:
+            conn.close()
+    except (sqlite3.DatabaseError, ValueError, KeyError) as e:
+        logger.debug(f"No layer fingerprints in {gpkg_path}: {e}")
+        return {}
+    return {name: fingerprint for name, (_, fingerprint) in stored.items()}
+
+
+def write_fingerprints(
+    gpkg_path: Union[str, Path],
+    fingerprints: Mapping[str, str],
+    remove: Iterable[str] = (),
+) -> None:
+    """Store layer fingerprints, replacing those of the same layers
+
+    The fingerprints of the layers in remove are deleted. They are kept as
+    gpkg_metadata rows of the GeoPackage metadata extension.
+    """
+    conn = sqlite3.connect(str(gpkg_path), isolation_level=None)
+    try:
+        conn.execute("BEGIN")
+        for statement in _METADATA_TABLES:
+            conn.execute(statement)
+        conn.executemany(
+            "INSERT OR IGNORE INTO gpkg_extensions VALUES "
+            "(?, NULL, 'gpkg_metadata', "
+            "'http://www.geopackage.org/spec120/#extension_metadata', 'read-write')",
+            [("gpkg_metadata",), ("gpkg_metadata_reference",)],
+        )
+        stored = _fingerprint_rows(conn)
+        stale = [
+            (stored[name][0],)
+            for name in set(remove) | set(fingerprints)
+            if name in stored
+        ]
+        conn.executemany(
+            "DELETE FROM gpkg_metadata_reference WHERE md_file_id = ?", stale
+        )
+        conn.executemany("DELETE FROM gpkg_metadata WHERE id = ?", stale)
+        for name, fingerprint in fingerprints.items():
+            md_id = conn.execute(
+                "INSERT INTO gpkg_metadata (md_scope, md_standard_uri, mime_type, "
+                "metadata) VALUES ('dataset', ?, 'application/json', ?)",
+                (
+                    FINGERPRINT_STANDARD_URI,
+                    json.dumps({"layer": name, "fingerprint": fingerprint}),
+                ),
+            ).lastrowid
+            conn.execute(
+                "INSERT INTO gpkg_metadata_reference (reference_scope, md_file_id) "
+                "VALUES ('geopackage', ?)",
+                (md_id,),
+            )
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
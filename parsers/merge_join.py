@@ -0,0 +1,105 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["merge_records"]
+
+# NDA records read ahead of the NGI cursor before switching to a hash join
+DEFAULT_MAX_PENDING = 10000
+
+
+class _SpillStore:
+    """On-disk (layer, record_id) -> properties table used as hash join side"""
+
+    def __init__(self) -> None:
+        fd, self.path = tempfile.mkstemp(prefix="ngi_merge_", suffix=".sqlite")
+        os.close(fd)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode = OFF")
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.conn.execute(
+            "CREATE TABLE records (layer TEXT, record_id TEXT, properties TEXT, "
+            "PRIMARY KEY (layer, record_id)) WITHOUT ROWID"
+        )
+
+    def add(self, records: Iterable[Tuple[str, str, Dict[str, Any]]]) -> None:
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO records VALUES (?, ?, ?)",
+            (
+                (layer, record_id, json.dumps(properties, ensure_ascii=False))
+                for layer, record_id, properties in records
+            ),
+        )
+        self.conn.commit()
+
+    def get(self, layer: str, record_id: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT properties FROM records WHERE layer = ? AND record_id = ?",
+            (layer, record_id),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self) -> None:
+        self.conn.close()
+        os.remove(self.path)
+
+
+def merge_records(
+    ngi_records: Iterable[Tuple[str, str, Any]],
+    nda_records: Iterable[Tuple[str, str, Dict[str, Any]]],
+    max_pending: int = DEFAULT_MAX_PENDING,
+) -> Iterator[Tuple[str, str, Any, Dict[str, Any]]]:
+    """Join NGI geometries with NDA properties while streaming both files
+
+    Yields (layer_name, record_id, geometry, properties) in NGI order, with
+    empty properties for records missing from the NDA side. Both files
+    normally list layers and records in the same order, so this is a merge
+    join holding only a few records. NDA records read ahead without a match
+    are kept aside by (layer, record_id) for the rest of the file, as the
+    records of a layer need not be contiguous; once more than max_pending
+    pile up (records out of order, or NGI records without attributes) the
+    rest of the NDA records is spilled to a temporary sqlite table used as a
+    hash join.
+    """
+    nda_iter = iter(nda_records)
+    nda_next = next(nda_iter, None)
+    pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    spill: Optional[_SpillStore] = None
+
+    try:
+        for layer, record_id, geometry in ngi_records:
+            key = (layer, record_id)
+            if spill is not None:
+                properties = spill.get(layer, record_id)
+            else:
+                properties = pending.pop(key, None)
+
+            while properties is None and spill is None and nda_next is not None:
+                nda_layer, nda_id, nda_properties = nda_next
+                nda_next = next(nda_iter, None)
+                if (nda_layer, nda_id) == key:
+                    properties = nda_properties
+                else:
+                    pending[(nda_layer, nda_id)] = nda_properties
+                    if len(pending) > max_pending:
+                        logger.info(
+                            "NGI/NDA record order differs, spilling NDA records to disk"
+                        )
+                        spill = _SpillStore()
+                        spill.add((k[0], k[1], v) for k, v in pending.items())
+                        if nda_next is not None:
+                            spill.add([nda_next])
+                        spill.add(nda_iter)
+                        pending.clear()
+                        nda_next = None
+                        properties = spill.get(layer, record_id)
+
+            yield layer, record_id, geometry, properties or {}
+    finally:
+        if spill is not None:
+            spill.close()
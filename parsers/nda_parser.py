@@ -1,16 +1,43 @@
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import (
+    Dict,
+    Any,
+    Collection,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
 import logging
+from .archive import is_streamed, open_text, path_exists
 from .base_parser import BaseParser
-from .types import LayerDefinition, GeometryType  # types module import added
+from .csv_tokenizer import split_record, split_records
+from .field_parser import FieldParser
+from .parse_cache import ParseCache
+from .scanner import ByteScanner
+from .types import ColumnarLayer, FieldDefinition, LayerDefinition, GeometryType
 
 logger = logging.getLogger(__name__)
 
+# field definition type -> is_float of a NUMERIC column
+_NUMBER_TYPES = {"DOUBLE": True, "INTEGER": False}
+
 
 class NDAParser(BaseParser):
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(
+        self,
+        encoding: str = "cp949",
+        columnar: bool = False,
+        cache: Optional[ParseCache] = None,
+    ) -> None:
+        """columnar=True stores each layer as a ColumnarLayer"""
+        super().__init__(encoding, cache)
+        self.columnar = columnar
         self._layer_definitions: Dict[str, LayerDefinition] = {}
+        # layer_name -> (field names, field types) of the last parsed file
+        self._layer_fields: Dict[str, Tuple[List[str], List[str]]] = {}
 
     def get_layer_definition(self, layer_name: str) -> LayerDefinition:
         """Returns layer definition"""
@@ -24,165 +51,431 @@ class NDAParser(BaseParser):
 
     def _parse_csv_line(self, line: str) -> List[str]:
         """Parse CSV line handling quoted values"""
-        values = []
-        current_value = ""
-        in_quotes = False
-
-        for char in line:
-            if char == '"':
-                in_quotes = not in_quotes
-            elif char == "," and not in_quotes:
-                values.append(current_value.strip())
-                current_value = ""
-            else:
-                current_value += char
+        return split_record(line)
+
+    def _add_layer(self, layer_name: str) -> None:
+        self._layer_fields.setdefault(layer_name, ([], []))
+        self._layer_definitions.setdefault(
+            layer_name,
+            LayerDefinition(
+                name=layer_name, fields=[], geometry_type=GeometryType.UNKNOWN
+            ),
+        )
+
+    def parse_field_definition(self, line: str) -> Tuple[str, FieldDefinition]:
+        """Parse an ATTRIB("NAME", TYPE, width, precision) line
+
+        Returns the declared NDA type and the field definition, in which
+        NUMERIC fields become INTEGER when declared without decimals and
+        DOUBLE otherwise.
+        """
+        field_def = line[7:-1]  # Remove ATTRIB( and )
+        parts = [part.strip() for part in field_def.split(",")]
+        declared_type = parts[1]
+        field_type = declared_type.upper()
+        width = int(parts[2]) if len(parts) > 2 and parts[2] else 0
+        precision = int(parts[3]) if len(parts) > 3 and parts[3] else 0
+        if field_type == "NUMERIC":
+            field_type = "DOUBLE" if precision else "INTEGER"
+        return declared_type, FieldDefinition(
+            name=parts[0].strip('"'),
+            type=field_type,
+            width=width,
+            precision=precision,
+            nullable=True,
+        )
+
+    def parse_record(
+        self,
+        layer_name: str,
+        fields: Sequence[Tuple[str, FieldDefinition]],
+        data_line: str,
+    ) -> Optional[Dict[str, Any]]:
+        """Properties of a single record from its data line
+
+        fields are the (declared type, field) pairs of the layer, as
+        returned by parse_field_definition(). Values are typed as in
+        iter_records and empty ones are left out; a line with a wrong
+        field count gives None.
+        """
+        values = split_record(data_line)
+        if len(values) != len(fields):
+            logger.warning(
+                f"Layer {layer_name}: Field count mismatch (expected: {len(fields)}, actual: {len(values)})"
+            )
+            return None
+        properties = {}
+        for value, (field_type, field) in zip(values, fields):
+            parsed = self._parse_column(
+                [value], field_type, _NUMBER_TYPES.get(field["type"])
+            )[0]
+            if parsed is not None:
+                properties[field["name"]] = parsed
+        return properties
+
+    def _read_field_definitions(self, lines: Iterator[str], layer_name: str) -> None:
+        """Read the ATTRIB lines of a $ASPATIAL_FIELD_DEF block up to $END"""
+        logger.info(f"\n=== Start field definitions of layer {layer_name} ===")
+        field_names, field_types = self._layer_fields[layer_name]
+        fields = self._layer_definitions[layer_name]["fields"]
+        for line in lines:
+            if line == "$END":
+                break
+            if line.startswith("ATTRIB"):
+                try:
+                    field_type, field = self.parse_field_definition(line)
+                    field_names.append(field["name"])
+                    field_types.append(field_type)
+                    fields.append(field)
+                    logger.info(f"Field added: {field['name']} ({field_type})")
+                except Exception as e:
+                    logger.error(f"Failed to parse field definition: {line}, {str(e)}")
+        logger.info(
+            f"=== Layer {layer_name} field definitions completed (Total: {len(field_names)}) ==="
+        )
 
-        # Append the last value
-        values.append(current_value.strip())
-        return values
+    def read_layer_definitions(self, file_path: str) -> Dict[str, LayerDefinition]:
+        """Read only the layer headers of an NDA file
 
-    def parse_file(self, file_path: str) -> Dict[str, Dict[str, Any]]:
-        """Parse NDA file and group by layer name"""
+        Returns {layer_name: LayerDefinition} with the typed fields of every
+        layer, without converting any record.
+        """
         file_path = Path(file_path)
-        if not file_path.exists():
+        if not path_exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
-        parsed_data: Dict[str, Dict[str, Any]] = {}
+        self._layer_fields = {}
+        self._layer_definitions = {}
+        current_layer = None
+        with open_text(file_path, self.encoding) as file:
+            lines = (line.strip() for line in file)
+            for line in lines:
+                if line == "$LAYER_NAME":
+                    current_layer = next(lines, "").strip('"')
+                    self._add_layer(current_layer)
+                elif line == "$ASPATIAL_FIELD_DEF" and current_layer:
+                    self._read_field_definitions(lines, current_layer)
+        return dict(self._layer_definitions)
+
+    def _iter_lines(
+        self,
+        file_path: Path,
+        layers: Optional[Collection[str]] = None,
+        section: Optional[Tuple[int, int]] = None,
+    ) -> Iterator[str]:
+        """Lines of the file, of the sections of the given layers, or of the
+        section between the byte offsets (start, end)
+        """
+        if section is not None:
+            with ByteScanner(file_path) as scanner:
+                for line in scanner.section(*section):
+                    yield line.decode(self.encoding)
+            return
+        if layers is None:
+            with open_text(file_path, self.encoding) as file:
+                yield from file
+            return
+        with ByteScanner(file_path) as scanner:
+            for start, end, name in scanner.layers(self.encoding):
+                if name in layers:
+                    for line in scanner.section(start, end):
+                        yield line.decode(self.encoding)
+
+    def _iter_record_batches(
+        self,
+        file_path: Path,
+        batch_size: Optional[int] = None,
+        layers: Optional[Collection[str]] = None,
+        section: Optional[Tuple[int, int]] = None,
+    ) -> Iterator[Tuple[str, List[str], List[List[str]]]]:
+        """Yield (layer_name, record_ids, values) for every data section
+
+        Record lines of a section are collected and tokenized in one batch,
+        or in chunks of batch_size records when given. Field names and types
+        are kept in self._layer_fields. With layers the sections of other
+        layers are skipped without being read, with section only the lines
+        between its byte offsets are read.
+        """
+        self._layer_fields = {}
+        self._layer_definitions = {}
         current_layer = None
-        layer_fields: Dict[str, List[str]] = {}  # Store field information by layer
-        layer_field_types: Dict[str, List[str]] = {}  # Store field types by layer
         in_data_section = False
+        record_ids: List[str] = []
+        data_lines: List[str] = []
+
+        lines = (
+            line.strip() for line in self._iter_lines(file_path, layers, section)
+        )
+        for line in lines:
+            # Parse layer information
+            if line == "<LAYER_START>":
+                for line in lines:
+                    if line == "$LAYER_NAME":
+                        current_layer = next(lines, "").strip('"')
+                        logger.info(f"Processing layer: {current_layer}")
+                        self._add_layer(current_layer)
+                        break
+
+            # Parse field definitions
+            elif line == "$ASPATIAL_FIELD_DEF" and current_layer:
+                self._read_field_definitions(lines, current_layer)
+
+            # Parse data records
+            elif line == "<DATA>":
+                in_data_section = True
+                logger.debug(f"Data section started: layer {current_layer}")
+
+            elif in_data_section and line.startswith("$RECORD") and current_layer:
+                data_line = next(lines, None)
+                if data_line is None:
+                    break
+                record_ids.append(line.split()[1].strip())
+                data_lines.append(data_line)
+                if batch_size and len(record_ids) >= batch_size:
+                    yield current_layer, record_ids, split_records(data_lines)
+                    record_ids, data_lines = [], []
+
+            elif line == "<END>":
+                if in_data_section and current_layer and record_ids:
+                    yield current_layer, record_ids, split_records(data_lines)
+                    record_ids, data_lines = [], []
+                in_data_section = False
+
+        # unterminated data section
+        if record_ids and current_layer:
+            yield current_layer, record_ids, split_records(data_lines)
+
+    def _convert_batch(
+        self,
+        layer_name: str,
+        record_ids: List[str],
+        rows: List[List[str]],
+        keep_empty: bool = False,
+    ) -> Tuple[List[str], List[List[Any]]]:
+        """Convert tokenized rows to one typed value list per field
+
+        Rows with a wrong field count, or without any value unless keep_empty
+        is set, are dropped; empty values become None.
+        """
+        field_names, field_types = self._layer_fields[layer_name]
+        fields = self._layer_definitions[layer_name]["fields"]
+
+        kept_ids = []
+        kept_rows = []
+        for record_id, values in zip(record_ids, rows):
+            if len(values) != len(field_names):
+                logger.warning(
+                    f"Layer {layer_name}, record {record_id}: Field count mismatch (expected: {len(field_names)}, actual: {len(values)})"
+                )
+                continue
+            kept_ids.append(record_id)
+            kept_rows.append(values)
+
+        # int/float follows the field definition, not the values of the
+        # batch, so every batch of a layer yields the same types
+        columns = [
+            self._parse_column(values, field_type, _NUMBER_TYPES.get(field["type"]))
+            for field_type, field, values in zip(field_types, fields, zip(*kept_rows))
+        ]
+        if not columns:
+            return (kept_ids if keep_empty else []), []
+        if keep_empty:
+            return kept_ids, columns
+
+        # Save only records with at least one property
+        keep = [any(value is not None for value in row) for row in zip(*columns)]
+        if not all(keep):
+            kept_ids = [rid for rid, flag in zip(kept_ids, keep) if flag]
+            columns = [
+                [value for value, flag in zip(values, keep) if flag]
+                for values in columns
+            ]
+        return kept_ids, columns
+
+    def iter_records(
+        self,
+        file_path: str,
+        batch_size: int = 10000,
+        layers: Optional[Collection[str]] = None,
+    ) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Yield (layer_name, record_id, properties) in file order
+
+        At most batch_size record lines are held in memory at a time. Unlike
+        parse_file, records without any value are kept (as empty dicts) so
+        they still line up with their NGI geometry. layers restricts reading
+        to the named layers.
+
+        With a cache the records of every layer are stored once read to the
+        end, and later reads of the same file content take them from there.
+        """
+        file_path = Path(file_path)
+        if not path_exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        if self.cache is not None and not is_streamed(file_path):
+            yield from self._iter_cached_records(file_path, layers)
+            return
+        yield from self._iter_records(file_path, batch_size, layers)
+
+    def _iter_cached_records(
+        self, file_path: Path, layers: Optional[Collection[str]] = None
+    ) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """iter_records() with one cache entry per layer section
+
+        Only the records of one layer are held in memory at a time.
+        """
+        with ByteScanner(file_path) as scanner:
+            sections = [
+                (start, end, name)
+                for start, end, name in scanner.layers(self.encoding)
+                if layers is None or name in layers
+            ]
+        layer_fields: Dict[str, Tuple[List[str], List[str]]] = {}
+        layer_definitions: Dict[str, LayerDefinition] = {}
+        for start, end, name in sections:
+            records, fields, definitions = self._cached_parse(
+                file_path,
+                ("records", name, start),
+                lambda: (
+                    list(self._iter_records(file_path, section=(start, end))),
+                    self._layer_fields,
+                    self._layer_definitions,
+                ),
+            )
+            layer_fields.update(fields)
+            layer_definitions.update(definitions)
+            self._layer_fields = layer_fields
+            self._layer_definitions = layer_definitions
+            yield from records
+
+    def _iter_records(
+        self,
+        file_path: Path,
+        batch_size: Optional[int] = 10000,
+        layers: Optional[Collection[str]] = None,
+        section: Optional[Tuple[int, int]] = None,
+    ) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        for layer_name, record_ids, rows in self._iter_record_batches(
+            file_path, batch_size, layers, section
+        ):
+            record_ids, columns = self._convert_batch(
+                layer_name, record_ids, rows, keep_empty=True
+            )
+            field_names = self._layer_fields[layer_name][0]
+            rows = zip(*columns) if columns else ((),) * len(record_ids)
+            for record_id, values in zip(record_ids, rows):
+                yield layer_name, record_id, {
+                    field_name: value
+                    for field_name, value in zip(field_names, values)
+                    if value is not None
+                }
+
+    def parse_file(
+        self, file_path: str, layers: Optional[Collection[str]] = None
+    ) -> Dict[str, Mapping[str, Any]]:
+        """Parse NDA file and group by layer name
+
+        Layers are {record_id: properties} dicts, or ColumnarLayer tables
+        when the parser was created with columnar=True. layers restricts
+        parsing to the named layers. Results, and the layer definitions
+        read with them, are reused from the parser's cache when it has one.
+        """
+        parsed_data, self._layer_fields, self._layer_definitions = self._cached_parse(
+            Path(file_path),
+            (self.columnar, sorted(layers) if layers is not None else None),
+            lambda: self._parse_file(file_path, layers),
+        )
+        return parsed_data
+
+    def _parse_file(
+        self, file_path: str, layers: Optional[Collection[str]] = None
+    ) -> Tuple[
+        Dict[str, Mapping[str, Any]],
+        Dict[str, Tuple[List[str], List[str]]],
+        Dict[str, LayerDefinition],
+    ]:
+        file_path = Path(file_path)
+        if not path_exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        layer_records: Dict[str, Any] = {}
         total_records = 0
 
         try:
-            with open(file_path, "r", encoding=self.encoding) as file:
-                lines = file.readlines()
-                i = 0
-
-                while i < len(lines):
-                    line = lines[i].strip()
-
-                    # Parse layer information
-                    if line == "<LAYER_START>":
-                        i += 1
-                        while i < len(lines):
-                            line = lines[i].strip()
-                            if line == "$LAYER_NAME":
-                                i += 1
-                                current_layer = lines[i].strip().strip('"')
-                                logger.info(f"Processing layer: {current_layer}")
-                                if current_layer not in parsed_data:
-                                    parsed_data[current_layer] = {}
-                                    layer_fields[current_layer] = []
-                                    layer_field_types[current_layer] = []
-                                break
-                            i += 1
-
-                    # Parse field definitions
-                    elif line == "$ASPATIAL_FIELD_DEF" and current_layer:
-                        logger.info(
-                            f"\n=== Start field definitions of layer {current_layer} ==="
-                        )
-                        i += 1
-                        while i < len(lines):
-                            line = lines[i].strip()
-                            if line == "$END":
-                                break
-                            if line.startswith("ATTRIB"):
-                                try:
-                                    field_def = line[7:-1]  # Remove ATTRIB( and )
-                                    parts = field_def.split(",")
-                                    field_name = parts[0].strip('"')
-                                    field_type = parts[1].strip()
-
-                                    layer_fields[current_layer].append(field_name)
-                                    layer_field_types[current_layer].append(field_type)
-                                    logger.info(
-                                        f"Field added: {field_name} ({field_type})"
-                                    )
-                                except Exception as e:
-                                    logger.error(
-                                        f"Failed to parse field definition: {line}, {str(e)}"
-                                    )
-                            i += 1
-                        logger.info(
-                            f"=== Layer {current_layer} field definitions completed (Total: {len(layer_fields[current_layer])}) ==="
+            for current_layer, record_ids, rows in self._iter_record_batches(
+                file_path, layers=layers
+            ):
+                record_ids, columns = self._convert_batch(
+                    current_layer, record_ids, rows
+                )
+                field_names, field_types = self._layer_fields[current_layer]
+
+                if self.columnar:
+                    if current_layer not in layer_records:
+                        layer_records[current_layer] = ColumnarLayer(
+                            current_layer, field_names, field_types
                         )
+                    records = layer_records[current_layer]
+                    records.extend(record_ids, columns)
+                else:
+                    records = layer_records.setdefault(current_layer, {})
+                    for record_id, values in zip(record_ids, zip(*columns)):
+                        records[record_id] = {
+                            field_name: value
+                            for field_name, value in zip(field_names, values)
+                            if value is not None
+                        }
 
-                    # Parse data records
-                    elif line == "<DATA>":
-                        in_data_section = True
-                        logger.debug(f"Data section started: layer {current_layer}")
-                        i += 1
-                        continue
-
-                    elif (
-                        in_data_section and line.startswith("$RECORD") and current_layer
-                    ):
-                        record_id = line.split()[1].strip()
-                        if i + 1 >= len(lines):
-                            i += 1
-                            continue
-
-                        data_line = lines[i + 1].strip()
-                        values = self._parse_csv_line(data_line)
-
-                        field_names = layer_fields[current_layer]
-                        field_types = layer_field_types[current_layer]
-
-                        if len(values) != len(field_names):
-                            logger.warning(
-                                f"Layer {current_layer}, record {record_id}: Field count mismatch (expected: {len(field_names)}, actual: {len(values)})"
-                            )
-                            i += 2
-                            continue
-
-                        properties = {}
-                        for field_name, field_type, value in zip(
-                            field_names, field_types, values
-                        ):
-                            if value and value.strip(
-                                '"'
-                            ):  # Exclude empty values or only quotes
-                                parsed_value = self._parse_field_value(
-                                    value, field_type
-                                )
-                                if parsed_value is not None:
-                                    properties[field_name] = parsed_value
-
-                        if properties:  # Save only if there is at least one property
-                            parsed_data[current_layer][record_id] = properties
-                            total_records += 1
-
-                            if total_records == 1:
-                                logger.info(
-                                    f"\n=== First record of layer {current_layer} ==="
-                                )
-                                for field_name, value in properties.items():
-                                    logger.info(f"- {field_name}: {value}")
-                                logger.info("============================")
-
-                        i += 2
-                        continue
-
-                    elif line == "<END>":
-                        if in_data_section and current_layer:
-                            logger.info(
-                                f"Layer {current_layer} data section ended: {len(parsed_data[current_layer])} records"
-                            )
-                        in_data_section = False
-
-                    i += 1
+                if record_ids and total_records == 0:
+                    logger.info(f"\n=== First record of layer {current_layer} ===")
+                    for field_name, value in records[record_ids[0]].items():
+                        logger.info(f"- {field_name}: {value}")
+                    logger.info("============================")
+                total_records += len(record_ids)
 
                 logger.info(
-                    f"Total {total_records} records parsed from {len(parsed_data)} layers"
+                    f"Layer {current_layer} data section ended: {len(records)} records"
                 )
 
         except Exception as e:
             logger.error(f"Error occurred during parsing NDA file: {e}")
             raise
 
-        return parsed_data
+        # keep every declared layer, in file order, even without records
+        parsed_data = {}
+        for layer_name, (field_names, field_types) in self._layer_fields.items():
+            if layer_name in layer_records:
+                parsed_data[layer_name] = layer_records[layer_name]
+            elif self.columnar:
+                parsed_data[layer_name] = ColumnarLayer(
+                    layer_name, field_names, field_types
+                )
+            else:
+                parsed_data[layer_name] = {}
+        logger.info(
+            f"Total {total_records} records parsed from {len(parsed_data)} layers"
+        )
+        return parsed_data, self._layer_fields, self._layer_definitions
+
+    def _parse_column(
+        self, values: Sequence[str], field_type: str, is_float: Optional[bool] = None
+    ) -> List[Any]:
+        """Parse all values of a field at once, falling back to cell by cell
+
+        is_float makes NUMERIC values floats (True) or ints where they have
+        no decimal point (False) regardless of the other values.
+        """
+        try:
+            return FieldParser.parse_column(values, field_type.upper(), is_float)
+        except ValueError:
+            column = [
+                self._parse_field_value(value, field_type) if value else None
+                for value in values
+            ]
+            if is_float:
+                column = [
+                    float(value) if type(value) is int else value for value in column
+                ]
+            return column
 
     def _parse_field_value(self, value: str, field_type: str) -> Any:
         """Parse field value according to its type"""
@@ -199,11 +492,7 @@ class NDAParser(BaseParser):
                     return float(value)
                 return int(value)
             elif field_type.upper() == "STRING":
-                # Handle Korean string
-                try:
-                    return value.encode("cp949").decode("cp949")
-                except UnicodeError:
-                    return value
+                return value
             else:
                 logger.warning(f"Unknown field type: {field_type}")
                 return value
@@ -1,8 +1,30 @@
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from typing import (
+    Dict,
+    Any,
+    AnyStr,
+    Collection,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 import logging
 from .base_parser import BaseParser
-from .types import LayerDefinition, GeometryType, FieldDefinition
+from .parse_cache import ParseCache
+from .archive import is_streamed, path_exists
+from .scanner import ByteScanner
+from .types import CompactGeometry, LayerDefinition, GeometryType, FieldDefinition
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, coordinates fall back to lists
+    np = None
 
 logger = logging.getLogger(__name__)
 
@@ -15,137 +37,552 @@ def setup_logging():
     )
 
 
+# area of interest (min_x, min_y, max_x, max_y)
+AOI = Tuple[float, float, float, float]
+
+GEOMETRY_KEYWORDS = ("POLYGON", "LINESTRING", "POINT")
+_STOP_KEYWORDS = frozenset(
+    GEOMETRY_KEYWORDS + tuple(k.encode("ascii") for k in GEOMETRY_KEYWORDS)
+)
+
+
+def _intersects(bounds: Sequence[float], aoi: AOI) -> bool:
+    return (
+        bounds[0] <= aoi[2]
+        and bounds[2] >= aoi[0]
+        and bounds[1] <= aoi[3]
+        and bounds[3] >= aoi[1]
+    )
+
+
+def _parse_range(
+    encoding: str,
+    compact: bool,
+    file_path: Path,
+    start: int,
+    end: Optional[int],
+    layer: Optional[str],
+    aoi: Optional[AOI] = None,
+) -> List[Tuple[str, str, Any]]:
+    """Parse one byte range of a file, run in a worker process"""
+    parser = NGIParser(encoding, compact)
+    return list(parser._iter_range(file_path, start, end, layer, aoi))
+
+
 class NGIParser(BaseParser):
+    def __init__(
+        self,
+        encoding: str = "cp949",
+        compact: bool = False,
+        cache: Optional[ParseCache] = None,
+    ) -> None:
+        """compact=True emits CompactGeometry objects instead of GeoJSON dicts"""
+        super().__init__(encoding, cache)
+        self.compact = compact
+
     def parse_coordinates(
-        self, lines: List[str], start_idx: int
-    ) -> Tuple[List[List[float]], int]:
-        """Parse coordinate data from lines"""
-        coordinates = []
+        self, lines: List[str], start_idx: int, as_array: bool = False
+    ) -> Tuple[Any, int]:
+        """Parse coordinate data from lines
+
+        With as_array=True the coordinates are returned as an (n, 2) float64
+        NumPy array instead of a list of [x, y] lists.
+        """
+        if as_array and np is None:
+            raise ImportError("NumPy is required for array coordinates")
+
         try:
             num_points = int(lines[start_idx].strip())
-
-            for i in range(num_points):
-                if start_idx + 1 + i >= len(lines):
-                    break
-                line = lines[start_idx + 1 + i].strip()
-                if (
-                    not line
-                    or line.startswith("$")
-                    or line in ["POLYGON", "LINESTRING", "POINT"]
-                ):
-                    break
+        except ValueError as e:
+            logger.error(f"Failed to parse number of points: {lines[start_idx]}, {e}")
+            empty = np.empty((0, 2)) if as_array else []
+            return empty, start_idx + 1
+
+        block = lines[start_idx + 1:start_idx + 1 + num_points]
+        coordinates = self._parse_coordinate_lines(block, as_array)
+        return coordinates, start_idx + num_points + 1
+
+    def _parse_coordinate_lines(self, block: List[AnyStr], as_array: bool = False):
+        """Parse a block of "x y" lines (str or bytes), stopping at the next keyword"""
+        if block:
+            # Fast path: convert the whole block in one call. Any keyword or
+            # malformed line makes the conversion fail and falls through to
+            # the line by line parser below.
+            tokens = (" " if isinstance(block[0], str) else b" ").join(block).split()
+            if len(tokens) == 2 * len(block):
                 try:
-                    x, y = map(float, line.split())
-                    coordinates.append([x, y])
+                    if np is not None:
+                        values = np.array(tokens, dtype=np.float64).reshape(-1, 2)
+                        return values if as_array else values.tolist()
+                    values = iter(list(map(float, tokens)))
+                    return [[x, y] for x, y in zip(values, values)]
                 except ValueError:
-                    logger.warning(f"Failed to parse coordinates: {line}")
-                    continue
-
-            return coordinates, start_idx + num_points + 1
+                    pass
 
+        coordinates = []
+        for line in block:
+            line = line.strip()
+            if not line or line[:1] in ("$", b"$") or line in _STOP_KEYWORDS:
+                break
+            try:
+                x, y = map(float, line.split())
+                coordinates.append([x, y])
+            except ValueError:
+                logger.warning(f"Failed to parse coordinates: {line}")
+                continue
+        if as_array:
+            return np.array(coordinates, dtype=np.float64).reshape(-1, 2)
+        return coordinates
+
+    def _read_coordinates(
+        self, lines: Iterator[bytes], count_line: Optional[bytes] = None
+    ) -> Any:
+        """Read a point count line and the coordinate lines following it
+
+        Returns a list of [x, y] lists, or a flat array('d') in compact mode.
+        """
+        if count_line is None:
+            count_line = next(lines, b"")
+        try:
+            num_points = int(count_line)
         except ValueError as e:
-            logger.error(f"Failed to parse number of points: {lines[start_idx]}, {e}")
-            return [], start_idx + 1
+            logger.error(f"Failed to parse number of points: {count_line}, {e}")
+            return array("d") if self.compact else []
+
+        block = list(islice(lines, num_points))
+        if not self.compact:
+            return self._parse_coordinate_lines(block)
+
+        tokens = b" ".join(block).split()
+        if len(tokens) == 2 * len(block):
+            try:
+                return array("d", map(float, tokens))
+            except ValueError:
+                pass
+        return array("d", chain.from_iterable(self._parse_coordinate_lines(block)))
+
+    def _read_point(self, lines: Iterator[bytes]) -> Any:
+        """Read a single "x y" line as a one point coordinate block
+
+        A point without coordinates gives the stripped record or section
+        marker read in their place, for the caller to handle.
+        """
+        line = next(lines, b"")
+        try:
+            x, y = map(float, line.split())
+        except ValueError:
+            logger.warning(f"Failed to parse point: {line}")
+            line = line.strip()
+            return line if line[:1] in (b"$", b"<") else None
+        return array("d", (x, y)) if self.compact else [[x, y]]
+
+    def _num_points(self, block: Any) -> int:
+        return len(block) // 2 if self.compact else len(block)
+
+    def _block_bounds(self, block: Any) -> Optional[Tuple[float, ...]]:
+        """(min_x, min_y, max_x, max_y) of a coordinate block"""
+        if not len(block):
+            return None
+        if self.compact:
+            xs, ys = block[0::2], block[1::2]
+        else:
+            xs = [point[0] for point in block]
+            ys = [point[1] for point in block]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def _make_geometry(
+        self,
+        geom_type: str,
+        parts: List[Any],
+        properties: Optional[dict] = None,
+        aoi: Optional[AOI] = None,
+    ) -> Any:
+        """Build a geometry from its coordinate blocks (one per part/ring)
+
+        With aoi nothing is built, and None returned, when the extent of
+        the coordinates misses the area of interest.
+        """
+        if geom_type == "Point" and not (parts and len(parts[0])):
+            return None
+
+        if aoi is not None:
+            bounds = [self._block_bounds(part) for part in parts]
+            bounds = [b for b in bounds if b is not None]
+            if not bounds or not _intersects(
+                (
+                    min(b[0] for b in bounds),
+                    min(b[1] for b in bounds),
+                    max(b[2] for b in bounds),
+                    max(b[3] for b in bounds),
+                ),
+                aoi,
+            ):
+                return None
+
+        if self.compact:
+            return CompactGeometry.from_parts(geom_type, parts, properties)
+
+        if geom_type in ("Polygon", "MultiLineString"):
+            coordinates = parts
+        elif geom_type == "Point":
+            coordinates = parts[0][0]
+        else:
+            coordinates = parts[0]
+
+        geometry = {"type": geom_type, "coordinates": coordinates}
+        if properties is not None:
+            geometry["properties"] = properties
+        return geometry
+
+    def _read_geometry(
+        self,
+        keyword: bytes,
+        lines: Iterator[bytes],
+        layer: str,
+        record: str,
+        aoi: Optional[AOI] = None,
+    ) -> Any:
+        """Read the geometry introduced by keyword, None if it is unusable
+
+        or outside aoi. A point without coordinates gives the marker line
+        read in their place instead (see _read_point).
+        """
+        if keyword == b"POLYGON":
+            line = next(lines, b"").strip()
+            if line.startswith(b"NUMPARTS"):
+                try:
+                    num_parts = int(line.split()[1])
+                except (IndexError, ValueError):
+                    logger.warning(f"Layer {layer}, Record {record}: {line}")
+                    return None
+                rings = [self._read_coordinates(lines) for _ in range(num_parts)]
+            else:
+                rings = [self._read_coordinates(lines, line)]
+
+            if not rings or any(self._num_points(ring) < 4 for ring in rings):
+                logger.warning(
+                    f"Layer {layer}, Record {record}: Polygon has less than 4 coordinates"
+                )
+                return None
+            return self._make_geometry("Polygon", rings, aoi=aoi)
+
+        if keyword == b"LINESTRING":
+            return self._make_geometry(
+                "LineString", [self._read_coordinates(lines)], aoi=aoi
+            )
+
+        if keyword == b"POINT":
+            point = self._read_point(lines)
+            if point is None or isinstance(point, bytes):
+                return point
+            return self._make_geometry("Point", [point], aoi=aoi)
 
-    def parse_file(self, file_path: str) -> Dict[str, Dict[str, Any]]:
-        """Parse NGI file and group by layer name"""
+        if keyword == b"NETWORKCHAIN" or keyword == b"NETWORK CHAIN":
+            return self._make_geometry(
+                "MultiLineString", [self._read_coordinates(lines)], aoi=aoi
+            )
+
+        if keyword == b"MULTIPOINT":
+            return self._make_geometry(
+                "MultiPoint", [self._read_coordinates(lines)], aoi=aoi
+            )
+
+        if keyword == b"TEXT":
+            point = self._read_point(lines)
+            if point is None or isinstance(point, bytes):
+                return point
+            return self._make_geometry("Point", [point], {"text_type": True}, aoi)
+
+        return None
+
+    def iter_records(
+        self,
+        file_path: str,
+        layers: Optional[Collection[str]] = None,
+        aoi: Optional[AOI] = None,
+    ) -> Iterator[Tuple[str, str, Any]]:
+        """Yield (layer_name, record_id, geometry) one record at a time
+
+        With layers only the named layers are read; the sections of the
+        other layers are skipped without being scanned. With an area of
+        interest aoi=(min_x, min_y, max_x, max_y), layers whose BOUND header
+        misses it are skipped the same way, and so are records whose extent
+        misses it. Zip members and .gz files are read in a single pass that
+        passes over the lines of the skipped layers.
+
+        With a cache the records of every layer are stored once read to the
+        end, and later reads of the same file content take them from there.
+        """
         file_path = Path(file_path)
-        if not file_path.exists():
+        if not path_exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
+        if self.cache is not None and not is_streamed(file_path):
+            return self._iter_cached_records(file_path, layers, aoi)
+        return self._iter_records(file_path, layers, aoi)
+
+    def _iter_records(
+        self,
+        file_path: Path,
+        layers: Optional[Collection[str]] = None,
+        aoi: Optional[AOI] = None,
+    ) -> Iterator[Tuple[str, str, Any]]:
+        if (layers is None and aoi is None) or is_streamed(file_path):
+            return self._iter_range(file_path, aoi=aoi, layers=layers)
+        return chain.from_iterable(
+            self._iter_range(file_path, start, end, aoi=aoi)
+            for start, end, _ in self._layer_ranges(file_path, layers, aoi)
+        )
 
-        parsed_data: Dict[str, Dict[str, Any]] = (
-            {}
-        )  # layer_name -> {record_id -> geometry}
-        current_record = None
-        current_layer = None
-
-        with open(file_path, "r", encoding=self.encoding) as file:
-            lines = file.readlines()
-            i = 0
-            while i < len(lines):
-                line = lines[i].strip()
+    def _iter_cached_records(
+        self,
+        file_path: Path,
+        layers: Optional[Collection[str]] = None,
+        aoi: Optional[AOI] = None,
+    ) -> Iterator[Tuple[str, str, Any]]:
+        """iter_records() with one cache entry per layer section
+
+        Only the records of one layer are held in memory at a time.
+        """
+        for start, end, name in self._layer_ranges(file_path, layers, aoi):
+            yield from self._cached_parse(
+                file_path,
+                (
+                    "records",
+                    self.compact,
+                    name,
+                    start,
+                    tuple(aoi) if aoi is not None else None,
+                ),
+                lambda: list(self._iter_range(file_path, start, end, aoi=aoi)),
+            )
 
-                if not line:
-                    i += 1
+    def select_layers(
+        self,
+        file_path: str,
+        layers: Optional[Collection[str]] = None,
+        aoi: Optional[AOI] = None,
+    ) -> List[str]:
+        """Names of the layers iter_records reads with layers and aoi
+
+        Only the layer headers are read, so this is a cheap check of
+        whether a sheet has anything in an area of interest.
+        """
+        file_path = Path(file_path)
+        if not path_exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        return [name for _, _, name in self._layer_ranges(file_path, layers, aoi)]
+
+    def _layer_ranges(
+        self,
+        file_path: Path,
+        layers: Optional[Collection[str]] = None,
+        aoi: Optional[AOI] = None,
+    ) -> List[Tuple[int, int, str]]:
+        """(start, end, name) byte ranges of the selected layers
+
+        Layers are selected by name and, with aoi, by their BOUND header;
+        layers without one are kept.
+        """
+        selected = []
+        with ByteScanner(file_path) as scanner:
+            ranges = scanner.layers(self.encoding)
+            for start, end, name in ranges:
+                if layers is not None and name not in layers:
                     continue
+                if aoi is not None:
+                    header = scanner.header(start, end)
+                    bounds, _ = self.parse_bounds(self._decode(header).splitlines(), 0)
+                    if bounds and not _intersects(bounds, aoi):
+                        continue
+                selected.append((start, end, name))
+        logger.debug(f"Reading {len(selected)} of {len(ranges)} layers")
+        return selected
+
+    def _iter_range(
+        self,
+        file_path: Path,
+        start: int = 0,
+        end: Optional[int] = None,
+        layer: Optional[str] = None,
+        aoi: Optional[AOI] = None,
+        layers: Optional[Collection[str]] = None,
+    ) -> Iterator[Tuple[str, str, Any]]:
+        """Yield the records of the lines starting in [start, end)
+
+        layer is the layer the range starts in when it begins in the middle
+        of a data section. Records outside aoi are skipped, and so are the
+        layers not in layers or whose BOUND header misses aoi.
+        """
+        current_layer = layer
+        current_record = None
 
-                # Parse layer name
-                if line == "$LAYER_NAME":
-                    i += 1
-                    if i < len(lines):
-                        current_layer = self.parse_value(lines[i].strip())
-                        if current_layer not in parsed_data:
-                            parsed_data[current_layer] = {}
+        # Work on raw bytes: coordinates are ASCII and float() accepts bytes,
+        # so only layer names and record ids are ever decoded.
+        with ByteScanner(file_path, start, end) as scanner:
+            lines = iter(scanner)
+            for raw in lines:
+                line = raw.strip()
+                # a line is handled again when a point without coordinates
+                # read it in place of its coordinate line
+                while line:
+                    unread = None
+
+                    # Parse layer name
+                    if line == b"$LAYER_NAME":
+                        current_layer = self.parse_value(
+                            self._decode(next(lines, b""))
+                        )
+                        current_record = None
+                        if layers is not None and current_layer not in layers:
+                            current_layer = None
                         logger.debug(f"Processing layer: {current_layer}")
 
-                if line.startswith("$RECORD"):
-                    current_record = line.split()[1]
-                    i += 1
-                    continue
+                    elif aoi is not None and line.startswith(b"BOUND("):
+                        bounds, _ = self.parse_bounds([self._decode(line)], 0)
+                        if bounds and not _intersects(bounds, aoi):
+                            current_layer = None
+
+                    elif line.startswith(b"$RECORD"):
+                        current_record = self._decode(line.split()[1])
+
+                    elif current_record and current_layer:
+                        geometry = self._read_geometry(
+                            line, lines, current_layer, current_record, aoi
+                        )
+                        if isinstance(geometry, bytes):
+                            unread = geometry
+                        elif geometry is not None:
+                            yield current_layer, current_record, geometry
+                            # a record holds a single geometry, ignore the rest
+                            current_record = None
+
+                    line = unread
+
+    def _partition(
+        self, file_path: Path, parts: int
+    ) -> List[Tuple[int, Optional[int], Optional[str]]]:
+        """Split a file into about parts (start, end, layer) byte ranges
+
+        A scan for the <LAYER_START> markers gives the layer boundaries and
+        names; ranges are cut at the first layer or $RECORD line after each
+        even split point, so a large layer is spread over several ranges.
+        """
+        with ByteScanner(file_path) as scanner:
+            mm = scanner.map
+            if mm is None or parts <= 1:
+                return [(0, None, None)]
+            size = len(mm)
+
+            # (offset, name) of every layer
+            layers = [
+                (start, name) for start, _, name in scanner.layers(self.encoding)
+            ]
+            offsets = [offset for offset, _ in layers]
+            cuts = [0]
+            for k in range(1, parts):
+                target = max(size * k // parts, cuts[-1] + 1)
+                record = mm.find(b"\n$RECORD", target)
+                index = bisect_left(offsets, target)
+                candidates = []
+                if record != -1:
+                    candidates.append(record + 1)
+                if index < len(offsets):
+                    candidates.append(offsets[index])
+                if candidates and min(candidates) > cuts[-1]:
+                    cuts.append(min(candidates))
+
+        ranges = []
+        for start, end in zip(cuts, cuts[1:] + [None]):
+            index = bisect_right(offsets, start) - 1
+            ranges.append((start, end, layers[index][1] if index >= 0 else None))
+        return ranges
+
+    @staticmethod
+    def _select_ranges(
+        ranges: List[Tuple[int, Optional[int], Optional[str]]],
+        layer_ranges: List[Tuple[int, int, str]],
+    ) -> List[Tuple[int, Optional[int], Optional[str]]]:
+        """Intersect partition ranges with the ranges of the selected layers
+
+        Both are cut at layer or record boundaries, so every intersection
+        is a valid range on its own.
+        """
+        selected = []
+        for start, end, _ in ranges:
+            for layer_start, layer_end, name in layer_ranges:
+                lo = max(start, layer_start)
+                hi = layer_end if end is None else min(end, layer_end)
+                if lo < hi:
+                    selected.append((lo, hi, name))
+        return selected
+
+    def parse_file(
+        self,
+        file_path: str,
+        workers: Optional[int] = None,
+        layers: Optional[Collection[str]] = None,
+        aoi: Optional[AOI] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Parse NGI file and group by layer name
+
+        With workers > 1 the file is split into byte ranges at layer and
+        record boundaries which are parsed in a process pool; the result is
+        the same as a sequential parse. layers and aoi restrict parsing to
+        the named layers and the area of interest, see iter_records.
+        Results are reused from the parser's cache when it has one.
+        """
+        return self._cached_parse(
+            Path(file_path),
+            (
+                self.compact,
+                sorted(layers) if layers is not None else None,
+                tuple(aoi) if aoi is not None else None,
+            ),
+            lambda: self._parse_file(file_path, workers, layers, aoi),
+        )
+
+    def _parse_file(
+        self,
+        file_path: str,
+        workers: Optional[int] = None,
+        layers: Optional[Collection[str]] = None,
+        aoi: Optional[AOI] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        parsed_data: Dict[str, Dict[str, Any]] = (
+            {}
+        )  # layer_name -> {record_id -> geometry}
+
+        if not workers or workers <= 1 or is_streamed(file_path):
+            for layer_name, record_id, geometry in self._iter_records(
+                Path(file_path), layers, aoi
+            ):
+                parsed_data.setdefault(layer_name, {})[record_id] = geometry
+            return parsed_data
+
+        file_path = Path(file_path)
+        if not path_exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
 
-                if current_record and current_layer:
-                    if line == "POLYGON":
-                        i += 1  # Move to NUMPARTS 1 line
-                        if lines[i].strip() == "NUMPARTS 1":
-                            i += 1  # Move to coordinate count line
-                        coords, i = self.parse_coordinates(lines, i)
-
-                        if len(coords) < 4:
-                            logger.warning(
-                                f"Layer {current_layer}, Record {current_record}: Polygon has less than 4 coordinates"
-                            )
-                            i += 1
-                            continue
-
-                        parsed_data[current_layer][current_record] = {
-                            "type": "Polygon",
-                            "coordinates": [coords],
-                        }
-
-                    elif line == "LINESTRING":
-                        i += 1
-                        coords, i = self.parse_coordinates(lines, i)
-                        parsed_data[current_layer][current_record] = {
-                            "type": "LineString",
-                            "coordinates": coords,
-                        }
-                    elif line == "POINT":
-                        i += 1
-                        line = lines[i].strip()
-                        x, y = map(float, line.split())
-                        parsed_data[current_layer][current_record] = {
-                            "type": "Point",
-                            "coordinates": [x, y],
-                        }
-                        i += 1
-                    elif line == "NETWORKCHAIN" or line == "NETWORK CHAIN":
-                        i += 1
-                        coords, i = self.parse_coordinates(lines, i)
-                        parsed_data[current_layer][current_record] = {
-                            "type": "MultiLineString",
-                            "coordinates": [coords],
-                        }
-                    elif line == "MULTIPOINT":
-                        i += 1
-                        coords, i = self.parse_coordinates(lines, i)
-                        parsed_data[current_layer][current_record] = {
-                            "type": "MultiPoint",
-                            "coordinates": coords,
-                        }
-                    elif line == "TEXT":
-                        i += 1
-                        line = lines[i].strip()
-                        try:
-                            x, y = map(float, line.split())
-                            parsed_data[current_layer][current_record] = {
-                                "type": "Point",
-                                "coordinates": [x, y],
-                                "properties": {"text_type": True},
-                            }
-                        except ValueError:
-                            self.logger.warning(f"Failed to parse text point: {line}")
-                        i += 1
-                i += 1
+        ranges = self._partition(file_path, workers * 4)
+        if layers is not None or aoi is not None:
+            ranges = self._select_ranges(
+                ranges, self._layer_ranges(file_path, layers, aoi)
+            )
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    _parse_range,
+                    self.encoding,
+                    self.compact,
+                    file_path,
+                    *file_range,
+                    aoi,
+                )
+                for file_range in ranges
+            ]
+            for future in futures:
+                for layer_name, record_id, geometry in future.result():
+                    parsed_data.setdefault(layer_name, {})[record_id] = geometry
 
         return parsed_data
 
@@ -0,0 +1,142 @@
+import hashlib
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .archive import open_binary, source_file
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ParseCache", "file_hash"]
+
+# part of every key, bump when the parsed output changes shape
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 1 << 30
+ENTRY_SUFFIX = ".pickle"
+
+_HASH_CHUNK = 1 << 20
+
+
+def file_hash(file_path: Union[str, Path]) -> str:
+    """Hex digest of the content of a file, decompressed for archive members"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open_binary(file_path) as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _default_directory() -> Path:
+    directory = os.environ.get("NGI_PARSE_CACHE_DIR")
+    if directory:
+        return Path(directory)
+    return Path.home() / ".cache" / "ngi_file_loader" / "parse"
+
+
+class ParseCache:
+    """On-disk cache of parse results keyed by file content
+
+    Entries are pickles named after a hash of the input file content, the
+    parser and its options, so renamed or copied sheets still hit and
+    edited ones miss. Geometries and columns are array based and pickle
+    as raw buffers. The least recently used entries are removed once the
+    directory grows over max_bytes. Only point it at a directory you
+    trust, entries are unpickled.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.directory = Path(directory) if directory else _default_directory()
+        self.max_bytes = max_bytes
+        # (path, size, mtime_ns) -> content hash, saves rehashing unchanged files
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+
+    def key(self, file_path: Union[str, Path], *parts: Any) -> str:
+        """Cache key of a file's content and the parse options in parts"""
+        file_path = Path(file_path)
+        stat = source_file(file_path).stat()
+        stat_key = (str(file_path.resolve()), stat.st_size, stat.st_mtime_ns)
+        content_hash = self._hashes.get(stat_key)
+        if content_hash is None:
+            content_hash = file_hash(file_path)
+            self._hashes[stat_key] = content_hash
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((CACHE_VERSION, content_hash) + parts).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}{ENTRY_SUFFIX}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """The cached value of key, None on a miss"""
+        path = self._entry_path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Removing unreadable cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        logger.debug(f"Parse cache hit: {key}")
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store value under key and evict old entries over the size budget"""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            logger.debug(f"Not caching {key}: {len(data)} bytes over budget")
+            return
+        path = self._entry_path(key)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Cannot write parse cache entry {path}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+        self._evict()
+
+    def _entries(self) -> List[Tuple[int, int, Path]]:
+        """(mtime, size, path) of every entry, oldest first"""
+        entries = []
+        for path in self.directory.glob(f"*{ENTRY_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return sorted(entries)
+
+    @property
+    def size(self) -> int:
+        """Total size of the cache entries in bytes"""
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.debug(f"Evicted parse cache entry {path.name}")
+
+    def clear(self) -> None:
+        for _, _, path in self._entries():
+            path.unlink(missing_ok=True)
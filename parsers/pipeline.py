@@ -0,0 +1,211 @@
+import logging
+import time
+from pathlib import Path
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypedDict,
+)
+
+from .archive import find_companion
+from .converters.geojson_converter import GeoJSONConverter
+from .converters.native_geopackage_writer import NativeGeoPackageWriter
+from .fingerprint import layer_fingerprints, read_fingerprints, write_fingerprints
+from .nda_parser import NDAParser
+from .ngi_parser import AOI, NGIParser
+from .parse_cache import ParseCache
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["OUTPUT_FORMATS", "ConversionResult", "find_nda", "convert_sheet"]
+
+# output format -> suffix of the output path
+OUTPUT_FORMATS = {"gpkg": ".gpkg", "geojson": ".geojson", "geojsons": ".geojsons"}
+
+
+class ConversionResult(TypedDict):
+    ngi_path: str
+    nda_path: Optional[str]
+    output_path: str
+    layers: Dict[str, int]  # layer name -> feature count
+    unchanged: List[str]  # layers kept from the previous output
+    seconds: float
+
+
+def find_nda(ngi_path: Path) -> Optional[Path]:
+    """The NDA file of an NGI file (same stem, any suffix case)
+
+    It is looked up next to the NGI file, a plain or .gz one, or in the
+    same zip file for an archive member.
+    """
+    nda_path = find_companion(ngi_path, ".nda")
+    return Path(nda_path) if nda_path is not None else None
+
+
+def _count_layers(
+    features: Iterable[Tuple[str, Any]], counts: Dict[str, int]
+) -> Iterator[Tuple[str, Any]]:
+    for layer_name, feature in features:
+        counts[layer_name] = counts.get(layer_name, 0) + 1
+        yield layer_name, feature
+
+
+def convert_sheet(
+    ngi_path: str,
+    output_path: str,
+    nda_path: Optional[str] = None,
+    output_format: str = "gpkg",
+    writer: str = "native",
+    spatial_index: str = "deferred",
+    layers: Optional[Collection[str]] = None,
+    incremental: bool = False,
+    aoi: Optional[AOI] = None,
+    cache_dir: Optional[str] = None,
+) -> ConversionResult:
+    """Convert one NGI/NDA map sheet without QGIS
+
+    NGI and NDA records are streamed and merged as in the processing
+    algorithm. output_format is "gpkg", written by the sqlite3 based
+    NativeGeoPackageWriter or with writer="ogr" by GDAL, or "geojson" /
+    "geojsons" for one FeatureCollection or GeoJSONSeq file per layer
+    named after output_path. Without nda_path the NDA file next to the NGI
+    file is used when there is one. layers restricts the conversion to the
+    named layers.
+
+    With incremental=True the GeoPackage output records a fingerprint of the
+    source bytes of every layer, and an existing output with fingerprints is
+    updated instead of rewritten: only layers whose fingerprint changed are
+    converted, layers gone from the source are removed, and an up to date
+    file is left alone.
+
+    aoi=(min_x, min_y, max_x, max_y) keeps only the features whose extent
+    intersects the area of interest; a sheet without any layer in it is
+    skipped and no output is written. An incremental run with an aoi also
+    removes the stored layers outside of it.
+
+    With cache_dir the parsed records of every layer are cached there, and
+    converting the same sheet content again reads them from the cache.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Invalid output format: {output_format}")
+    if incremental and output_format != "gpkg":
+        raise ValueError("Incremental conversion needs GeoPackage output")
+
+    start = time.perf_counter()
+    ngi_path = Path(ngi_path)
+    nda_file = Path(nda_path) if nda_path else find_nda(ngi_path)
+
+    cache = ParseCache(cache_dir) if cache_dir else None
+    ngi_parser = NGIParser(compact=True, cache=cache)
+    if aoi is not None:
+        layers = ngi_parser.select_layers(str(ngi_path), layers, aoi)
+        if not layers:
+            logger.info(f"{ngi_path} has no layer in the area of interest")
+            return ConversionResult(
+                ngi_path=str(ngi_path),
+                nda_path=str(nda_file) if nda_file is not None else None,
+                output_path=str(output_path),
+                layers={},
+                unchanged=[],
+                seconds=time.perf_counter() - start,
+            )
+
+    fingerprints: Dict[str, str] = {}
+    stored: Dict[str, str] = {}
+    drop_layers: List[str] = []
+    if incremental:
+        fingerprints = layer_fingerprints(
+            ngi_path, nda_file, settings=(spatial_index, aoi)
+        )
+        stored = read_fingerprints(output_path)
+        # layers gone from the source
+        drop_layers = [name for name in stored if name not in fingerprints]
+        if layers is not None:
+            fingerprints = {
+                name: value for name, value in fingerprints.items() if name in layers
+            }
+            if aoi is not None:
+                # layers outside the area of interest are not part of the output
+                drop_layers += [
+                    name
+                    for name in stored
+                    if name not in layers and name not in drop_layers
+                ]
+        if stored:
+            fingerprints = {
+                name: value
+                for name, value in fingerprints.items()
+                if stored.get(name) != value
+            }
+            drop_layers += list(fingerprints)
+    unchanged = [name for name in stored if name not in drop_layers]
+
+    if stored:
+        if not drop_layers:
+            logger.info(f"{output_path} is up to date")
+            return ConversionResult(
+                ngi_path=str(ngi_path),
+                nda_path=str(nda_file) if nda_file is not None else None,
+                output_path=str(output_path),
+                layers={},
+                unchanged=unchanged,
+                seconds=time.perf_counter() - start,
+            )
+        # forget the old fingerprints first, so an interrupted update is
+        # repaired by the next run
+        write_fingerprints(output_path, {}, remove=drop_layers)
+        layers = list(fingerprints)
+
+    nda_parser = NDAParser(cache=cache)
+    geojson_converter = GeoJSONConverter()
+    ngi_records = ngi_parser.iter_records(str(ngi_path), layers, aoi)
+    if nda_file is not None:
+        nda_records = nda_parser.iter_records(str(nda_file), layers=layers)
+        layer_definitions = nda_parser.read_layer_definitions(str(nda_file))
+    else:
+        logger.warning(f"No NDA file found for {ngi_path}, writing geometries only")
+        nda_records = iter(())
+        layer_definitions = {}
+
+    counts: Dict[str, int] = {}
+    features = _count_layers(
+        geojson_converter.iter_features(ngi_records, nda_records), counts
+    )
+
+    if output_format == "gpkg":
+        if writer == "ogr":
+            from .converters.geopackage_converter import GeoPackageConverter
+
+            gpkg_writer = GeoPackageConverter(spatial_index=spatial_index)
+        elif writer == "native":
+            gpkg_writer = NativeGeoPackageWriter(spatial_index=spatial_index)
+        else:
+            raise ValueError(f"Invalid GeoPackage writer: {writer}")
+        gpkg_writer.write_features(
+            features,
+            str(output_path),
+            layer_definitions,
+            update=bool(stored),
+            drop_layers=drop_layers,
+        )
+        if incremental:
+            write_fingerprints(output_path, fingerprints)
+    else:
+        geojson_converter.write_features(
+            features, str(output_path), seq=output_format == "geojsons"
+        )
+
+    return ConversionResult(
+        ngi_path=str(ngi_path),
+        nda_path=str(nda_file) if nda_file is not None else None,
+        output_path=str(output_path),
+        layers=counts,
+        unchanged=unchanged,
+        seconds=time.perf_counter() - start,
+    )
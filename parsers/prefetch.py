@@ -0,0 +1,187 @@
+import logging
+import multiprocessing
+import multiprocessing.spawn
+import os
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["prefetch", "can_use_processes", "python_executable"]
+
+# seconds between checks of the stop flag / producer liveness
+_POLL_INTERVAL = 0.1
+
+# serializes the temporary change of the spawn executable
+_executable_lock = threading.Lock()
+
+
+def python_executable() -> Optional[str]:
+    """A Python interpreter to start worker processes with, if one is found
+
+    Inside QGIS sys.executable is the QGIS binary, not a Python interpreter;
+    the interpreter bundled with QGIS is looked up under sys.exec_prefix
+    (pythonw.exe on Windows, so workers open no console window).
+    """
+    executable = Path(sys.executable)
+    if executable.name.lower().startswith("python"):
+        return str(executable)
+    prefix = Path(sys.exec_prefix)
+    version = f"{sys.version_info[0]}.{sys.version_info[1]}"
+    if sys.platform == "win32":
+        candidates = [prefix / "pythonw.exe", prefix / "python.exe"]
+    else:
+        candidates = [
+            prefix / "bin" / f"python{version}",
+            prefix / "bin" / "python3",
+        ]
+    for candidate in candidates:
+        if candidate.is_file():
+            return str(candidate)
+    return None
+
+
+def can_use_processes() -> bool:
+    """True when worker processes can be started and run in parallel
+
+    On a single core the cost of passing records between processes is not
+    offset by any overlap (see benchmarks/benchmark_prefetch.py), so
+    threads should be used there.
+    """
+    return (os.cpu_count() or 1) > 1 and python_executable() is not None
+
+
+@contextmanager
+def _process_context() -> Iterator[Any]:
+    """multiprocessing context starting workers with python_executable()
+
+    Outside a plain interpreter the default start method would re-run the
+    host application, so workers are spawned from the bundled interpreter.
+    The spawn executable is shared by the whole process, so it is only set
+    while the block runs and restored afterwards; workers have to be
+    started inside the block.
+    """
+    executable = python_executable()
+    if executable == sys.executable:
+        yield multiprocessing.get_context()
+        return
+    with _executable_lock:
+        previous = multiprocessing.spawn.get_executable()
+        multiprocessing.spawn.set_executable(executable)
+        try:
+            yield multiprocessing.get_context("spawn")
+        finally:
+            multiprocessing.spawn.set_executable(previous)
+
+
+def _produce(
+    func: Callable[..., Iterable[Any]],
+    args: tuple,
+    items_queue: Any,
+    stop: Any,
+    batch_size: int,
+) -> None:
+    """Run func(*args) and put its items on the queue in batches"""
+
+    def put(message) -> bool:
+        while not stop.is_set():
+            try:
+                items_queue.put(message, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        batch = []
+        for item in func(*args):
+            batch.append(item)
+            if len(batch) >= batch_size:
+                if not put(("items", batch)):
+                    return
+                batch = []
+        if batch and not put(("items", batch)):
+            return
+        put(("done", None))
+    except BaseException as e:
+        put(("error", e))
+
+
+def prefetch(
+    func: Callable[..., Iterable[Any]],
+    *args: Any,
+    batch_size: int = 1000,
+    max_batches: int = 8,
+    use_process: bool = False,
+) -> Iterator[Any]:
+    """Iterate over func(*args) while it runs in the background
+
+    The producer (a thread, or a process with use_process=True) is started
+    right away, before the first item is requested, and runs ahead by at
+    most max_batches batches of batch_size items. Exceptions raised by func
+    are re-raised here, and closing the returned iterator stops the
+    producer. In process mode func, its arguments and the items must be
+    picklable.
+    """
+    if use_process:
+        with _process_context() as context:
+            items_queue = context.Queue(max_batches)
+            stop = context.Event()
+            worker = context.Process(
+                target=_produce,
+                args=(func, args, items_queue, stop, batch_size),
+                daemon=True,
+            )
+            worker.start()
+    else:
+        items_queue = queue.Queue(max_batches)
+        stop = threading.Event()
+        worker = threading.Thread(
+            target=_produce,
+            args=(func, args, items_queue, stop, batch_size),
+            daemon=True,
+        )
+        worker.start()
+
+    items = _consume(worker, items_queue, stop, use_process)
+    # run up to the try block, so that closing the iterator before its
+    # first item still stops the producer
+    next(items)
+    return items
+
+
+def _consume(
+    worker: Any, items_queue: Any, stop: Any, use_process: bool
+) -> Iterator[Any]:
+    """Items of a started producer, preceded by a None for priming"""
+    try:
+        yield None
+        while True:
+            try:
+                kind, value = items_queue.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if not worker.is_alive():
+                    try:
+                        kind, value = items_queue.get(timeout=_POLL_INTERVAL)
+                    except queue.Empty:
+                        raise RuntimeError("Background producer exited unexpectedly")
+                else:
+                    continue
+            if kind == "items":
+                yield from value
+            elif kind == "error":
+                raise value
+            else:
+                break
+    finally:
+        stop.set()
+        worker.join(timeout=5)
+        if use_process:
+            if worker.is_alive():
+                worker.terminate()
+            items_queue.close()
+            items_queue.cancel_join_thread()
@@ -0,0 +1,264 @@
+import json
+import logging
+import os
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, TypedDict, Union
+
+from .nda_parser import NDAParser
+from .archive import is_streamed
+from .ngi_parser import NGIParser
+from .parse_cache import file_hash
+from .scanner import ByteScanner
+from .types import FieldDefinition, GeoFeature
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["FileIndex", "SheetIndex", "LayerIndex"]
+
+INDEX_VERSION = 2
+INDEX_SUFFIX = ".idx.json"
+
+
+class LayerIndex(TypedDict):
+    name: str
+    start: int  # offset of <LAYER_START>
+    end: int  # offset of the next layer, or the file size
+    geometry_type: Optional[str]  # GeometryType value of MASK(...), NGI only
+    bound: List[float]  # BOUND(min_x, min_y, max_x, max_y), NGI only
+    fields: List[Tuple[str, FieldDefinition]]  # declared type, field, NDA only
+    record_ids: List[str]
+    offsets: List[int]  # offset of the $RECORD line of every record
+
+
+class FileIndex:
+    """Byte offsets of the layers and records of an NGI or NDA file
+
+    The index is built with a few memory-map searches rather than a parse
+    and is saved next to the file (<file>.idx.json). It is reused while
+    the file keeps its size and modification time, or its content hash
+    when only the time changed.
+    """
+
+    def __init__(
+        self,
+        file_path: Union[str, Path],
+        layers: List[LayerIndex],
+        stamp: Dict[str, Any],
+        encoding: str = "cp949",
+    ) -> None:
+        self.file_path = Path(file_path)
+        self.layers: Dict[str, LayerIndex] = {layer["name"]: layer for layer in layers}
+        self.stamp = stamp
+        self.encoding = encoding
+        self._records: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def is_nda(self) -> bool:
+        return self.file_path.suffix.lower() == ".nda"
+
+    @property
+    def sidecar_path(self) -> Path:
+        return self.file_path.with_name(self.file_path.name + INDEX_SUFFIX)
+
+    @classmethod
+    def _stamp(cls, file_path: Path, content_hash: Optional[str] = None) -> dict:
+        stat = file_path.stat()
+        return {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": content_hash or file_hash(file_path),
+        }
+
+    @classmethod
+    def build(cls, file_path: Union[str, Path], encoding: str = "cp949") -> "FileIndex":
+        """Index a file without parsing its records"""
+        file_path = Path(file_path)
+        if is_streamed(file_path):
+            raise ValueError(f"Random access needs an uncompressed file: {file_path}")
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        ngi_parser = NGIParser(encoding)
+        nda_parser = NDAParser(encoding)
+
+        layers: List[LayerIndex] = []
+        with ByteScanner(file_path) as scanner:
+            mm = scanner.map
+            records = scanner.find_line_starts(b"$RECORD")
+            for start, end, name in scanner.layers(encoding):
+                header = scanner.header(start, end)
+                layer = cls._parse_header(header, encoding, ngi_parser, nda_parser)
+                layer.update(name=name, start=start, end=end, record_ids=[], offsets=[])
+
+                first = bisect_right(records, start)
+                last = bisect_right(records, end)
+                for offset in records[first:last]:
+                    mm.seek(offset)
+                    parts = mm.readline().split()
+                    if len(parts) > 1:
+                        layer["record_ids"].append(parts[1].decode(encoding))
+                        layer["offsets"].append(offset)
+                layers.append(layer)
+
+        return cls(file_path, layers, cls._stamp(file_path), encoding)
+
+    @staticmethod
+    def _parse_header(
+        header: bytes, encoding: str, ngi_parser: NGIParser, nda_parser: NDAParser
+    ) -> LayerIndex:
+        """MASK, BOUND and ATTRIB fields of a layer header"""
+        layer = LayerIndex(name="", geometry_type=None, bound=[], fields=[])
+        lines = [line.strip() for line in header.decode(encoding).splitlines()]
+        for i, line in enumerate(lines):
+            if line == "$GEOMETRIC_METADATA":
+                try:
+                    geometry_type, _ = ngi_parser.parse_geometry_type(lines, i)
+                    layer["geometry_type"] = geometry_type.value
+                except ValueError as e:
+                    logger.warning(f"Failed to parse geometry type: {e}")
+            elif line.startswith("BOUND("):
+                layer["bound"], _ = ngi_parser.parse_bounds(lines, i)
+            elif line.startswith("ATTRIB("):
+                try:
+                    layer["fields"].append(nda_parser.parse_field_definition(line))
+                except (IndexError, ValueError):
+                    logger.warning(f"Failed to parse field definition: {line}")
+        return layer
+
+    @classmethod
+    def load(
+        cls, file_path: Union[str, Path], encoding: str = "cp949", save: bool = True
+    ) -> "FileIndex":
+        """Load the sidecar index of a file, rebuilding it when stale
+
+        With save=True a new or rebuilt index is written to the sidecar
+        file; a read-only location only logs a warning.
+        """
+        file_path = Path(file_path)
+        if is_streamed(file_path):
+            raise ValueError(f"Random access needs an uncompressed file: {file_path}")
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        sidecar_path = file_path.with_name(file_path.name + INDEX_SUFFIX)
+
+        try:
+            with open(sidecar_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                index = cls(file_path, data["layers"], data["stamp"], encoding)
+                if index.is_current():
+                    return index
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable index {sidecar_path}: {e}")
+
+        index = cls.build(file_path, encoding)
+        if save:
+            index.save()
+        return index
+
+    def is_current(self) -> bool:
+        """Whether the index still describes the file on disk"""
+        try:
+            stat = self.file_path.stat()
+        except OSError:
+            return False
+        if stat.st_size != self.stamp["size"]:
+            return False
+        if stat.st_mtime_ns == self.stamp["mtime_ns"]:
+            return True
+        # touched or copied: compare the content
+        if file_hash(self.file_path) != self.stamp["hash"]:
+            return False
+        self.stamp = self._stamp(self.file_path, self.stamp["hash"])
+        return True
+
+    def save(self) -> None:
+        data = {
+            "version": INDEX_VERSION,
+            "stamp": self.stamp,
+            "layers": list(self.layers.values()),
+        }
+        tmp_path = self.sidecar_path.with_name(self.sidecar_path.name + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.sidecar_path)
+        except OSError as e:
+            logger.warning(f"Cannot save index {self.sidecar_path}: {e}")
+
+    def record_range(
+        self, layer_name: str, record_id: str
+    ) -> Optional[Tuple[int, int]]:
+        """(start, end) byte range of a record, None when it is not indexed"""
+        layer = self.layers.get(layer_name)
+        if layer is None:
+            return None
+        records = self._records.get(layer_name)
+        if records is None:
+            records = {}
+            for i, rid in enumerate(layer["record_ids"]):
+                records.setdefault(rid, i)
+            self._records[layer_name] = records
+        i = records.get(record_id)
+        if i is None:
+            return None
+        offsets = layer["offsets"]
+        end = offsets[i + 1] if i + 1 < len(offsets) else layer["end"]
+        return offsets[i], end
+
+    def get_record(self, layer_name: str, record_id: str) -> Optional[Any]:
+        """Read a single record: its geometry (NGI) or properties (NDA)"""
+        record_range = self.record_range(layer_name, record_id)
+        if record_range is None:
+            return None
+        start, end = record_range
+
+        if self.is_nda:
+            with ByteScanner(self.file_path, start, end) as scanner:
+                lines = iter(scanner)
+                next(lines, None)  # $RECORD line
+                data_line = next(lines, b"").decode(self.encoding).strip()
+            return NDAParser(self.encoding).parse_record(
+                layer_name, self.layers[layer_name]["fields"], data_line
+            )
+
+        parser = NGIParser(self.encoding)
+        for _, _, geometry in parser._iter_range(
+            self.file_path, start, end, layer_name
+        ):
+            return geometry
+        return None
+
+
+class SheetIndex:
+    """Random access to the features of an NGI file and its NDA file"""
+
+    def __init__(
+        self,
+        ngi_path: Union[str, Path],
+        nda_path: Optional[Union[str, Path]] = None,
+        encoding: str = "cp949",
+        save: bool = True,
+    ) -> None:
+        self.ngi = FileIndex.load(ngi_path, encoding, save)
+        self.nda = FileIndex.load(nda_path, encoding, save) if nda_path else None
+
+    @property
+    def layer_names(self) -> List[str]:
+        return list(self.ngi.layers)
+
+    def get_record(self, layer_name: str, record_id: str) -> Optional[GeoFeature]:
+        """The feature of a record, as produced by GeoJSONConverter"""
+        geometry = self.ngi.get_record(layer_name, record_id)
+        if geometry is None:
+            return None
+        properties = {}
+        if self.nda is not None:
+            properties = self.nda.get_record(layer_name, record_id) or {}
+        return {
+            "type": "Feature",
+            "geometry": geometry,
+            "properties": {**properties, "record_id": record_id},
+        }
@@ -0,0 +1,188 @@
+import mmap
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+import logging
+
+from .archive import is_streamed, open_binary
+
+logger = logging.getLogger(__name__)
+
+
+class ByteScanner:
+    """Memory-mapped reader yielding the raw byte lines of an NGI/NDA file
+
+    Lines are returned undecoded (including line endings) so callers only
+    pay for decoding the few values that are actually text. start and end
+    restrict the scan to the lines beginning in that byte range.
+
+    Zip members and .gz files (see parsers.archive) cannot be mapped and
+    are decompressed as they are read instead; offsets are offsets into
+    the decompressed data.
+    """
+
+    def __init__(
+        self, file_path: Union[str, Path], start: int = 0, end: Optional[int] = None
+    ) -> None:
+        self.file_path = Path(file_path)
+        self.start = start
+        self.end = end
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._stream: Optional[BinaryIO] = None
+
+    def __enter__(self) -> "ByteScanner":
+        if is_streamed(self.file_path):
+            self._stream = open_binary(self.file_path)
+            return self
+        self._file = open(self.file_path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            self._map = None
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @property
+    def map(self) -> Optional[mmap.mmap]:
+        """The underlying memory map, None for an empty or streamed file"""
+        return self._map
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self.section(self.start, self.end)
+
+    def section(self, start: int, end: Optional[int] = None) -> Iterator[bytes]:
+        """Lines beginning in [start, end) of the open file"""
+        if self._stream is not None:
+            return self._iter_stream(start, end)
+        if self._map is None:
+            return iter(())
+        self._map.seek(start)
+        if end is None:
+            return iter(self._map.readline, b"")
+        return self._iter_until(end)
+
+    def _iter_until(self, end: int) -> Iterator[bytes]:
+        mm = self._map
+        while mm.tell() < end:
+            line = mm.readline()
+            if not line:
+                break
+            yield line
+
+    def _iter_stream(self, start: int, end: Optional[int]) -> Iterator[bytes]:
+        stream = self._stream
+        stream.seek(start)
+        pos = start
+        for line in stream:
+            if end is not None and pos >= end:
+                break
+            yield line
+            pos += len(line)
+
+    def read(self, start: int, end: int) -> bytes:
+        """The bytes in [start, end) of the open file"""
+        if self._stream is not None:
+            self._stream.seek(start)
+            return self._stream.read(end - start)
+        if self._map is None:
+            return b""
+        return self._map[start:end]
+
+    def header(self, start: int, end: int) -> bytes:
+        """The bytes of a layer section up to its <DATA> line"""
+        if self._map is not None:
+            data = self._map.find(b"<DATA>", start, end)
+            return self._map[start:data if data != -1 else end]
+        lines = []
+        for line in self.section(start, end):
+            if line.startswith(b"<DATA>"):
+                break
+            lines.append(line)
+        return b"".join(lines)
+
+    def find_line_starts(
+        self, marker: bytes, start: int = 0, end: Optional[int] = None
+    ) -> List[int]:
+        """Offsets of the lines beginning with marker in [start, end)
+
+        start is taken to be the beginning of a line. Mapped files are
+        searched in place without copying the range or splitting it into
+        lines.
+        """
+        if self._map is None:
+            offsets = []
+            pos = start
+            for line in self.section(start, end):
+                if line.startswith(marker):
+                    offsets.append(pos)
+                pos += len(line)
+            return offsets
+        mm = self._map
+        if end is None:
+            end = len(mm)
+        offsets = [start] if mm[start:start + len(marker)] == marker else []
+        pos = mm.find(b"\n" + marker, start, end)
+        while pos != -1:
+            offsets.append(pos + 1)
+            pos = mm.find(b"\n" + marker, pos + 1, end)
+        return offsets
+
+    def count_lines(self, prefix: bytes, start: int, end: int) -> int:
+        """Number of lines beginning with prefix in [start, end)"""
+        return len(self.find_line_starts(prefix, start, end))
+
+    def layers(self, encoding: str = "cp949") -> List[Tuple[int, int, str]]:
+        """(start, end, name) of every <LAYER_START> section of the open file
+
+        Only the markers and layer names are read, so the data sections of
+        mapped files are skipped without being scanned line by line. end is
+        the start of the next layer or the end of the file.
+        """
+        if self._stream is None:
+            return self._find_layers(encoding)
+        layers = []
+        start = None
+        name = None
+        expect_name = False
+        pos = 0
+        for line in self.section(0):
+            if line.startswith(b"<LAYER_START>"):
+                if name is not None:
+                    layers.append((start, pos, name))
+                start, name = pos, None
+            elif expect_name:
+                name = line.decode(encoding).strip().strip('"')
+            expect_name = (
+                start is not None and name is None and line.strip() == b"$LAYER_NAME"
+            )
+            pos += len(line)
+        if name is not None:
+            layers.append((start, pos, name))
+        return layers
+
+    def _find_layers(self, encoding: str) -> List[Tuple[int, int, str]]:
+        mm = self._map
+        if mm is None:
+            return []
+        starts = self.find_line_starts(b"<LAYER_START>")
+        layers = []
+        for start, end in zip(starts, starts[1:] + [len(mm)]):
+            name_pos = mm.find(b"$LAYER_NAME", start, end)
+            if name_pos == -1:
+                continue
+            mm.seek(name_pos)
+            mm.readline()
+            name = mm.readline().decode(encoding).strip().strip('"')
+            layers.append((start, end, name))
+        return layers
@@ -1,7 +1,16 @@
-from typing import TypedDict, List, Literal
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, TypedDict, List, Literal, Optional, Sequence
 from enum import Enum
 
-__all__ = ["GeometryType", "FieldDefinition", "LayerDefinition", "GeoFeature"]
+__all__ = [
+    "GeometryType",
+    "FieldDefinition",
+    "LayerDefinition",
+    "GeoFeature",
+    "CompactGeometry",
+    "ColumnarLayer",
+]
 
 
 class GeometryType(Enum):
@@ -33,3 +42,230 @@ class LayerDefinition(TypedDict):
 class GeoFeature(TypedDict):
     geometry: dict
     properties: dict
+
+
+class CompactGeometry(Mapping):
+    """Array-backed geometry with a lazy GeoJSON view
+
+    Coordinates are stored as one flat array('d') (x0, y0, x1, y1, ...) and
+    offsets holds the first vertex index of every part (ring for polygons)
+    followed by the total vertex count. Reading it like a dict, or through
+    __geo_interface__, builds the nested GeoJSON coordinates on demand.
+    """
+
+    __slots__ = ("type", "coords", "offsets", "properties")
+
+    def __init__(
+        self,
+        geom_type: str,
+        coords: array,
+        offsets: array,
+        properties: Optional[dict] = None,
+    ) -> None:
+        self.type = geom_type
+        self.coords = coords
+        self.offsets = offsets
+        self.properties = properties
+
+    @classmethod
+    def from_parts(
+        cls,
+        geom_type: str,
+        parts: Sequence[array],
+        properties: Optional[dict] = None,
+    ) -> "CompactGeometry":
+        """Build from one flat coordinate array per part"""
+        coords = array("d")
+        offsets = array("l", [0])
+        for part in parts:
+            coords.extend(part)
+            offsets.append(len(coords) // 2)
+        return cls(geom_type, coords, offsets, properties)
+
+    def _part(self, index: int) -> List[List[float]]:
+        values = iter(
+            self.coords[2 * self.offsets[index]:2 * self.offsets[index + 1]]
+        )
+        return [[x, y] for x, y in zip(values, values)]
+
+    @property
+    def coordinates(self) -> list:
+        parts = [self._part(i) for i in range(len(self.offsets) - 1)]
+        if self.type in ("Polygon", "MultiLineString"):
+            return parts
+        if self.type == "Point":
+            return parts[0][0] if parts and parts[0] else []
+        return parts[0]
+
+    @property
+    def bounds(self) -> Optional[tuple]:
+        """(min_x, min_y, max_x, max_y), None for an empty geometry"""
+        if not self.coords:
+            return None
+        xs, ys = self.coords[0::2], self.coords[1::2]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    @property
+    def __geo_interface__(self) -> dict:
+        geometry = {"type": self.type, "coordinates": self.coordinates}
+        if self.properties is not None:
+            geometry["properties"] = self.properties
+        return geometry
+
+    def __getitem__(self, key: str):
+        if key == "type":
+            return self.type
+        if key == "coordinates":
+            return self.coordinates
+        if key == "properties" and self.properties is not None:
+            return self.properties
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield "type"
+        yield "coordinates"
+        if self.properties is not None:
+            yield "properties"
+
+    def __len__(self) -> int:
+        return 2 if self.properties is None else 3
+
+    def __repr__(self) -> str:
+        return f"CompactGeometry({self.type!r}, {len(self.coords) // 2} points)"
+
+    def __reduce__(self):
+        # raw array bytes and a plain constructor call, much faster to
+        # unpickle than slot state or pickled arrays
+        return (
+            _rebuild_compact,
+            (
+                self.type,
+                self.coords.tobytes(),
+                self.offsets.typecode,
+                self.offsets.tobytes(),
+                self.properties,
+            ),
+        )
+
+
+def _rebuild_compact(
+    geom_type: str,
+    coords: bytes,
+    offsets_typecode: str,
+    offsets: bytes,
+    properties: Optional[dict],
+) -> CompactGeometry:
+    """Unpickle a CompactGeometry (see CompactGeometry.__reduce__)"""
+    coords_array = array("d")
+    coords_array.frombytes(coords)
+    offsets_array = array(offsets_typecode)
+    offsets_array.frombytes(offsets)
+    return CompactGeometry(geom_type, coords_array, offsets_array, properties)
+
+
+class ColumnarLayer(Mapping):
+    """Attribute table of one layer stored column by column
+
+    Field names are kept once per layer. Every field has a typed column
+    (array('q') for integers, array('d') for reals, list otherwise) and a
+    null bitmap, both indexed by row position; record ids map to rows
+    through index. Read as a mapping it returns the same
+    {record_id: {field: value}} view as the row oriented output.
+    """
+
+    __slots__ = (
+        "name",
+        "field_names",
+        "field_types",
+        "columns",
+        "nulls",
+        "record_ids",
+        "index",
+    )
+
+    def __init__(
+        self, name: str, field_names: List[str], field_types: List[str]
+    ) -> None:
+        self.name = name
+        self.field_names = list(field_names)
+        self.field_types = list(field_types)
+        self.columns: List[Any] = [
+            array("q") if field_type.upper() == "NUMERIC" else []
+            for field_type in self.field_types
+        ]
+        self.nulls = [bytearray() for _ in self.field_names]
+        self.record_ids: List[str] = []
+        self.index: Dict[str, int] = {}
+
+    def extend(
+        self, record_ids: Sequence[str], columns: Sequence[Sequence[Any]]
+    ) -> None:
+        """Append rows given as one value list per field, None marking nulls"""
+        start = len(self.record_ids)
+        self.index.update(zip(record_ids, range(start, start + len(record_ids))))
+        self.record_ids.extend(record_ids)
+        size = (len(self.record_ids) + 7) // 8
+        for i, values in enumerate(columns):
+            nulls = self.nulls[i]
+            nulls.extend(bytes(size - len(nulls)))
+            for row in [start + j for j, value in enumerate(values) if value is None]:
+                nulls[row >> 3] |= 1 << (row & 7)
+            self._extend_column(i, values)
+
+    def _extend_column(self, i: int, values: Sequence[Any]) -> None:
+        column = self.columns[i]
+        if isinstance(column, list):
+            column.extend(values)
+            return
+
+        size = len(column)
+        filled = [0 if value is None else value for value in values]
+        try:
+            column.extend(filled)
+            return
+        except (TypeError, OverflowError):
+            del column[size:]
+
+        # promote integers to reals, anything else to a plain list
+        if column.typecode == "q":
+            try:
+                promoted = array("d", column)
+                promoted.extend(filled)
+                self.columns[i] = promoted
+                return
+            except (TypeError, OverflowError):
+                pass
+        self.columns[i] = self.column(i) + list(values)
+
+    def is_null(self, field: int, row: int) -> bool:
+        return bool(self.nulls[field][row >> 3] & (1 << (row & 7)))
+
+    def column(self, field: Any) -> List[Any]:
+        """Values of a field (name or position), None for nulls"""
+        i = field if isinstance(field, int) else self.field_names.index(field)
+        column = self.columns[i]
+        return [
+            None if self.is_null(i, row) else value for row, value in enumerate(column)
+        ]
+
+    def row(self, row: int) -> Dict[str, Any]:
+        return {
+            name: column[row]
+            for i, (name, column) in enumerate(zip(self.field_names, self.columns))
+            if not self.is_null(i, row)
+        }
+
+    def __getitem__(self, record_id: str) -> Dict[str, Any]:
+        return self.row(self.index[record_id])
+
+    def __iter__(self):
+        return iter(self.record_ids)
+
+    def __len__(self) -> int:
+        return len(self.record_ids)
+
+    def __contains__(self, record_id: object) -> bool:
+        return record_id in self.index
+
+    def __repr__(self) -> str:
+        return f"ColumnarLayer({self.name!r}, {len(self.field_names)} fields, {len(self)} rows)"
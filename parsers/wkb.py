@@ -0,0 +1,164 @@
+import struct
+import sys
+from array import array
+from itertools import chain
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+__all__ = ["encode_wkb", "decode_wkb", "geometry_bounds", "WKB_TYPES"]
+
+WKB_TYPES = {
+    "Point": 1,
+    "LineString": 2,
+    "Polygon": 3,
+    "MultiPoint": 4,
+    "MultiLineString": 5,
+    "MultiPolygon": 6,
+}
+_GEOMETRY_TYPES = {code: name for name, code in WKB_TYPES.items()}
+
+_UINT32 = struct.Struct("<I")
+# coordinates of an empty point, which WKB has no count for
+_EMPTY_POINT = struct.pack("<2d", float("nan"), float("nan"))
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def _header(geom_type: str) -> bytes:
+    return b"\x01" + _UINT32.pack(WKB_TYPES[geom_type])
+
+
+def _pack_flat(coords: array) -> bytes:
+    """Pack a flat array('d') of x, y values as little endian doubles"""
+    if _LITTLE_ENDIAN:
+        return coords.tobytes()
+    swapped = array("d", coords)
+    swapped.byteswap()
+    return swapped.tobytes()
+
+
+def _pack_points(points: Any) -> bytes:
+    """Pack a point sequence ([[x, y], ...] or (n, 2) array) with its count"""
+    if hasattr(points, "astype"):  # NumPy array
+        return _UINT32.pack(len(points)) + points.astype("<f8").tobytes()
+    flat = list(chain.from_iterable(points))
+    return _UINT32.pack(len(points)) + struct.pack(f"<{len(flat)}d", *flat)
+
+
+def _encode_compact(geometry: Any) -> bytes:
+    coords, offsets = geometry.coords, geometry.offsets
+    parts = [
+        (
+            offsets[i + 1] - offsets[i],
+            _pack_flat(coords[2 * offsets[i]:2 * offsets[i + 1]]),
+        )
+        for i in range(len(offsets) - 1)
+    ]
+    geom_type = geometry.type
+
+    if geom_type == "Point":
+        if not (parts and parts[0][0]):
+            return _header("Point") + _EMPTY_POINT
+        return _header("Point") + parts[0][1]
+    if geom_type == "LineString":
+        count, data = parts[0]
+        return _header("LineString") + _UINT32.pack(count) + data
+    if geom_type == "Polygon":
+        rings = b"".join(_UINT32.pack(count) + data for count, data in parts)
+        return _header("Polygon") + _UINT32.pack(len(parts)) + rings
+    if geom_type == "MultiPoint":
+        count, data = parts[0]
+        point = _header("Point")
+        points = b"".join(point + data[i:i + 16] for i in range(0, len(data), 16))
+        return _header("MultiPoint") + _UINT32.pack(count) + points
+    if geom_type == "MultiLineString":
+        lines = b"".join(
+            _header("LineString") + _UINT32.pack(count) + data for count, data in parts
+        )
+        return _header("MultiLineString") + _UINT32.pack(len(parts)) + lines
+    raise ValueError(f"Unsupported geometry type: {geom_type}")
+
+
+def _encode(geom_type: str, coordinates: Any) -> bytes:
+    if geom_type == "Point":
+        if not len(coordinates):
+            return _header("Point") + _EMPTY_POINT
+        return _header("Point") + struct.pack("<2d", coordinates[0], coordinates[1])
+    if geom_type == "LineString":
+        return _header("LineString") + _pack_points(coordinates)
+    if geom_type == "Polygon":
+        rings = b"".join(_pack_points(ring) for ring in coordinates)
+        return _header("Polygon") + _UINT32.pack(len(coordinates)) + rings
+    if geom_type in ("MultiPoint", "MultiLineString", "MultiPolygon"):
+        part_type = geom_type[5:]
+        parts = b"".join(_encode(part_type, part) for part in coordinates)
+        return _header(geom_type) + _UINT32.pack(len(coordinates)) + parts
+    raise ValueError(f"Unsupported geometry type: {geom_type}")
+
+
+def encode_wkb(geometry: Any) -> bytes:
+    """Encode a GeoJSON geometry dict or a CompactGeometry as little endian WKB"""
+    if hasattr(geometry, "offsets"):
+        return _encode_compact(geometry)
+    return _encode(geometry["type"], geometry["coordinates"])
+
+
+def geometry_bounds(geometry: Any) -> Optional[Tuple[float, float, float, float]]:
+    """(min_x, min_y, max_x, max_y) of a geometry, None when it has no points"""
+    if hasattr(geometry, "bounds"):
+        return geometry.bounds
+
+    coordinates = geometry["coordinates"]
+    if geometry["type"] == "Point":
+        points: Sequence[Any] = [coordinates] if len(coordinates) else []
+    elif geometry["type"] in ("LineString", "MultiPoint"):
+        points = coordinates
+    elif geometry["type"] == "MultiPolygon":
+        points = [xy for polygon in coordinates for ring in polygon for xy in ring]
+    else:
+        points = [xy for part in coordinates for xy in part]
+    if len(points) == 0:
+        return None
+    xs = [xy[0] for xy in points]
+    ys = [xy[1] for xy in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _decode(data: bytes, offset: int) -> Tuple[Dict[str, Any], int]:
+    order = "<" if data[offset] == 1 else ">"
+    (code,) = struct.unpack_from(order + "I", data, offset + 1)
+    offset += 5
+    geom_type = _GEOMETRY_TYPES.get(code)
+    if geom_type is None:
+        raise ValueError(f"Unsupported WKB geometry type: {code}")
+
+    def read_count() -> int:
+        nonlocal offset
+        (count,) = struct.unpack_from(order + "I", data, offset)
+        offset += 4
+        return count
+
+    def read_points(count: int) -> List[List[float]]:
+        nonlocal offset
+        values = iter(struct.unpack_from(f"{order}{2 * count}d", data, offset))
+        offset += 16 * count
+        return [[x, y] for x, y in zip(values, values)]
+
+    if geom_type == "Point":
+        coordinates: Sequence[Any] = read_points(1)[0]
+        if coordinates[0] != coordinates[0]:  # NaN, an empty point
+            coordinates = []
+    elif geom_type == "LineString":
+        coordinates = read_points(read_count())
+    elif geom_type == "Polygon":
+        coordinates = [read_points(read_count()) for _ in range(read_count())]
+    else:
+        coordinates = []
+        for _ in range(read_count()):
+            part, offset = _decode(data, offset)
+            coordinates.append(part["coordinates"])
+    return {"type": geom_type, "coordinates": coordinates}, offset
+
+
+def decode_wkb(data: bytes) -> Dict[str, Any]:
+    """Decode 2D WKB into a GeoJSON geometry dict"""
+    geometry, _ = _decode(bytes(data), 0)
+    return geometry
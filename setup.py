@@ -5,4 +5,5 @@ setup(
     packages=find_packages(),
     install_requires=["GDAL>=3.0.0", "qgis>=3.0"],
     python_requires=">=3.7",
+    entry_points={"console_scripts": ["ngi-convert=parsers.cli:main"]},
 )
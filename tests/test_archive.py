@@ -0,0 +1,137 @@
+import gzip
+import shutil
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from parsers import cli
+from parsers.archive import find_companion, path_exists, sheet_stem
+from parsers.catalog import inspect
+from parsers.nda_parser import NDAParser
+from parsers.ngi_parser import NGIParser
+from parsers.parse_cache import ParseCache
+from parsers.pipeline import convert_sheet, find_nda
+from parsers.scanner import ByteScanner
+
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = Path(self.temp_dir.name)
+        sample_dir = Path(__file__).parent / "test_data"
+        self.ngi_path = sample_dir / "sample.ngi"
+        self.nda_path = sample_dir / "sample.nda"
+
+        self.zip_path = self.root / "sheets.zip"
+        with zipfile.ZipFile(self.zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.write(self.ngi_path, "maps/37612058.ngi")
+            zf.write(self.nda_path, "maps/37612058.NDA")
+            zf.write(self.ngi_path, "37612059.ngi")
+        self.ngi_member = f"{self.zip_path}!/maps/37612058.ngi"
+
+        self.gz_dir = self.root / "gz"
+        self.gz_dir.mkdir()
+        for path in (self.ngi_path, self.nda_path):
+            with open(path, "rb") as src, gzip.open(
+                self.gz_dir / f"37612060{path.suffix}.gz", "wb"
+            ) as dst:
+                shutil.copyfileobj(src, dst)
+        self.ngi_gz = self.gz_dir / "37612060.ngi.gz"
+
+    def test_pairing(self):
+        self.assertTrue(path_exists(self.ngi_member))
+        self.assertFalse(path_exists(f"{self.zip_path}!/missing.ngi"))
+        self.assertEqual(
+            find_companion(self.ngi_member, ".nda"),
+            f"{self.zip_path}!/maps/37612058.NDA",
+        )
+        self.assertIsNone(find_companion(f"{self.zip_path}!/37612059.ngi", ".nda"))
+        self.assertEqual(find_nda(self.ngi_gz), self.gz_dir / "37612060.nda.gz")
+        self.assertEqual(sheet_stem(self.ngi_member), "37612058")
+        self.assertEqual(sheet_stem(self.ngi_gz), "37612060")
+
+    def test_parse_matches_plain_file(self):
+        expected_ngi = NGIParser().parse_file(str(self.ngi_path))
+        expected_nda = NDAParser().parse_file(str(self.nda_path))
+        for ngi_path in (self.ngi_member, str(self.ngi_gz)):
+            with self.subTest(ngi_path=ngi_path):
+                nda_path = str(find_nda(Path(ngi_path)))
+                self.assertEqual(NGIParser().parse_file(ngi_path), expected_ngi)
+                self.assertEqual(
+                    NGIParser().parse_file(ngi_path, workers=2), expected_ngi
+                )
+                self.assertEqual(NDAParser().parse_file(nda_path), expected_nda)
+                self.assertEqual(
+                    list(NDAParser().iter_records(nda_path)),
+                    list(NDAParser().iter_records(str(self.nda_path))),
+                )
+
+    def test_line_starts_match_plain_file(self):
+        with ByteScanner(self.ngi_path) as scanner:
+            expected = scanner.find_line_starts(b"$RECORD")
+            self.assertEqual(scanner.count_lines(b"$RECORD", 0, expected[2]), 2)
+        for ngi_path in (self.ngi_member, self.ngi_gz):
+            with self.subTest(ngi_path=ngi_path):
+                with ByteScanner(ngi_path) as scanner:
+                    self.assertEqual(scanner.find_line_starts(b"$RECORD"), expected)
+
+    def test_selected_layers_and_area_of_interest(self):
+        parser = NGIParser()
+        aoi = (151005.0, 204005.0, 152100.0, 205100.0)
+        for layers, area in ((["B0014110"], None), (None, aoi), (["C0423365"], aoi)):
+            with self.subTest(layers=layers, aoi=area):
+                self.assertEqual(
+                    parser.parse_file(self.ngi_member, layers=layers, aoi=area),
+                    parser.parse_file(str(self.ngi_path), layers=layers, aoi=area),
+                )
+                self.assertEqual(
+                    parser.select_layers(self.ngi_member, layers, area),
+                    parser.select_layers(str(self.ngi_path), layers, area),
+                )
+        nda_member = f"{self.zip_path}!/maps/37612058.NDA"
+        self.assertEqual(
+            NDAParser().parse_file(nda_member, layers=["B0014110"]),
+            NDAParser().parse_file(str(self.nda_path), layers=["B0014110"]),
+        )
+
+    def test_parse_cache_keys_members(self):
+        cache = ParseCache(self.root / "cache")
+        parser = NGIParser(cache=cache)
+        parsed = parser.parse_file(self.ngi_member)
+        self.assertGreater(cache.size, 0)
+        self.assertEqual(parser.parse_file(self.ngi_member), parsed)
+        # same content, same key
+        self.assertEqual(
+            cache.key(self.ngi_member, "options"), cache.key(self.ngi_path, "options")
+        )
+
+    def test_convert_and_inspect(self):
+        output_path = self.root / "sheet.gpkg"
+        result = convert_sheet(self.ngi_member, str(output_path), incremental=True)
+        self.assertEqual(
+            result["layers"], {"A0010000": 2, "B0014110": 2, "C0423365": 2}
+        )
+        self.assertEqual(result["nda_path"], f"{self.zip_path}!/maps/37612058.NDA")
+        result = convert_sheet(self.ngi_member, str(output_path), incremental=True)
+        self.assertEqual(result["layers"], {})
+        self.assertEqual(len(result["unchanged"]), 3)
+
+        sheet = inspect(self.ngi_gz)
+        self.assertEqual(
+            [layer["record_count"] for layer in sheet["layers"]], [2, 3, 2]
+        )
+        self.assertEqual(len(sheet["layers"][0]["fields"]), 4)
+
+    def test_collect_ngi_files(self):
+        files = cli.collect_ngi_files([str(self.root)])
+        self.assertEqual([sheet_stem(path) for path in files], ["37612059", "37612058"])
+        files = cli.collect_ngi_files([str(self.gz_dir), self.ngi_member])
+        self.assertEqual(
+            sorted(sheet_stem(path) for path in files), ["37612058", "37612060"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from parsers import cli
+from parsers.catalog import inspect, inspect_file
+from parsers.nda_parser import NDAParser
+
+
+class TestCatalog(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = Path(self.temp_dir.name)
+        sample_dir = Path(__file__).parent / "test_data"
+        self.ngi_path = self.root / "sample.ngi"
+        self.nda_path = self.root / "sample.nda"
+        shutil.copy(sample_dir / "sample.ngi", self.ngi_path)
+        shutil.copy(sample_dir / "sample.nda", self.nda_path)
+
+    def test_inspect_matches_full_parse(self):
+        sheet = inspect(self.ngi_path)
+        self.assertEqual(sheet["nda_path"], str(self.nda_path))
+        layers = {layer["name"]: layer for layer in sheet["layers"]}
+        self.assertEqual(list(layers), ["A0010000", "B0014110", "C0423365"])
+
+        self.assertEqual(layers["A0010000"]["geometry_type"], "LineString")
+        self.assertEqual(layers["B0014110"]["geometry_type"], "Polygon")
+        self.assertEqual(layers["C0423365"]["geometry_type"], "Point")
+        self.assertEqual(
+            layers["A0010000"]["bounds"], [150609.21, 203279.01, 150700.0, 203400.0]
+        )
+        # counts are of $RECORD entries, including the invalid polygon
+        self.assertEqual(
+            [layer["record_count"] for layer in sheet["layers"]], [2, 3, 2]
+        )
+
+        definitions = NDAParser().read_layer_definitions(str(self.nda_path))
+        for name, definition in definitions.items():
+            self.assertEqual(layers[name]["fields"], definition["fields"])
+
+    def test_inspect_nda_file(self):
+        layers = inspect_file(self.nda_path)
+        self.assertEqual([layer["record_count"] for layer in layers], [2, 3, 2])
+        self.assertIsNone(layers[0]["geometry_type"])
+        self.assertEqual(
+            [field["name"] for field in layers[0]["fields"]],
+            ["UFID", "NAME", "WIDTH", "LANES"],
+        )
+
+    def test_inspect_without_nda(self):
+        self.nda_path.unlink()
+        sheet = inspect(self.ngi_path)
+        self.assertIsNone(sheet["nda_path"])
+        self.assertEqual(sheet["layers"][0]["fields"], [])
+
+    def test_cli_writes_catalog(self):
+        catalog_path = self.root / "catalog.json"
+        self.assertEqual(
+            cli.main(["inspect", str(self.root), "--json", str(catalog_path)]), 0
+        )
+        sheets = json.loads(catalog_path.read_text(encoding="utf-8"))
+        self.assertEqual(len(sheets), 1)
+        self.assertEqual(len(sheets[0]["layers"]), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,265 @@
+import multiprocessing
+import unittest
+import json
+import shutil
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from parsers import cli
+from parsers.nda_parser import NDAParser
+from parsers.ngi_parser import NGIParser
+from parsers.pipeline import convert_sheet, find_nda
+
+
+def slow_convert(**kwargs):
+    Path(kwargs["output_path"]).write_bytes(b"partial")
+    time.sleep(5)
+
+
+class TestCLI(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = Path(self.temp_dir.name)
+        self.input_dir = self.root / "sheets"
+        self.input_dir.mkdir()
+        sample_dir = Path(__file__).parent / "test_data"
+        for stem in ("37612058", "37612059"):
+            shutil.copy(sample_dir / "sample.ngi", self.input_dir / f"{stem}.ngi")
+            shutil.copy(sample_dir / "sample.nda", self.input_dir / f"{stem}.NDA")
+        self.output_dir = self.root / "out"
+
+    def test_collect_ngi_files(self):
+        (self.input_dir / "readme.txt").write_text("not a sheet")
+        expected = sorted((self.input_dir).glob("*.ngi"))
+        self.assertEqual(
+            cli.collect_ngi_files([str(self.input_dir)]),
+            [path.resolve() for path in expected],
+        )
+        self.assertEqual(
+            cli.collect_ngi_files([str(self.input_dir / "*.ngi"), str(expected[0])]),
+            [path.resolve() for path in expected],
+        )
+        self.assertEqual(find_nda(expected[0]), self.input_dir / "37612058.NDA")
+
+    def test_convert_sheet(self):
+        result = convert_sheet(
+            str(self.input_dir / "37612058.ngi"), str(self.root / "sheet.gpkg")
+        )
+        self.assertEqual(result["nda_path"], str(self.input_dir / "37612058.NDA"))
+        self.assertEqual(
+            result["layers"], {"A0010000": 2, "B0014110": 2, "C0423365": 2}
+        )
+
+        conn = sqlite3.connect(self.root / "sheet.gpkg")
+        try:
+            name = conn.execute(
+                'SELECT NAME FROM "A0010000" WHERE record_id = ?', ("1",)
+            ).fetchone()[0]
+        finally:
+            conn.close()
+        self.assertEqual(name, "세종대로")
+
+    def test_convert_command_with_pool(self):
+        report_path = self.root / "report.json"
+        exit_code = cli.main(
+            [
+                "convert",
+                str(self.input_dir),
+                "-o",
+                str(self.output_dir),
+                "--jobs",
+                "2",
+                "--report",
+                str(report_path),
+            ]
+        )
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(
+            sorted(path.name for path in self.output_dir.iterdir()),
+            ["37612058.gpkg", "37612059.gpkg"],
+        )
+        report = json.loads(report_path.read_text(encoding="utf-8"))
+        self.assertEqual((report["converted"], report["failed"]), (2, 0))
+
+    def test_geojson_seq_output(self):
+        exit_code = cli.main(
+            [
+                "convert",
+                str(self.input_dir / "37612058.ngi"),
+                "-o",
+                str(self.output_dir),
+                "-j",
+                "1",
+                "-f",
+                "geojsons",
+            ]
+        )
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(
+            sorted(path.name for path in self.output_dir.iterdir()),
+            [
+                "37612058_A0010000.geojsons",
+                "37612058_B0014110.geojsons",
+                "37612058_C0423365.geojsons",
+            ],
+        )
+
+    def test_selected_layers(self):
+        exit_code = cli.main(
+            [
+                "convert",
+                str(self.input_dir / "37612058.ngi"),
+                "-o",
+                str(self.output_dir),
+                "-j",
+                "1",
+                "-f",
+                "geojson",
+                "--layers",
+                "C0423365, A0010000",
+            ]
+        )
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(
+            sorted(path.name for path in self.output_dir.iterdir()),
+            ["37612058_A0010000.geojson", "37612058_C0423365.geojson"],
+        )
+
+    def test_cache_dir(self):
+        args = [
+            "convert",
+            str(self.input_dir / "37612058.ngi"),
+            "-o",
+            str(self.output_dir),
+            "-j",
+            "1",
+            "--cache-dir",
+            str(self.root / "cache"),
+        ]
+        self.assertEqual(cli.main(args), 0)
+        self.assertTrue(any((self.root / "cache").iterdir()))
+
+        # the second run reads every layer from the cache
+        with patch.object(
+            NGIParser, "_iter_range", side_effect=AssertionError
+        ), patch.object(NDAParser, "_iter_record_batches", side_effect=AssertionError):
+            self.assertEqual(cli.main(args + ["--report", str(self.root / "r.json")]), 0)
+        report = json.loads((self.root / "r.json").read_text(encoding="utf-8"))
+        self.assertEqual(report["failed"], 0)
+
+    def test_area_of_interest(self):
+        result = convert_sheet(
+            str(self.input_dir / "37612058.ngi"),
+            str(self.root / "aoi.gpkg"),
+            aoi=(151010, 204010, 151500, 204500),
+        )
+        self.assertEqual(result["layers"], {"B0014110": 2})
+
+        # no layer bounds intersect: the sheet is skipped without output
+        exit_code = cli.main(
+            [
+                "convert",
+                str(self.input_dir / "37612058.ngi"),
+                "-o",
+                str(self.output_dir),
+                "-j",
+                "1",
+                "--aoi",
+                "0,0,10,10",
+            ]
+        )
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(list(self.output_dir.iterdir()), [])
+
+        with self.assertRaises(SystemExit):
+            cli.build_parser().parse_args(["convert", "x", "-o", "y", "--aoi", "1,2"])
+
+    @unittest.skipUnless(hasattr(cli.signal, "SIGALRM"), "needs SIGALRM")
+    def test_timeout_leaves_no_output(self):
+        with patch("parsers.cli.convert_sheet", slow_convert):
+            exit_code = cli.main(
+                [
+                    "convert",
+                    str(self.input_dir / "37612058.ngi"),
+                    "-o",
+                    str(self.output_dir),
+                    "-j",
+                    "1",
+                    "--timeout",
+                    "0.2",
+                ]
+            )
+
+        self.assertEqual(exit_code, 1)
+        self.assertEqual(list(self.output_dir.iterdir()), [])
+
+    def test_timeout_without_alarm_converts(self):
+        with patch("parsers.cli._HAS_ALARM", False):
+            exit_code = cli.main(
+                ["convert", str(self.input_dir), "-o", str(self.output_dir), "--timeout", "60"]
+            )
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(
+            sorted(path.name for path in self.output_dir.iterdir()),
+            ["37612058.gpkg", "37612059.gpkg"],
+        )
+
+    @unittest.skipUnless(
+        multiprocessing.get_start_method() == "fork", "patches the forked worker"
+    )
+    def test_timeout_without_alarm(self):
+        # the parent process kills the worker of a sheet over its time limit
+        report_path = self.root / "report.json"
+        with patch("parsers.cli._HAS_ALARM", False), patch(
+            "parsers.cli.convert_sheet", slow_convert
+        ):
+            start = time.perf_counter()
+            exit_code = cli.main(
+                [
+                    "convert",
+                    str(self.input_dir),
+                    "-o",
+                    str(self.output_dir),
+                    "-j",
+                    "2",
+                    "--timeout",
+                    "0.5",
+                    "--report",
+                    str(report_path),
+                ]
+            )
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual(exit_code, 1)
+        self.assertLess(elapsed, 4)
+        self.assertEqual(list(self.output_dir.iterdir()), [])
+        report = json.loads(report_path.read_text(encoding="utf-8"))
+        self.assertEqual(
+            [sheet["error"] for sheet in report["sheets"]],
+            ["timed out after 0.5 s"] * 2,
+        )
+
+    def test_no_input_files(self):
+        exit_code = cli.main(["convert", str(self.root / "missing"), "-o", "out"])
+        self.assertEqual(exit_code, 2)
+
+    def test_duplicate_sheet_names(self):
+        other_dir = self.input_dir / "other"
+        other_dir.mkdir()
+        shutil.copy(self.input_dir / "37612058.ngi", other_dir / "37612058.ngi")
+
+        args = ["convert", str(self.input_dir), "-o", str(self.output_dir), "-r"]
+        self.assertEqual(cli.main(args), 2)
+        self.assertEqual(list(self.output_dir.iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 import os
 import sys
+from unittest.mock import patch
 from parsers.field_parser import FieldParser
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -44,3 +45,53 @@ class TestFieldParser(unittest.TestCase):
 
         # whitespace test
         self.assertEqual(FieldParser.parse_value("  test  ", "STRING"), "test")
+
+    def test_parse_column(self):
+        # string columns match parse_value cell by cell
+        strings = ["test", '"테스트"', "  padded  ", "", '""', "123"]
+        self.assertEqual(
+            FieldParser.parse_column(strings, "STRING"),
+            [FieldParser.parse_value(value, "STRING") for value in strings],
+        )
+        self.assertEqual(
+            FieldParser.parse_column(["a", "", "b"], "STRING"), ["a", None, "b"]
+        )
+
+        # int/float is decided once for the whole column
+        self.assertEqual(
+            FieldParser.parse_column(["1", "", "-3"], "NUMERIC"), [1, None, -3]
+        )
+        self.assertEqual(
+            FieldParser.parse_column(["1", "2.5", '""'], "NUMERIC"), [1.0, 2.5, None]
+        )
+        self.assertEqual(
+            FieldParser.parse_column(["9999999999999999999999"], "NUMERIC"),
+            [9999999999999999999999],
+        )
+        self.assertEqual(FieldParser.parse_column([], "NUMERIC"), [])
+
+        # a declared type overrides the values
+        self.assertEqual(
+            FieldParser.parse_column(["1", "", "3"], "NUMERIC", is_float=True),
+            [1.0, None, 3.0],
+        )
+        self.assertEqual(
+            FieldParser.parse_column(["1", "3"], "NUMERIC", is_float=False), [1, 3]
+        )
+
+    def test_parse_column_without_numpy(self):
+        with patch("parsers.field_parser.np", None):
+            self.assertEqual(
+                FieldParser.parse_column(["1", "", "2"], "NUMERIC"), [1, None, 2]
+            )
+            self.assertEqual(
+                FieldParser.parse_column(["1", "0.5"], "NUMERIC"), [1.0, 0.5]
+            )
+
+    def test_parse_column_invalid(self):
+        with self.assertRaises(ValueError):
+            FieldParser.parse_column(["1", "abc"], "NUMERIC")
+        with self.assertRaises(ValueError):
+            FieldParser.parse_column(["1.5", "123.45.67"], "NUMERIC")
+        with self.assertRaises(ValueError):
+            FieldParser.parse_column(["1"], "DATE")
@@ -0,0 +1,180 @@
+import unittest
+import json
+import tempfile
+from array import array
+from pathlib import Path
+
+from parsers.converters import geojson_writer
+from parsers.converters.geojson_converter import GeoJSONConverter, LayerWriteError
+from parsers.converters.geojson_writer import GeoJSONWriter
+from parsers.nda_parser import NDAParser
+from parsers.ngi_parser import NGIParser
+from parsers.types import CompactGeometry
+
+
+def make_feature(x, y, **properties):
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [x, y]},
+        "properties": properties,
+    }
+
+
+class TestGeoJSONWriter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.output_dir = Path(self.temp_dir.name)
+
+    def test_feature_collection(self):
+        output_path = self.output_dir / "out.geojson"
+        with GeoJSONWriter(output_path, backend="json") as writer:
+            writer.write(make_feature(1.0, 2.0, name="세종대로"))
+            writer.write(make_feature(3.0, 4.0))
+
+        text = output_path.read_text(encoding="utf-8")
+        self.assertNotIn(" ", text)
+        data = json.loads(text)
+        self.assertEqual(data["type"], "FeatureCollection")
+        self.assertEqual(len(data["features"]), 2)
+        self.assertEqual(data["features"][0]["properties"]["name"], "세종대로")
+
+    def test_empty_feature_collection(self):
+        output_path = self.output_dir / "out.geojson"
+        GeoJSONWriter(output_path).close()
+        self.assertEqual(
+            json.loads(output_path.read_text(encoding="utf-8")),
+            {"type": "FeatureCollection", "features": []},
+        )
+
+    def test_geojson_seq(self):
+        output_path = self.output_dir / "out.geojsons"
+        with GeoJSONWriter(output_path, seq=True, backend="json") as writer:
+            writer.write(make_feature(1.0, 2.0))
+            writer.write(make_feature(3.0, 4.0))
+
+        records = output_path.read_bytes().split(b"\n")
+        self.assertEqual(records[-1], b"")
+        self.assertTrue(all(record.startswith(b"\x1e") for record in records[:-1]))
+        features = [json.loads(record[1:]) for record in records[:-1]]
+        self.assertEqual(
+            [feature["geometry"]["coordinates"] for feature in features],
+            [[1.0, 2.0], [3.0, 4.0]],
+        )
+
+    def test_precision(self):
+        output_path = self.output_dir / "out.geojsons"
+        polygon = {
+            "type": "Polygon",
+            "coordinates": [
+                [[0.123456, 1.987654], [2.5, 3.55555], [0.123456, 1.987654]]
+            ],
+        }
+        compact = CompactGeometry.from_parts(
+            "LineString", [array("d", [10.00049, 20.00051, 30.0, 40.0])]
+        )
+        with GeoJSONWriter(output_path, seq=True, precision=3) as writer:
+            writer.write({"type": "Feature", "geometry": polygon, "properties": {}})
+            writer.write({"type": "Feature", "geometry": compact, "properties": {}})
+
+        records = output_path.read_bytes().split(b"\n")[:-1]
+        geometries = [json.loads(record[1:])["geometry"] for record in records]
+        self.assertEqual(
+            geometries[0]["coordinates"],
+            [[[0.123, 1.988], [2.5, 3.556], [0.123, 1.988]]],
+        )
+        self.assertEqual(geometries[1]["coordinates"], [[10.0, 20.001], [30.0, 40.0]])
+        # the input geometry is left untouched
+        self.assertEqual(polygon["coordinates"][0][0], [0.123456, 1.987654])
+
+    def test_invalid_backend(self):
+        with self.assertRaises(ValueError):
+            GeoJSONWriter(self.output_dir / "out.geojson", backend="ujson")
+
+    @unittest.skipIf(geojson_writer.orjson is None, "orjson is not installed")
+    def test_orjson_matches_json(self):
+        outputs = []
+        for backend in ("json", "orjson"):
+            output_path = self.output_dir / f"{backend}.geojson"
+            with GeoJSONWriter(output_path, backend=backend) as writer:
+                writer.write(make_feature(1.5, 2.0, name="세종대로", lanes=4))
+            outputs.append(json.loads(output_path.read_text(encoding="utf-8")))
+        self.assertEqual(outputs[0], outputs[1])
+
+
+class TestGeoJSONConverter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.output_dir = Path(self.temp_dir.name)
+        self.test_data_dir = Path(__file__).parent / "test_data"
+
+    def test_write_features_by_layer(self):
+        converter = GeoJSONConverter()
+        features = converter.iter_features(
+            NGIParser(compact=True).iter_records(self.test_data_dir / "sample.ngi"),
+            NDAParser().iter_records(self.test_data_dir / "sample.nda"),
+        )
+        converter.write_features(features, str(self.output_dir / "sheet.geojson"))
+
+        output_path = self.output_dir / "sheet_A0010000.geojson"
+        data = json.loads(output_path.read_text(encoding="utf-8"))
+        self.assertEqual(data["features"][0]["properties"]["NAME"], "세종대로")
+        self.assertEqual(data["features"][0]["properties"]["record_id"], "1")
+
+    def test_save_geojson_seq_skips_empty_layers(self):
+        layers = {
+            "A": {"type": "FeatureCollection", "features": [make_feature(1.0, 2.0)]},
+            "B": {"type": "FeatureCollection", "features": []},
+        }
+        output_base = self.output_dir / "nested" / "sheet.geojson"
+        GeoJSONConverter().save_geojson(layers, str(output_base), seq=True)
+
+        self.assertEqual(
+            sorted(path.name for path in output_base.parent.iterdir()),
+            ["sheet_A.geojsons"],
+        )
+
+    def test_parallel_sheet_matches_sequential(self):
+        sample_dir = Path(__file__).parent / "test_data"
+        ngi_path = str(sample_dir / "sample.ngi")
+        nda_path = str(sample_dir / "sample.nda")
+        converter = GeoJSONConverter()
+        features = converter.iter_features(
+            NGIParser(compact=True).iter_records(ngi_path),
+            NDAParser().iter_records(nda_path),
+        )
+        converter.write_features(features, str(self.output_dir / "seq" / "sheet.geojson"))
+        converter.write_sheet(
+            ngi_path, nda_path, str(self.output_dir / "par" / "sheet.geojson")
+        )
+
+        names = sorted(path.name for path in (self.output_dir / "seq").iterdir())
+        self.assertEqual(len(names), 3)
+        self.assertEqual(
+            sorted(path.name for path in (self.output_dir / "par").iterdir()), names
+        )
+        for name in names:
+            self.assertEqual(
+                (self.output_dir / "par" / name).read_bytes(),
+                (self.output_dir / "seq" / name).read_bytes(),
+            )
+
+    def test_parallel_sheet_aggregates_errors(self):
+        sample_dir = Path(__file__).parent / "test_data"
+        # a directory in the way of two layer files
+        (self.output_dir / "sheet_A0010000.geojson").mkdir()
+        (self.output_dir / "sheet_C0423365.geojson").mkdir()
+        with self.assertRaises(LayerWriteError) as context:
+            GeoJSONConverter().write_sheet(
+                str(sample_dir / "sample.ngi"),
+                str(sample_dir / "sample.nda"),
+                str(self.output_dir / "sheet.geojson"),
+            )
+
+        self.assertEqual(sorted(context.exception.errors), ["A0010000", "C0423365"])
+        self.assertTrue((self.output_dir / "sheet_B0014110.geojson").is_file())
+
+
+if __name__ == "__main__":
+    unittest.main()
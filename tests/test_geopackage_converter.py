@@ -0,0 +1,204 @@
+import unittest
+import os
+import sys
+from unittest.mock import MagicMock, patch
+from parsers.converters.geopackage_converter import GeoPackageConverter
+from parsers.types import FieldDefinition, GeometryType, LayerDefinition
+from parsers.wkb import decode_wkb
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def make_features(layer_name, count):
+    return [
+        (
+            layer_name,
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [float(i), 0.0]},
+                "properties": {"record_id": str(i)},
+            },
+        )
+        for i in range(count)
+    ]
+
+
+def contents_result(rows):
+    """Mock result set of SELECT identifier, table_name FROM gpkg_contents"""
+    features = []
+    for row in rows:
+        feature = MagicMock()
+        feature.GetField.side_effect = row.__getitem__
+        features.append(feature)
+    result = MagicMock()
+    result.__iter__.return_value = iter(features)
+    return result
+
+
+class TestGeoPackageConverter(unittest.TestCase):
+    def setUp(self):
+        patcher = patch("parsers.converters.geopackage_converter.ogr")
+        self.ogr = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.layer = MagicMock()
+        self.layer.CreateFeature.return_value = 0
+        feature_def = self.layer.GetLayerDefn.return_value
+        feature_def.GetFieldCount.return_value = 1
+        feature_def.GetFieldDefn.return_value.GetName.return_value = "record_id"
+
+        self.ds = MagicMock()
+        self.ds.CreateLayer.return_value = self.layer
+        self.ogr.GetDriverByName.return_value.CreateDataSource.return_value = self.ds
+
+    def test_write_features_in_batches(self):
+        converter = GeoPackageConverter(batch_size=4)
+        converter.write_features(make_features("L1", 10), "/nonexistent/out.gpkg")
+
+        self.assertEqual(self.layer.CreateFeature.call_count, 10)
+        self.assertEqual(self.layer.StartTransaction.call_count, 3)
+        self.assertEqual(self.layer.CommitTransaction.call_count, 3)
+        # schema lookups and the feature object are set up once per layer
+        self.assertEqual(
+            self.layer.GetLayerDefn.return_value.GetFieldDefn.call_count, 1
+        )
+        self.assertEqual(self.ogr.Feature.call_count, 1)
+
+    def test_write_features_commits_on_layer_switch(self):
+        converter = GeoPackageConverter(batch_size=100)
+        features = make_features("L1", 3) + make_features("L2", 2)
+        converter.write_features(features, "/nonexistent/out.gpkg")
+
+        self.assertEqual(self.ds.CreateLayer.call_count, 2)
+        self.assertEqual(self.layer.StartTransaction.call_count, 2)
+        self.assertEqual(self.layer.CommitTransaction.call_count, 2)
+
+    def test_write_features_encodes_wkb(self):
+        converter = GeoPackageConverter()
+        converter.write_features(make_features("L1", 1), "/nonexistent/out.gpkg")
+
+        wkb = self.ogr.CreateGeometryFromWkb.call_args[0][0]
+        self.assertEqual(decode_wkb(wkb), {"type": "Point", "coordinates": [0.0, 0.0]})
+        self.ogr.CreateGeometryFromJson.assert_not_called()
+
+    def test_create_layer_uses_layer_definition(self):
+        definition = LayerDefinition(
+            name="L1",
+            fields=[
+                FieldDefinition(
+                    name="LANES", type="INTEGER", width=2, precision=0, nullable=True
+                ),
+                FieldDefinition(
+                    name="WIDTH", type="DOUBLE", width=6, precision=2, nullable=True
+                ),
+            ],
+            geometry_type=GeometryType.UNKNOWN,
+        )
+        converter = GeoPackageConverter()
+        converter.write_features(
+            make_features("L1", 1), "/nonexistent/out.gpkg", {"L1": definition}
+        )
+
+        self.assertEqual(
+            [call.args for call in self.ogr.FieldDefn.call_args_list],
+            [
+                ("LANES", self.ogr.OFTInteger),
+                ("WIDTH", self.ogr.OFTReal),
+                ("record_id", self.ogr.OFTString),
+            ],
+        )
+        self.assertEqual(self.layer.CreateField.call_count, 3)
+
+    def test_deferred_spatial_index(self):
+        self.layer.GetName.return_value = "L1"
+        self.layer.GetGeometryColumn.return_value = "geom"
+        converter = GeoPackageConverter()
+        converter.write_features(make_features("L1", 3), "/nonexistent/out.gpkg")
+
+        self.assertEqual(
+            self.ds.CreateLayer.call_args.kwargs["options"],
+            ["SPATIAL_INDEX=NO", "IDENTIFIER=L1"],
+        )
+        self.ds.ExecuteSQL.assert_called_once_with(
+            "SELECT CreateSpatialIndex('L1', 'geom')"
+        )
+
+    def test_immediate_and_no_spatial_index(self):
+        for mode, options in (
+            ("immediate", ["IDENTIFIER=L1"]),
+            ("none", ["SPATIAL_INDEX=NO", "IDENTIFIER=L1"]),
+        ):
+            with self.subTest(mode=mode):
+                self.ds.reset_mock()
+                converter = GeoPackageConverter(spatial_index=mode)
+                converter.write_features(
+                    make_features("L1", 3), "/nonexistent/out.gpkg"
+                )
+
+                self.assertEqual(
+                    self.ds.CreateLayer.call_args.kwargs["options"], options
+                )
+                self.ds.ExecuteSQL.assert_not_called()
+
+    def test_update_replaces_written_and_dropped_layers(self):
+        old_layers = [MagicMock(), MagicMock()]
+        old_layers[0].GetName.return_value = "L1"
+        old_layers[1].GetName.return_value = "L2"
+        ds = self.ogr.Open.return_value
+        ds.GetLayerCount.return_value = 2
+        ds.GetLayerByIndex.side_effect = lambda index: old_layers[index]
+        ds.ExecuteSQL.return_value = contents_result([("L1", "L1"), ("L2", "L2")])
+        ds.CreateLayer.return_value = self.layer
+
+        converter = GeoPackageConverter()
+        with patch("parsers.converters.geopackage_converter.os.path.exists") as exists:
+            exists.return_value = True
+            converter.write_features(
+                make_features("L1", 2), "out.gpkg", update=True, drop_layers=["L2"]
+            )
+
+        self.ogr.Open.assert_called_once_with("out.gpkg", 1)
+        self.assertEqual(
+            [call.args for call in ds.DeleteLayer.call_args_list], [(1,), (0,)]
+        )
+        self.ogr.GetDriverByName.return_value.CreateDataSource.assert_not_called()
+
+    def test_colliding_table_names(self):
+        features = (
+            make_features("L-1", 1)
+            + make_features("L 1", 2)
+            + make_features("l1", 1)
+        )
+        GeoPackageConverter().write_features(features, "/nonexistent/out.gpkg")
+
+        self.assertEqual(
+            [
+                (call.args[0], call.kwargs["options"][-1])
+                for call in self.ds.CreateLayer.call_args_list
+            ],
+            [("L1", "IDENTIFIER=L-1"), ("L1_2", "IDENTIFIER=L 1"), ("l1_3", "IDENTIFIER=l1")],
+        )
+
+    def test_update_finds_tables_by_identifier(self):
+        old_layers = [MagicMock(), MagicMock()]
+        old_layers[0].GetName.return_value = "L1"
+        old_layers[1].GetName.return_value = "L1_2"
+        ds = self.ogr.Open.return_value
+        ds.GetLayerCount.return_value = 2
+        ds.GetLayerByIndex.side_effect = lambda index: old_layers[index]
+        ds.ExecuteSQL.return_value = contents_result([("L-1", "L1"), ("L 1", "L1_2")])
+        ds.CreateLayer.return_value = self.layer
+
+        with patch("parsers.converters.geopackage_converter.os.path.exists") as exists:
+            exists.return_value = True
+            GeoPackageConverter(spatial_index="none").write_features(
+                make_features("L 1", 1) + make_features("l1", 1),
+                "out.gpkg",
+                update=True,
+            )
+
+        # only the table of "L 1" is replaced, "l1" does not take L1 over
+        self.assertEqual([call.args for call in ds.DeleteLayer.call_args_list], [(1,)])
+        self.assertEqual(
+            [call.args[0] for call in ds.CreateLayer.call_args_list], ["L1_2", "l1_3"]
+        )
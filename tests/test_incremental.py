@@ -0,0 +1,143 @@
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from parsers import cli
+from parsers.fingerprint import layer_fingerprints, read_fingerprints
+from parsers.pipeline import convert_sheet
+
+
+def replace_bytes(path, old, new):
+    data = path.read_bytes()
+    assert old in data
+    path.write_bytes(data.replace(old, new))
+
+
+class TestIncrementalConversion(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = Path(self.temp_dir.name)
+        sample_dir = Path(__file__).parent / "test_data"
+        self.ngi_path = self.root / "sheet.ngi"
+        self.nda_path = self.root / "sheet.nda"
+        shutil.copy(sample_dir / "sample.ngi", self.ngi_path)
+        shutil.copy(sample_dir / "sample.nda", self.nda_path)
+        self.output_path = self.root / "sheet.gpkg"
+
+    def query(self, sql):
+        conn = sqlite3.connect(self.output_path)
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+
+    def test_fingerprints_follow_layer_bytes(self):
+        before = layer_fingerprints(self.ngi_path, self.nda_path)
+        self.assertEqual(list(before), ["A0010000", "B0014110", "C0423365"])
+
+        replace_bytes(self.nda_path, "가로등".encode("cp949"), "보안등".encode("cp949"))
+        after = layer_fingerprints(self.ngi_path, self.nda_path)
+        self.assertEqual(
+            [name for name in before if before[name] != after[name]], ["C0423365"]
+        )
+        self.assertNotEqual(
+            layer_fingerprints(self.ngi_path, self.nda_path, settings=("none",)),
+            after,
+        )
+
+    def test_fingerprints_do_not_depend_on_chunk_size(self):
+        expected = layer_fingerprints(self.ngi_path, self.nda_path)
+        with patch("parsers.fingerprint._HASH_CHUNK", 7):
+            self.assertEqual(layer_fingerprints(self.ngi_path, self.nda_path), expected)
+
+    def test_fingerprints_only_for_incremental_runs(self):
+        convert_sheet(str(self.ngi_path), str(self.output_path))
+        self.assertEqual(read_fingerprints(self.output_path), {})
+
+    def test_unchanged_sheet_is_skipped(self):
+        convert_sheet(str(self.ngi_path), str(self.output_path), incremental=True)
+        stored = read_fingerprints(self.output_path)
+        self.assertEqual(len(stored), 3)
+        # fingerprints live in gpkg_ tables, which are never listed as layers
+        self.assertEqual(
+            self.query(
+                "SELECT name FROM sqlite_master WHERE type = 'table' "
+                "AND name NOT LIKE 'gpkg%' AND name NOT LIKE 'rtree%' "
+                "AND name NOT LIKE 'sqlite%' "
+                "AND name NOT IN (SELECT table_name FROM gpkg_contents)"
+            ),
+            [],
+        )
+
+        mtime = self.output_path.stat().st_mtime_ns
+        result = convert_sheet(
+            str(self.ngi_path), str(self.output_path), incremental=True
+        )
+        self.assertEqual(result["layers"], {})
+        self.assertEqual(result["unchanged"], ["A0010000", "B0014110", "C0423365"])
+        self.assertEqual(self.output_path.stat().st_mtime_ns, mtime)
+
+    def test_only_changed_layers_are_rewritten(self):
+        convert_sheet(str(self.ngi_path), str(self.output_path), incremental=True)
+        replace_bytes(self.nda_path, "가로등".encode("cp949"), "보안등".encode("cp949"))
+
+        result = convert_sheet(
+            str(self.ngi_path), str(self.output_path), incremental=True
+        )
+        self.assertEqual(result["layers"], {"C0423365": 2})
+        self.assertEqual(result["unchanged"], ["A0010000", "B0014110"])
+        self.assertEqual(
+            self.query('SELECT KIND FROM "C0423365" ORDER BY fid'),
+            [("보안등",), ("신호등",)],
+        )
+        self.assertEqual(self.query('SELECT count(*) FROM "A0010000"'), [(2,)])
+        self.assertEqual(
+            self.query('SELECT count(*) FROM "rtree_C0423365_geom"'), [(2,)]
+        )
+        self.assertEqual(
+            read_fingerprints(self.output_path),
+            layer_fingerprints(self.ngi_path, self.nda_path, settings=("deferred", None)),
+        )
+
+    def test_area_of_interest_after_full_conversion(self):
+        convert_sheet(str(self.ngi_path), str(self.output_path), incremental=True)
+
+        aoi = (151010, 204010, 151500, 204500)
+        result = convert_sheet(
+            str(self.ngi_path), str(self.output_path), incremental=True, aoi=aoi
+        )
+        self.assertEqual(result["layers"], {"B0014110": 2})
+        self.assertEqual(result["unchanged"], [])
+        self.assertEqual(
+            self.query("SELECT table_name FROM gpkg_contents"), [("B0014110",)]
+        )
+        self.assertEqual(list(read_fingerprints(self.output_path)), ["B0014110"])
+
+        result = convert_sheet(
+            str(self.ngi_path), str(self.output_path), incremental=True, aoi=aoi
+        )
+        self.assertEqual(result["layers"], {})
+        self.assertEqual(result["unchanged"], ["B0014110"])
+
+    def test_path_with_uri_characters(self):
+        self.output_path = self.root / "sheet?#%41.gpkg"
+        convert_sheet(str(self.ngi_path), str(self.output_path), incremental=True)
+        self.assertEqual(len(read_fingerprints(self.output_path)), 3)
+
+    def test_cli_incremental_run(self):
+        output_dir = self.root / "out"
+        args = ["convert", str(self.ngi_path), "-o", str(output_dir), "-j", "1"]
+        self.assertEqual(cli.main(args + ["--incremental"]), 0)
+        self.assertEqual(cli.main(args + ["--incremental"]), 0)
+        self.assertEqual(
+            sorted(path.name for path in output_dir.iterdir()), ["sheet.gpkg"]
+        )
+        self.assertEqual(cli.main(args + ["--incremental", "-f", "geojson"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
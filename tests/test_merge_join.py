@@ -0,0 +1,94 @@
+import unittest
+import os
+import sys
+from pathlib import Path
+from parsers.converters.geojson_converter import GeoJSONConverter
+from parsers.merge_join import merge_records
+from parsers.nda_parser import NDAParser
+from parsers.ngi_parser import NGIParser
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+class TestMergeJoin(unittest.TestCase):
+    def setUp(self):
+        self.test_data_dir = Path(__file__).parent / "test_data"
+        self.ngi_records = [
+            ("L1", "1", "g11"),
+            ("L1", "2", "g12"),
+            ("L2", "1", "g21"),
+            ("L2", "2", "g22"),
+        ]
+        self.nda_records = [
+            ("L1", "1", {"a": 1}),
+            ("L1", "2", {"a": 2}),
+            ("L2", "1", {"b": 1}),
+            ("L2", "2", {"b": 2}),
+        ]
+        self.expected = [
+            ("L1", "1", "g11", {"a": 1}),
+            ("L1", "2", "g12", {"a": 2}),
+            ("L2", "1", "g21", {"b": 1}),
+            ("L2", "2", "g22", {"b": 2}),
+        ]
+
+    def test_ordered_merge(self):
+        merged = list(merge_records(self.ngi_records, self.nda_records))
+        self.assertEqual(merged, self.expected)
+
+    def test_unordered_merge_spills(self):
+        merged = list(
+            merge_records(self.ngi_records, self.nda_records[::-1], max_pending=1)
+        )
+        self.assertEqual(merged, self.expected)
+
+    def test_missing_and_extra_records(self):
+        nda_records = [
+            ("L0", "1", {"x": 0}),
+            ("L1", "2", {"a": 2}),
+            ("L1", "3", {"a": 3}),
+            ("L2", "2", {"b": 2}),
+        ]
+        merged = list(merge_records(self.ngi_records, nda_records))
+        self.assertEqual(
+            [properties for _, _, _, properties in merged],
+            [{}, {"a": 2}, {}, {"b": 2}],
+        )
+
+    def test_non_contiguous_layers(self):
+        # L1 continues after L2 in the NGI file but not in the NDA file
+        ngi_records = [
+            ("L1", "1", "g11"),
+            ("L2", "1", "g21"),
+            ("L1", "2", "g12"),
+            ("L2", "2", "g22"),
+        ]
+        merged = list(merge_records(ngi_records, self.nda_records))
+        self.assertEqual(
+            [(layer, record_id, props) for layer, record_id, _, props in merged],
+            [
+                ("L1", "1", {"a": 1}),
+                ("L2", "1", {"b": 1}),
+                ("L1", "2", {"a": 2}),
+                ("L2", "2", {"b": 2}),
+            ],
+        )
+
+    def test_iter_features_matches_merge_data(self):
+        ngi_path = str(self.test_data_dir / "sample.ngi")
+        nda_path = str(self.test_data_dir / "sample.nda")
+        converter = GeoJSONConverter()
+
+        streamed = {}
+        for layer_name, feature in converter.iter_features(
+            NGIParser().iter_records(ngi_path), NDAParser().iter_records(nda_path)
+        ):
+            streamed.setdefault(layer_name, []).append(feature)
+
+        merged = converter.merge_data(
+            NGIParser().parse_file(ngi_path), NDAParser().parse_file(nda_path)
+        )
+        self.assertEqual(
+            streamed,
+            {name: layer["features"] for name, layer in merged.items()},
+        )
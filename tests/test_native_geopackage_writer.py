@@ -0,0 +1,258 @@
+import unittest
+import os
+import sqlite3
+import struct
+import tempfile
+from pathlib import Path
+
+from parsers.converters.native_geopackage_writer import (
+    GPKG_APPLICATION_ID,
+    NativeGeoPackageWriter,
+    encode_gpkg_geometry,
+)
+from parsers.converters.geojson_converter import GeoJSONConverter
+from parsers.nda_parser import NDAParser
+from parsers.ngi_parser import NGIParser
+from parsers.wkb import decode_wkb
+
+
+def read_gpkg_geometry(blob):
+    magic, version, flags, srs_id = struct.unpack_from("<2sBBi", blob)
+    envelope_size = {0: 0, 1: 32}[(flags >> 1) & 0b111]
+    envelope = struct.unpack_from(f"<{envelope_size // 8}d", blob, 8)
+    return magic, flags, srs_id, envelope, decode_wkb(blob[8 + envelope_size:])
+
+
+def make_feature(geometry, **properties):
+    return {"type": "Feature", "geometry": geometry, "properties": properties}
+
+
+class TestNativeGeoPackageWriter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.output_path = os.path.join(self.temp_dir.name, "out.gpkg")
+
+    def connect(self):
+        conn = sqlite3.connect(self.output_path)
+        self.addCleanup(conn.close)
+        return conn
+
+    def test_gpkg_metadata(self):
+        features = [
+            ("L1", make_feature({"type": "Point", "coordinates": [1.0, 2.0]}, a="x")),
+            (
+                "L1",
+                make_feature({"type": "Point", "coordinates": [5.0, -3.0]}, a="y"),
+            ),
+        ]
+        NativeGeoPackageWriter().write_features(features, self.output_path)
+
+        conn = self.connect()
+        self.assertEqual(
+            conn.execute("PRAGMA application_id").fetchone()[0], GPKG_APPLICATION_ID
+        )
+        self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], 10200)
+        self.assertEqual(conn.execute("PRAGMA integrity_check").fetchone()[0], "ok")
+        self.assertEqual(conn.execute("PRAGMA foreign_key_check").fetchall(), [])
+        self.assertEqual(
+            conn.execute(
+                "SELECT table_name, data_type, identifier, min_x, min_y, max_x, "
+                "max_y, srs_id FROM gpkg_contents"
+            ).fetchall(),
+            [("L1", "features", "L1", 1.0, -3.0, 5.0, 2.0, 5186)],
+        )
+        self.assertEqual(
+            conn.execute("SELECT * FROM gpkg_geometry_columns").fetchall(),
+            [("L1", "geom", "POINT", 5186, 0, 0)],
+        )
+        srs_ids = [
+            row[0] for row in conn.execute("SELECT srs_id FROM gpkg_spatial_ref_sys")
+        ]
+        self.assertEqual(sorted(srs_ids), [-1, 0, 4326, 5186])
+
+    def test_features_round_trip(self):
+        polygon = {
+            "type": "Polygon",
+            "coordinates": [[[0.0, 0.0], [4.0, 0.0], [4.0, 3.0], [0.0, 0.0]]],
+        }
+        features = [
+            ("A", make_feature(polygon, name="first", record_id="1")),
+            ("A", make_feature(polygon, record_id="2")),
+            (
+                "B",
+                make_feature({"type": "LineString", "coordinates": [[0, 0], [1, 1]]}),
+            ),
+        ]
+        NativeGeoPackageWriter(batch_size=1).write_features(features, self.output_path)
+
+        conn = self.connect()
+        rows = conn.execute('SELECT fid, geom, name, record_id FROM "A"').fetchall()
+        self.assertEqual([row[0] for row in rows], [1, 2])
+        self.assertEqual([row[2:] for row in rows], [("first", "1"), (None, "2")])
+
+        magic, flags, srs_id, envelope, geometry = read_gpkg_geometry(rows[0][1])
+        self.assertEqual((magic, flags, srs_id), (b"GP", 0b11, 5186))
+        self.assertEqual(envelope, (0.0, 4.0, 0.0, 3.0))
+        self.assertEqual(geometry, polygon)
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM "B"').fetchone()[0], 1)
+
+    def test_layer_revisited_after_switch(self):
+        point = {"type": "Point", "coordinates": [0.0, 0.0]}
+        features = [
+            ("A", make_feature(point)),
+            ("B", make_feature(point)),
+            ("A", make_feature(point)),
+        ]
+        NativeGeoPackageWriter().write_features(features, self.output_path)
+
+        conn = self.connect()
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM "A"').fetchone()[0], 2)
+
+    def test_colliding_table_names(self):
+        point = {"type": "Point", "coordinates": [0.0, 0.0]}
+        features = [
+            ("L-1", make_feature(point)),
+            ("L 1", make_feature(point)),
+            ("L 1", make_feature(point)),
+            ("l1", make_feature(point)),
+        ]
+        NativeGeoPackageWriter().write_features(features, self.output_path)
+
+        conn = self.connect()
+        self.assertEqual(
+            conn.execute(
+                "SELECT identifier, table_name FROM gpkg_contents ORDER BY rowid"
+            ).fetchall(),
+            [("L-1", "L1"), ("L 1", "L1_2"), ("l1", "l1_3")],
+        )
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM "L1_2"').fetchone()[0], 2)
+
+        # an update finds the tables of the layers by their identifiers
+        NativeGeoPackageWriter().write_features(
+            [("L 1", make_feature(point))],
+            self.output_path,
+            update=True,
+            drop_layers=["L-1"],
+        )
+        self.assertEqual(
+            conn.execute(
+                "SELECT identifier, table_name FROM gpkg_contents ORDER BY rowid"
+            ).fetchall(),
+            [("l1", "l1_3"), ("L 1", "L1_2")],
+        )
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM "L1_2"').fetchone()[0], 1)
+
+    def test_existing_file_is_replaced(self):
+        Path(self.output_path).write_bytes(b"not a geopackage")
+        NativeGeoPackageWriter().write_features([], self.output_path)
+
+        conn = self.connect()
+        self.assertEqual(
+            conn.execute("SELECT COUNT(*) FROM gpkg_contents").fetchone()[0], 0
+        )
+
+    def test_sample_compact_geometries(self):
+        sample_path = Path(__file__).parent / "test_data" / "sample.ngi"
+        records = list(NGIParser(compact=True).iter_records(sample_path))
+        features = (
+            (layer, make_feature(geometry, record_id=record_id))
+            for layer, record_id, geometry in records
+        )
+        NativeGeoPackageWriter().write_features(features, self.output_path)
+
+        conn = self.connect()
+        for layer, record_id, geometry in records:
+            (blob,) = conn.execute(
+                f'SELECT geom FROM "{layer}" WHERE record_id = ?', (record_id,)
+            ).fetchone()
+            self.assertEqual(read_gpkg_geometry(blob)[4], dict(geometry))
+
+    def test_typed_columns_from_layer_definitions(self):
+        sample_dir = Path(__file__).parent / "test_data"
+        nda_parser = NDAParser()
+        definitions = nda_parser.read_layer_definitions(sample_dir / "sample.nda")
+        features = GeoJSONConverter().iter_features(
+            NGIParser().iter_records(sample_dir / "sample.ngi"),
+            nda_parser.iter_records(sample_dir / "sample.nda"),
+        )
+        NativeGeoPackageWriter().write_features(features, self.output_path, definitions)
+
+        conn = self.connect()
+        columns = conn.execute('PRAGMA table_info("A0010000")').fetchall()
+        self.assertEqual(
+            [(column[1], column[2]) for column in columns],
+            [
+                ("fid", "INTEGER"),
+                ("geom", "LINESTRING"),
+                ("UFID", "TEXT(34)"),
+                ("NAME", "TEXT(100)"),
+                ("WIDTH", "REAL"),
+                ("LANES", "MEDIUMINT"),
+                ("record_id", "TEXT(254)"),
+            ],
+        )
+        row = conn.execute(
+            'SELECT WIDTH, typeof(WIDTH), LANES, typeof(LANES), record_id FROM "A0010000"'
+        ).fetchone()
+        self.assertEqual(row, (12.5, "real", 4, "integer", "1"))
+
+    def test_spatial_index_modes(self):
+        features = [
+            (
+                "L1",
+                make_feature(
+                    {"type": "LineString", "coordinates": [[i, 0.0], [i + 1.0, 2.0]]}
+                ),
+            )
+            for i in range(5)
+        ]
+        expected = [(i + 1, i, i + 1.0, 0.0, 2.0) for i in range(5)]
+
+        for mode in ("deferred", "immediate"):
+            with self.subTest(mode=mode):
+                NativeGeoPackageWriter(spatial_index=mode).write_features(
+                    features, self.output_path
+                )
+                conn = sqlite3.connect(self.output_path)
+                try:
+                    rows = conn.execute(
+                        'SELECT * FROM "rtree_L1_geom" ORDER BY id'
+                    ).fetchall()
+                    triggers = conn.execute(
+                        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger'"
+                    ).fetchone()[0]
+                    extension = conn.execute(
+                        "SELECT table_name, column_name, extension_name "
+                        "FROM gpkg_extensions"
+                    ).fetchall()
+                finally:
+                    conn.close()
+                self.assertEqual(rows, expected)
+                self.assertEqual(triggers, 6)
+                self.assertEqual(extension, [("L1", "geom", "gpkg_rtree_index")])
+
+        NativeGeoPackageWriter(spatial_index="none").write_features(
+            features, self.output_path
+        )
+        conn = self.connect()
+        self.assertIsNone(
+            conn.execute(
+                "SELECT name FROM sqlite_master WHERE name = 'rtree_L1_geom'"
+            ).fetchone()
+        )
+
+    def test_invalid_spatial_index_mode(self):
+        with self.assertRaises(ValueError):
+            NativeGeoPackageWriter(spatial_index="later")
+
+    def test_encode_empty_geometry(self):
+        blob = encode_gpkg_geometry({"type": "LineString", "coordinates": []})
+        magic, flags, srs_id, envelope, geometry = read_gpkg_geometry(blob)
+        self.assertTrue(flags & 0b10000)
+        self.assertEqual(envelope, ())
+        self.assertEqual(geometry["coordinates"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,14 +1,56 @@
 import unittest
 import os
 import sys
+import tempfile
+from pathlib import Path
+from parsers.csv_tokenizer import split_records
 from parsers.nda_parser import NDAParser
+from parsers.types import ColumnarLayer
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 
+def reference_parse_csv_line(line):
+    """Character based tokenizer the NDA parser originally used"""
+    values = []
+    current_value = ""
+    in_quotes = False
+
+    for char in line:
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == "," and not in_quotes:
+            values.append(current_value.strip())
+            current_value = ""
+        else:
+            current_value += char
+
+    values.append(current_value.strip())
+    return values
+
+
+TOKENIZER_CASES = [
+    '"field1","field2,with,comma","field3"',
+    '"1000B0014110000001", "서울시청, 본관", 13',
+    '"1000A0010000000002", "", 3.00, 1',
+    '"가나다", "라,마,바", "사아"',
+    "plain, values ,without,quotes",
+    "",
+    '"only"',
+    '"escaped ""quote"" inside", 1',
+    'unquoted "middle" quote, 2',
+    '"unterminated, value',
+    '"a"b, c',
+    '\t"tab", "x"',
+    '"trailing comma",',
+    ",,",
+]
+
+
 class TestNDAParser(unittest.TestCase):
     def setUp(self):
         self.parser = NDAParser()
+        self.test_data_dir = Path(__file__).parent / "test_data"
 
     def test_parse_csv_line(self):
         test_line = '"field1","field2,with,comma","field3"'
@@ -19,6 +61,169 @@ class TestNDAParser(unittest.TestCase):
         self.assertEqual(values[1], "field2,with,comma")
         self.assertEqual(values[2], "field3")
 
+    def test_parse_csv_line_matches_reference(self):
+        for line in TOKENIZER_CASES:
+            with self.subTest(line=line):
+                self.assertEqual(
+                    self.parser._parse_csv_line(line), reference_parse_csv_line(line)
+                )
+
+    def test_split_records_batch(self):
+        expected = [reference_parse_csv_line(line) for line in TOKENIZER_CASES]
+        self.assertEqual(split_records(TOKENIZER_CASES), expected)
+        self.assertEqual(split_records([]), [])
+
+    def test_parse_file(self):
+        parsed = self.parser.parse_file(str(self.test_data_dir / "sample.nda"))
+
+        self.assertEqual(list(parsed), ["A0010000", "B0014110", "C0423365"])
+        self.assertEqual(
+            parsed["A0010000"]["1"],
+            {
+                "UFID": "1000A0010000000001",
+                "NAME": "세종대로",
+                "WIDTH": 12.5,
+                "LANES": 4,
+            },
+        )
+        # empty values are left out
+        self.assertEqual(parsed["B0014110"]["3"], {"UFID": "1000B0014110000003"})
+        self.assertEqual(parsed["B0014110"]["1"]["NAME"], "서울시청, 본관")
+
+    def test_iter_records(self):
+        records = list(
+            self.parser.iter_records(self.test_data_dir / "sample.nda", batch_size=1)
+        )
+
+        self.assertEqual(len(records), 7)
+        self.assertEqual(
+            records[2],
+            (
+                "B0014110",
+                "1",
+                {"UFID": "1000B0014110000001", "NAME": "서울시청, 본관", "FLOORS": 13},
+            ),
+        )
+
+    def test_iter_records_types_follow_field_definitions(self):
+        lines = [
+            "<LAYER_START>",
+            "$LAYER_NAME",
+            '"L"',
+            "$ASPATIAL_FIELD_DEF",
+            'ATTRIB("WIDTH", NUMERIC, 6, 2)',
+            'ATTRIB("LANES", NUMERIC, 2, 0)',
+            "$END",
+            "<DATA>",
+            "$RECORD 1",
+            "12.50, 4",
+            "$RECORD 2",
+            "3, 1",
+            "$RECORD 3",
+            ", 2",
+            "<END>",
+            "<LAYER_END>",
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            nda_path = Path(tmp_dir) / "types.nda"
+            nda_path.write_bytes("\r\n".join(lines).encode("cp949"))
+            for batch_size in (1, 2, 10000):
+                with self.subTest(batch_size=batch_size):
+                    records = list(
+                        self.parser.iter_records(nda_path, batch_size=batch_size)
+                    )
+                    self.assertEqual(
+                        [record[2] for record in records],
+                        [
+                            {"WIDTH": 12.5, "LANES": 4},
+                            {"WIDTH": 3.0, "LANES": 1},
+                            {"LANES": 2},
+                        ],
+                    )
+                    self.assertEqual(
+                        {type(record[2]["WIDTH"]) for record in records[:2]}, {float}
+                    )
+
+    def test_parse_selected_layers(self):
+        sample_path = self.test_data_dir / "sample.nda"
+        full = NDAParser().parse_file(sample_path)
+        parsed = self.parser.parse_file(sample_path, layers={"C0423365"})
+        self.assertEqual(parsed, {"C0423365": full["C0423365"]})
+        self.assertEqual(list(self.parser._layer_fields), ["C0423365"])
+
+        records = list(self.parser.iter_records(sample_path, layers=["B0014110"]))
+        expected = [
+            r for r in NDAParser().iter_records(sample_path) if r[0] == "B0014110"
+        ]
+        self.assertEqual(records, expected)
+
+    def test_parse_file_columnar(self):
+        sample_path = str(self.test_data_dir / "sample.nda")
+        parsed = NDAParser(columnar=True).parse_file(sample_path)
+
+        roads = parsed["A0010000"]
+        self.assertIsInstance(roads, ColumnarLayer)
+        self.assertEqual(roads.field_names, ["UFID", "NAME", "WIDTH", "LANES"])
+        self.assertEqual(roads.columns[2].typecode, "d")
+        self.assertEqual(roads.columns[3].typecode, "q")
+        self.assertEqual(roads.column("NAME"), ["세종대로", None])
+        self.assertTrue(roads.is_null(1, 1))
+        self.assertEqual(roads.index["2"], 1)
+        # the mapping view matches the row oriented output
+        self.assertEqual(parsed, self.parser.parse_file(sample_path))
+
+    def test_columnar_layer_promotes_columns(self):
+        layer = ColumnarLayer("L", ["A", "B"], ["NUMERIC", "NUMERIC"])
+        layer.extend(["1", "2"], [[1, None], [1, 2]])
+        layer.extend(["3"], [[2.5], ["n/a"]])
+
+        self.assertEqual(layer.columns[0].typecode, "d")
+        self.assertEqual(layer.column("A"), [1.0, None, 2.5])
+        self.assertEqual(layer.column("B"), [1, 2, "n/a"])
+        self.assertEqual(layer["2"], {"B": 2})
+
+    def test_read_layer_definitions(self):
+        definitions = self.parser.read_layer_definitions(
+            self.test_data_dir / "sample.nda"
+        )
+
+        self.assertEqual(list(definitions), ["A0010000", "B0014110", "C0423365"])
+        fields = definitions["A0010000"]["fields"]
+        self.assertEqual(
+            [(f["name"], f["type"], f["width"], f["precision"]) for f in fields],
+            [
+                ("UFID", "STRING", 34, 0),
+                ("NAME", "STRING", 100, 0),
+                ("WIDTH", "DOUBLE", 6, 2),
+                ("LANES", "INTEGER", 2, 0),
+            ],
+        )
+        self.assertEqual(self.parser.get_layer_definition("A0010000")["fields"], fields)
+
+    def test_parse_record(self):
+        fields = [
+            self.parser.parse_field_definition(line)
+            for line in (
+                'ATTRIB("NAME", STRING, 100, 0)',
+                'ATTRIB("WIDTH", NUMERIC, 6, 2)',
+                'ATTRIB("LANES", NUMERIC, 2, 0)',
+            )
+        ]
+        self.assertEqual(
+            self.parser.parse_record("A0010000", fields, '"Main, east", 12, '),
+            {"NAME": "Main, east", "WIDTH": 12.0},
+        )
+        with self.assertLogs("parsers.nda_parser", level="WARNING"):
+            self.assertIsNone(self.parser.parse_record("A0010000", fields, '"x", 1'))
+
+    def test_parse_file_keeps_layer_definitions(self):
+        self.parser.parse_file(str(self.test_data_dir / "sample.nda"))
+        fields = self.parser.get_layer_definition("B0014110")["fields"]
+        self.assertEqual(
+            [(f["name"], f["type"]) for f in fields],
+            [("UFID", "STRING"), ("NAME", "STRING"), ("FLOORS", "INTEGER")],
+        )
+
     def test_parse_field_value(self):
         # 숫자형 테스트
         self.assertEqual(self.parser._parse_field_value("123", "NUMERIC"), 123)
@@ -1,15 +1,36 @@
 import unittest
 import os
 import sys
+import tempfile
 from pathlib import Path
 
 from parsers.ngi_parser import NGIParser
-from parsers.types import GeometryType
+from parsers.types import CompactGeometry, GeometryType
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # Add project root to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 
+def write_large_ngi(path, layers=3, records=120):
+    """Write an NGI file with several layers of square polygons"""
+    lines = ["<HEADER>", "$VERSION", "2.00", "$END"]
+    for layer in range(layers):
+        lines += ["<LAYER_START>", "$LAYER_NAME", f'"L{layer}"', "$END", "<DATA>"]
+        for record in range(1, records + 1):
+            x, y = float(record), float(layer)
+            ring = [(x, y), (x + 1, y), (x + 1, y + 1), (x, y + 1), (x, y)]
+            lines += [f"$RECORD {record}", "POLYGON", "5"]
+            lines += [f"{px:.2f} {py:.2f}" for px, py in ring]
+            lines.append("SOLID(1, 0)")
+        lines += ["<END>", "<LAYER_END>"]
+    path.write_bytes("\r\n".join(lines).encode("cp949"))
+
+
 class TestNGIParser(unittest.TestCase):
     def setUp(self):
         self.parser = NGIParser()
@@ -29,6 +50,24 @@ class TestNGIParser(unittest.TestCase):
         self.assertEqual(coords[0], [100.0, 200.0])
         self.assertEqual(next_idx, 5)
 
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_parse_coordinates_as_array(self):
+        test_lines = ["3", "100.0 200.0", "200.0 300.0", "300.0 200.0"]
+        coords, next_idx = self.parser.parse_coordinates(test_lines, 0, as_array=True)
+
+        self.assertEqual(coords.shape, (3, 2))
+        self.assertEqual(coords.dtype, np.float64)
+        self.assertEqual(coords.tolist()[1], [200.0, 300.0])
+        self.assertEqual(next_idx, 4)
+
+    def test_parse_coordinates_stops_at_keyword(self):
+        # point count larger than the actual block
+        test_lines = ["3", "100.0 200.0", "invalid", "$RECORD 2"]
+        coords, next_idx = self.parser.parse_coordinates(test_lines, 0)
+
+        self.assertEqual(coords, [[100.0, 200.0]])
+        self.assertEqual(next_idx, 4)
+
     def test_parse_geometry_type(self):
         test_lines = ["$GEOMETRIC_METADATA", "MASK(POLYGON,LINESTRING)"]
         geom_type, next_idx = self.parser.parse_geometry_type(test_lines, 0)
@@ -66,3 +105,176 @@ class TestNGIParser(unittest.TestCase):
         for invalid_input in invalid_inputs:
             with self.assertRaises(ValueError):
                 self.parser.parse_geometry_type(invalid_input, 0)
+
+    def test_iter_records(self):
+        records = list(self.parser.iter_records(self.test_data_dir / "sample.ngi"))
+
+        self.assertEqual(
+            [(layer, record_id) for layer, record_id, _ in records],
+            [
+                ("A0010000", "1"),
+                ("A0010000", "2"),
+                ("B0014110", "1"),
+                ("B0014110", "2"),
+                ("C0423365", "1"),
+                ("C0423365", "2"),
+            ],
+        )
+        layer, record_id, geometry = records[0]
+        self.assertEqual(geometry["type"], "LineString")
+        self.assertEqual(
+            geometry["coordinates"],
+            [[150609.21, 203279.01], [150650.5, 203300.25], [150700.0, 203400.0]],
+        )
+
+    def test_parse_file(self):
+        parsed = self.parser.parse_file(str(self.test_data_dir / "sample.ngi"))
+
+        self.assertEqual(list(parsed), ["A0010000", "B0014110", "C0423365"])
+        # polygon with less than 4 coordinates is dropped
+        self.assertEqual(list(parsed["B0014110"]), ["1", "2"])
+        self.assertEqual(parsed["B0014110"]["1"]["type"], "Polygon")
+        self.assertEqual(len(parsed["B0014110"]["1"]["coordinates"][0]), 5)
+        self.assertEqual(
+            parsed["C0423365"]["2"],
+            {"type": "Point", "coordinates": [152265.62, 205171.56]},
+        )
+
+    def test_parse_file_not_found(self):
+        with self.assertRaises(FileNotFoundError):
+            self.parser.parse_file(str(self.test_data_dir / "missing.ngi"))
+
+    def test_iter_records_empty_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            empty_path = Path(tmp_dir) / "empty.ngi"
+            empty_path.write_bytes(b"")
+            self.assertEqual(list(self.parser.iter_records(empty_path)), [])
+
+    def test_point_without_coordinates(self):
+        lines = [
+            "<LAYER_START>",
+            "$LAYER_NAME",
+            '"P"',
+            "<DATA>",
+            "$RECORD 1",
+            "POINT",
+            "$RECORD 2",
+            "POINT",
+            "1.0 2.0",
+            "$RECORD 3",
+            "TEXT",
+            "<END>",
+            "<LAYER_END>",
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            ngi_path = Path(tmp_dir) / "points.ngi"
+            ngi_path.write_bytes("\r\n".join(lines).encode("cp949"))
+            for compact in (False, True):
+                with self.subTest(compact=compact):
+                    records = list(NGIParser(compact=compact).iter_records(ngi_path))
+                    # the empty record is skipped and the next one kept
+                    self.assertEqual(
+                        [(record[1], dict(record[2])) for record in records],
+                        [("2", {"type": "Point", "coordinates": [1.0, 2.0]})],
+                    )
+
+    def test_parse_file_compact(self):
+        sample_path = str(self.test_data_dir / "sample.ngi")
+        parsed = NGIParser(compact=True).parse_file(sample_path)
+
+        polygon = parsed["B0014110"]["1"]
+        self.assertIsInstance(polygon, CompactGeometry)
+        self.assertEqual(polygon.coords.typecode, "d")
+        self.assertEqual(list(polygon.offsets), [0, 5])
+        self.assertEqual(polygon.__geo_interface__["type"], "Polygon")
+        # the lazy GeoJSON view matches the dict output
+        self.assertEqual(parsed, self.parser.parse_file(sample_path))
+
+    def test_partition_splits_large_layers(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            ngi_path = Path(tmp_dir) / "large.ngi"
+            write_large_ngi(ngi_path)
+            ranges = self.parser._partition(ngi_path, 8)
+
+            self.assertGreater(len(ranges), 3)
+            self.assertEqual(ranges[0][0], 0)
+            self.assertIsNone(ranges[-1][1])
+            for (_, end, _), (start, _, _) in zip(ranges, ranges[1:]):
+                self.assertEqual(end, start)
+            # records read range by range are the same as a full scan
+            records = [
+                record
+                for start, end, layer in ranges
+                for record in self.parser._iter_range(ngi_path, start, end, layer)
+            ]
+            self.assertEqual(records, list(self.parser.iter_records(ngi_path)))
+
+    def test_parse_file_with_workers(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            ngi_path = Path(tmp_dir) / "large.ngi"
+            write_large_ngi(ngi_path)
+            for parser in (self.parser, NGIParser(compact=True)):
+                expected = parser.parse_file(str(ngi_path))
+                parsed = parser.parse_file(str(ngi_path), workers=2)
+                self.assertEqual(parsed, expected)
+                self.assertEqual(list(parsed), ["L0", "L1", "L2"])
+                self.assertEqual(len(parsed["L1"]), 120)
+
+        sample_path = str(self.test_data_dir / "sample.ngi")
+        self.assertEqual(
+            self.parser.parse_file(sample_path, workers=2),
+            self.parser.parse_file(sample_path),
+        )
+
+    def test_area_of_interest(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            ngi_path = Path(tmp_dir) / "large.ngi"
+            write_large_ngi(ngi_path)
+            aoi = (10.5, 0.5, 20.2, 1.5)
+            parsed = self.parser.parse_file(str(ngi_path), aoi=aoi)
+
+            # squares of record r span x r..r+1 and y layer..layer+1
+            self.assertEqual(list(parsed), ["L0", "L1"])
+            self.assertEqual(list(parsed["L0"]), [str(r) for r in range(10, 21)])
+            full = self.parser.parse_file(str(ngi_path))["L1"]
+            expected = {rid: full[rid] for rid in map(str, range(10, 21))}
+            self.assertEqual(parsed["L1"], expected)
+            compact = NGIParser(compact=True)
+            self.assertEqual(
+                compact.parse_file(str(ngi_path), workers=2, aoi=aoi),
+                compact.parse_file(str(ngi_path), aoi=aoi),
+            )
+
+    def test_area_of_interest_uses_layer_bounds(self):
+        sample_path = str(self.test_data_dir / "sample.ngi")
+        self.assertEqual(
+            self.parser.select_layers(
+                sample_path, aoi=(151010, 204010, 151500, 204500)
+            ),
+            ["B0014110"],
+        )
+        self.assertEqual(self.parser.select_layers(sample_path, aoi=(0, 0, 1, 1)), [])
+        # only the point at the lower left corner of C0423365
+        records = list(
+            self.parser.iter_records(sample_path, aoi=(151990, 204990, 152010, 205010))
+        )
+        self.assertEqual([record[:2] for record in records], [("C0423365", "1")])
+
+    def test_parse_selected_layers(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            ngi_path = Path(tmp_dir) / "large.ngi"
+            write_large_ngi(ngi_path, layers=4)
+            full = self.parser.parse_file(str(ngi_path))
+            expected = {name: full[name] for name in ("L1", "L3")}
+
+            self.assertEqual(
+                self.parser.parse_file(str(ngi_path), layers={"L1", "L3"}), expected
+            )
+            self.assertEqual(
+                self.parser.parse_file(str(ngi_path), workers=2, layers=["L3", "L1"]),
+                expected,
+            )
+            self.assertEqual(self.parser.parse_file(str(ngi_path), layers=[]), {})
+            self.assertEqual(
+                list(self.parser.iter_records(str(ngi_path), layers=["MISSING"])), []
+            )
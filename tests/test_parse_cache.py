@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from parsers.nda_parser import NDAParser
+from parsers.ngi_parser import NGIParser
+from parsers.parse_cache import ParseCache
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = Path(self.temp_dir.name)
+        self.cache = ParseCache(self.root / "cache")
+        sample_dir = Path(__file__).parent / "test_data"
+        self.ngi_path = self.root / "sample.ngi"
+        self.nda_path = self.root / "sample.nda"
+        shutil.copy(sample_dir / "sample.ngi", self.ngi_path)
+        shutil.copy(sample_dir / "sample.nda", self.nda_path)
+
+    def test_warm_parse_skips_parsing(self):
+        cases = [
+            (lambda: NGIParser(compact=True, cache=self.cache), self.ngi_path),
+            (lambda: NDAParser(columnar=True, cache=self.cache), self.nda_path),
+        ]
+        for make_parser, path in cases:
+            parser = make_parser()
+            with self.subTest(parser=type(parser).__name__):
+                cold = parser.parse_file(str(path))
+                with patch.object(
+                    type(parser), "_parse_file", side_effect=AssertionError
+                ):
+                    warm = make_parser().parse_file(str(path))
+                self.assertEqual(dict(warm), dict(cold))
+
+        # other options are parsed and cached separately
+        self.assertEqual(
+            NGIParser(cache=self.cache).parse_file(str(self.ngi_path)),
+            NGIParser().parse_file(str(self.ngi_path)),
+        )
+
+    def test_warm_iter_records_skips_parsing(self):
+        cases = [
+            (
+                lambda cache: NGIParser(compact=True, cache=cache),
+                self.ngi_path,
+                "_iter_range",
+            ),
+            (lambda cache: NDAParser(cache=cache), self.nda_path, "_iter_record_batches"),
+        ]
+        for make_parser, path, parse_method in cases:
+            parser = make_parser(self.cache)
+            with self.subTest(parser=type(parser).__name__):
+                cold = list(parser.iter_records(str(path)))
+                with patch.object(
+                    type(parser), parse_method, side_effect=AssertionError
+                ):
+                    warm_parser = make_parser(self.cache)
+                    warm = list(warm_parser.iter_records(str(path)))
+                self.assertEqual(warm, cold)
+                self.assertEqual(warm, list(make_parser(None).iter_records(str(path))))
+
+        # field definitions come with the cached records
+        fields = warm_parser.get_layer_definition("A0010000")["fields"]
+        self.assertEqual([field["name"] for field in fields][:2], ["UFID", "NAME"])
+
+    def test_nda_layer_definitions_are_restored(self):
+        NDAParser(cache=self.cache).parse_file(str(self.nda_path))
+        parser = NDAParser(cache=self.cache)
+        parser.parse_file(str(self.nda_path))
+        fields = parser.get_layer_definition("A0010000")["fields"]
+        self.assertEqual([field["name"] for field in fields][:2], ["UFID", "NAME"])
+
+    def test_key_depends_on_content_and_options(self):
+        key = self.cache.key(self.ngi_path, "NGIParser", True)
+        copy_path = self.root / "copy.ngi"
+        shutil.copy(self.ngi_path, copy_path)
+        self.assertEqual(self.cache.key(copy_path, "NGIParser", True), key)
+        self.assertNotEqual(self.cache.key(self.ngi_path, "NGIParser", False), key)
+
+        with open(copy_path, "ab") as f:
+            f.write(b"\n")
+        self.assertNotEqual(self.cache.key(copy_path, "NGIParser", True), key)
+
+    def test_lru_eviction(self):
+        cache = ParseCache(self.root / "small", max_bytes=2500)
+        payload = b"x" * 1000
+        cache.put("a", payload)
+        cache.put("b", payload)
+        os.utime(cache.directory / "a.pickle", (1000, 1000))
+        os.utime(cache.directory / "b.pickle", (2000, 2000))
+        self.assertIsNotNone(cache.get("a"))  # a is now more recent than b
+        cache.put("c", payload)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), payload)
+        self.assertEqual(cache.get("c"), payload)
+        self.assertLessEqual(cache.size, 2500)
+
+    def test_corrupt_entry_is_a_miss(self):
+        self.cache.put("k", {"a": 1})
+        (self.cache.directory / "k.pickle").write_bytes(b"broken")
+        with self.assertLogs("parsers.parse_cache", level="WARNING"):
+            self.assertIsNone(self.cache.get("k"))
+        self.assertFalse((self.cache.directory / "k.pickle").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
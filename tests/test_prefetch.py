@@ -0,0 +1,94 @@
+import multiprocessing.spawn
+import unittest
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from parsers.ngi_parser import NGIParser
+from parsers.prefetch import prefetch, python_executable
+
+
+def count_to(n):
+    return iter(range(n))
+
+
+def fail_after(n):
+    yield from range(n)
+    raise ValueError("broken record")
+
+
+class TestPrefetch(unittest.TestCase):
+    def test_thread_and_process_modes(self):
+        for use_process in (False, True):
+            with self.subTest(use_process=use_process):
+                items = list(
+                    prefetch(count_to, 2500, batch_size=100, use_process=use_process)
+                )
+                self.assertEqual(items, list(range(2500)))
+
+    def test_errors_are_reraised(self):
+        for use_process in (False, True):
+            with self.subTest(use_process=use_process):
+                items = []
+                with self.assertRaises(ValueError):
+                    for item in prefetch(
+                        fail_after, 25, batch_size=10, use_process=use_process
+                    ):
+                        items.append(item)
+                self.assertEqual(items, list(range(20)))
+
+    def test_close_stops_producer(self):
+        produced = []
+
+        def endless():
+            while True:
+                produced.append(len(produced))
+                yield produced[-1]
+
+        records = prefetch(endless, batch_size=10, max_batches=2, use_process=False)
+        self.assertEqual(next(records), 0)
+        records.close()
+        time.sleep(0.3)
+        count = len(produced)
+        time.sleep(0.3)
+        self.assertEqual(len(produced), count)
+
+    def test_producer_starts_before_first_item(self):
+        produced = []
+
+        def endless():
+            while True:
+                produced.append(len(produced))
+                yield produced[-1]
+
+        records = prefetch(endless, batch_size=10, max_batches=2, use_process=False)
+        time.sleep(0.3)
+        self.assertGreater(len(produced), 0)
+        # closing before the first item still stops the producer
+        records.close()
+        time.sleep(0.3)
+        count = len(produced)
+        time.sleep(0.3)
+        self.assertEqual(len(produced), count)
+
+    def test_spawn_from_embedding_application(self):
+        # inside QGIS sys.executable is the application, not Python
+        with patch.object(sys, "executable", str(Path(sys.exec_prefix) / "qgis")):
+            executable = python_executable()
+            if executable is None:
+                self.skipTest("No Python interpreter under sys.exec_prefix")
+            self.assertTrue(Path(executable).name.startswith("python"))
+            previous = multiprocessing.spawn.get_executable()
+            items = list(prefetch(count_to, 250, batch_size=100, use_process=True))
+        self.assertEqual(items, list(range(250)))
+        # other spawn users in the application keep their executable
+        self.assertEqual(multiprocessing.spawn.get_executable(), previous)
+
+    def test_parser_records_in_process(self):
+        sample_path = str(Path(__file__).parent / "test_data" / "sample.ngi")
+        parser = NGIParser(compact=True)
+        self.assertEqual(
+            list(prefetch(parser.iter_records, sample_path, use_process=True)),
+            list(parser.iter_records(sample_path)),
+        )
@@ -0,0 +1,103 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from parsers.converters.geojson_converter import GeoJSONConverter
+from parsers.nda_parser import NDAParser
+from parsers.ngi_parser import NGIParser
+from parsers.record_index import INDEX_VERSION, FileIndex, SheetIndex
+
+
+class TestRecordIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.root = Path(self.temp_dir.name)
+        sample_dir = Path(__file__).parent / "test_data"
+        self.ngi_path = self.root / "sample.ngi"
+        self.nda_path = self.root / "sample.nda"
+        shutil.copy(sample_dir / "sample.ngi", self.ngi_path)
+        shutil.copy(sample_dir / "sample.nda", self.nda_path)
+
+    def test_layer_headers_and_records(self):
+        index = FileIndex.build(self.ngi_path)
+        self.assertEqual(list(index.layers), ["A0010000", "B0014110", "C0423365"])
+        layer = index.layers["A0010000"]
+        self.assertEqual(layer["geometry_type"], "LineString")
+        self.assertEqual(layer["bound"], [150609.21, 203279.01, 150700.0, 203400.0])
+        self.assertEqual(index.layers["B0014110"]["record_ids"], ["1", "2", "3"])
+
+        data = self.ngi_path.read_bytes()
+        for offset in layer["offsets"]:
+            self.assertTrue(data[offset:].startswith(b"$RECORD "))
+
+        nda_index = FileIndex.build(self.nda_path)
+        names = [field["name"] for _, field in nda_index.layers["A0010000"]["fields"]]
+        self.assertEqual(names, ["UFID", "NAME", "WIDTH", "LANES"])
+
+    def test_get_record_matches_sequential_parse(self):
+        ngi_index = FileIndex.build(self.ngi_path)
+        for layer_name, record_id, geometry in NGIParser().iter_records(
+            str(self.ngi_path)
+        ):
+            self.assertEqual(ngi_index.get_record(layer_name, record_id), geometry)
+
+        nda_index = FileIndex.build(self.nda_path)
+        for layer_name, record_id, properties in NDAParser().iter_records(
+            str(self.nda_path)
+        ):
+            self.assertEqual(nda_index.get_record(layer_name, record_id), properties)
+
+        self.assertIsNone(ngi_index.get_record("A0010000", "99"))
+        self.assertIsNone(ngi_index.get_record("MISSING", "1"))
+
+    def test_sheet_index_features(self):
+        index = SheetIndex(self.ngi_path, self.nda_path)
+        features = GeoJSONConverter().iter_features(
+            NGIParser().iter_records(str(self.ngi_path)),
+            NDAParser().iter_records(str(self.nda_path)),
+        )
+        for layer_name, feature in features:
+            record_id = feature["properties"]["record_id"]
+            self.assertEqual(index.get_record(layer_name, record_id), feature)
+
+    def test_sidecar_reuse_and_invalidation(self):
+        index = FileIndex.load(self.ngi_path)
+        self.assertTrue(index.sidecar_path.exists())
+
+        # a stale marker shows whether the sidecar was reused
+        data = json.loads(index.sidecar_path.read_text(encoding="utf-8"))
+        data["layers"][0]["geometry_type"] = "Cached"
+        index.sidecar_path.write_text(json.dumps(data), encoding="utf-8")
+        self.assertEqual(
+            FileIndex.load(self.ngi_path).layers["A0010000"]["geometry_type"], "Cached"
+        )
+
+        # touching the file keeps the index valid, the content hash matches
+        stat = self.ngi_path.stat()
+        os.utime(self.ngi_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(
+            FileIndex.load(self.ngi_path).layers["A0010000"]["geometry_type"], "Cached"
+        )
+
+        # changed content rebuilds it
+        with open(self.ngi_path, "ab") as f:
+            f.write(b"\n")
+        self.assertEqual(
+            FileIndex.load(self.ngi_path).layers["A0010000"]["geometry_type"], "LineString"
+        )
+
+    def test_corrupt_sidecar_is_rebuilt(self):
+        sidecar = self.root / "sample.ngi.idx.json"
+        sidecar.write_text("{not json", encoding="utf-8")
+        with self.assertLogs("parsers.record_index", level="WARNING"):
+            index = FileIndex.load(self.ngi_path)
+        self.assertEqual(len(index.layers), 3)
+        self.assertEqual(json.loads(sidecar.read_text(encoding="utf-8"))["version"], INDEX_VERSION)
+
+
+if __name__ == "__main__":
+    unittest.main()
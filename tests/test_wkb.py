@@ -0,0 +1,95 @@
+import unittest
+import struct
+from array import array
+from pathlib import Path
+
+from parsers.ngi_parser import NGIParser
+from parsers.types import CompactGeometry
+from parsers.wkb import decode_wkb, encode_wkb, geometry_bounds
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+GEOMETRIES = [
+    {"type": "Point", "coordinates": [151000.5, 204000.25]},
+    {"type": "LineString", "coordinates": [[0.0, 0.0], [1.5, 2.5], [3.0, -1.0]]},
+    {
+        "type": "Polygon",
+        "coordinates": [
+            [[0.0, 0.0], [10.0, 0.0], [10.0, 10.0], [0.0, 10.0], [0.0, 0.0]],
+            [[2.0, 2.0], [4.0, 2.0], [4.0, 4.0], [2.0, 2.0]],
+        ],
+    },
+    {"type": "MultiPoint", "coordinates": [[1.0, 2.0], [3.0, 4.0]]},
+    {
+        "type": "MultiLineString",
+        "coordinates": [[[0.0, 0.0], [1.0, 1.0]], [[2.0, 2.0], [3.0, 3.0]]],
+    },
+]
+
+
+def to_compact(geometry):
+    coordinates = geometry["coordinates"]
+    if geometry["type"] == "Point":
+        parts = [[coordinates]]
+    elif geometry["type"] in ("LineString", "MultiPoint"):
+        parts = [coordinates]
+    else:
+        parts = coordinates
+    return CompactGeometry.from_parts(
+        geometry["type"], [array("d", [v for xy in part for v in xy]) for part in parts]
+    )
+
+
+class TestWKB(unittest.TestCase):
+    def test_round_trip(self):
+        for geometry in GEOMETRIES:
+            with self.subTest(geometry=geometry["type"]):
+                self.assertEqual(decode_wkb(encode_wkb(geometry)), geometry)
+
+    def test_compact_round_trip(self):
+        for geometry in GEOMETRIES:
+            with self.subTest(geometry=geometry["type"]):
+                compact = to_compact(geometry)
+                self.assertEqual(encode_wkb(compact), encode_wkb(geometry))
+                self.assertEqual(decode_wkb(encode_wkb(compact)), geometry)
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_numpy_coordinates(self):
+        geometry = GEOMETRIES[1]
+        coordinates = np.array(geometry["coordinates"])
+        self.assertEqual(
+            encode_wkb({"type": "LineString", "coordinates": coordinates}),
+            encode_wkb(geometry),
+        )
+
+    def test_point_layout(self):
+        wkb = encode_wkb(GEOMETRIES[0])
+        self.assertEqual(wkb[:5], b"\x01\x01\x00\x00\x00")
+        self.assertEqual(struct.unpack("<2d", wkb[5:]), (151000.5, 204000.25))
+
+    def test_empty_point(self):
+        empty = {"type": "Point", "coordinates": []}
+        compact = CompactGeometry.from_parts("Point", [])
+        for geometry in (empty, compact):
+            wkb = encode_wkb(geometry)
+            self.assertEqual(len(wkb), 21)
+            self.assertEqual(decode_wkb(wkb), empty)
+        self.assertIsNone(geometry_bounds(empty))
+        self.assertIsNone(geometry_bounds(compact))
+
+    def test_big_endian_decoding(self):
+        wkb = b"\x00" + struct.pack(">I2d", 1, 1.0, 2.0)
+        self.assertEqual(decode_wkb(wkb), {"type": "Point", "coordinates": [1.0, 2.0]})
+
+    def test_parsed_sample_round_trip(self):
+        sample_path = Path(__file__).parent / "test_data" / "sample.ngi"
+        parser = NGIParser(compact=True)
+        for layer_name, record_id, geometry in parser.iter_records(sample_path):
+            self.assertEqual(decode_wkb(encode_wkb(geometry)), geometry)
+
+    def test_unsupported_type(self):
+        with self.assertRaises(ValueError):
+            encode_wkb({"type": "GeometryCollection", "coordinates": []})